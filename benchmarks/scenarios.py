@@ -0,0 +1,230 @@
+# -*- coding: UTF-8 -*-
+"""
+Measures what real ``vlab`` commands cost over the network.
+
+Most vLab users are far away from the vLab server, so a command's speed is
+mostly how many round trips it makes. This harness runs the real click commands
+against ``vlab_cli.testing.fake_server`` (with a simulated round trip time), and
+records, per scenario:
+
+  - the wall-clock time of the command
+  - how many API calls the server answered
+  - how many bytes went over the wire, in both directions
+
+The numbers are compared to the baselines in ``scenario_baselines.json`` next to
+this file, and the harness fails when a scenario got worse than its baseline
+(plus the tolerance). Run it with::
+
+    python -m benchmarks.scenarios
+
+After a change that's supposed to make things better, record the new numbers with
+``--update-baselines`` and commit the baseline file along with the change.
+"""
+import sys
+import json
+import shutil
+import time
+import os.path
+import tempfile
+import configparser
+from functools import partial
+from unittest.mock import patch
+
+import click
+from click.testing import CliRunner
+from tabulate import tabulate
+
+from vlab_cli import vlab
+from vlab_cli.lib import api, agent, journal
+from vlab_cli.lib.configurizer import CONFIG_SECTIONS
+from vlab_cli.testing.fake_server import FakeVLab
+
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scenario_baselines.json')
+USERNAME = 'alice'
+# Keep output instant, skip the update check, and ignore answers saved on disk
+GLOBAL_ARGS = ['--no-scroll', '--skip-update-check', '--no-cache', '--vlab-username', USERNAME]
+
+
+def _lab(vm_count, component='CentOS', prefix='vm', portmaps=0):
+    """Create a function that fills the fake lab with VMs, before a scenario runs"""
+    def setup(server):
+        server.gateway = server._create_gateway('/api/2/inf/gateway', {}, {'wan': 'corpNetwork'})
+        for idx in range(1, vm_count + 1):
+            name = '{}-{}'.format(prefix, idx)
+            record = server.add_vm(name, component=component, ips=['192.168.1.{}'.format(idx + 10)])
+            for port in (22, 443)[:portmaps]:
+                server._create_portmap('/api/1/ipam/portmap', {}, {'target_addr': record['ips'][0],
+                                                                   'target_port': port,
+                                                                   'target_name': name,
+                                                                   'target_component': component})
+    return setup
+
+
+SCENARIOS = (
+    {'name': 'status-50-vms',
+     'args': ['status'],
+     'setup': _lab(50)},
+    {'name': 'create-onefs-6-nodes',
+     'args': ['create', 'onefs', '--name', 'mycluster', '--image', '8.2.0', '--node-count', '6',
+              '--external-ip-range', '192.168.1.20', '192.168.1.25',
+              '--internal-ip-range', '10.9.9.1', '10.9.9.10'],
+     'setup': _lab(0)},
+    {'name': 'delete-onefs-cluster',
+     'args': ['delete', 'onefs', '--cluster', 'mycluster'],
+     'setup': _lab(6, component='OneFS', prefix='mycluster', portmaps=2)},
+    {'name': 'delete-everything',
+     'args': ['delete', 'everything'],
+     'input': 'y\ny\n',
+     'setup': _lab(20)},
+    {'name': 'create-template-10-vms',
+     'args': ['create', 'template', '--name', 'mytemplate', '--machines'] + ['vm-{}'.format(x) for x in range(1, 11)] +
+             ['--summary', 'benchmark', 'template'],
+     'setup': _lab(10, portmaps=2)},
+    {'name': 'init-start-over',
+     'args': ['init', '--start-over'],
+     'setup': _lab(20)},
+    # tasks that take a while; once polled, and once pushed by a long-poll
+    {'name': 'delete-onefs-slow-tasks',
+     'args': ['delete', 'onefs', '--cluster', 'mycluster'],
+     'server': {'task_duration': 3},
+     'setup': _lab(6, component='OneFS', prefix='mycluster', portmaps=2)},
+    {'name': 'delete-onefs-slow-tasks-long-poll',
+     'args': ['delete', 'onefs', '--cluster', 'mycluster'],
+     'server': {'task_duration': 3, 'long_poll': True},
+     'setup': _lab(6, component='OneFS', prefix='mycluster', portmaps=2)},
+)
+
+
+def load_baselines(baseline_file=BASELINE_FILE):
+    """Read the numbers each scenario is compared to
+
+    :Returns: Dictionary
+
+    :param baseline_file: The JSON file that defines the per-scenario baselines
+    :type baseline_file: String
+    """
+    with open(baseline_file) as the_file:
+        return json.load(the_file)
+
+
+def run_scenario(scenario, rtt):
+    """Run one ``vlab`` command against a fresh fake vLab server
+
+    :Returns: Dictionary
+
+    :param scenario: What to run, how to set up the lab first, and optionally ``FakeVLab`` arguments
+    :type scenario: Dictionary
+
+    :param rtt: The simulated network round trip time, in seconds
+    :type rtt: Float
+    """
+    config = configparser.ConfigParser()
+    for section in CONFIG_SECTIONS:
+        config[section] = {'agent': 'benchmark', 'location': '/bin/true'}
+    with FakeVLab(latency=rtt, username=USERNAME, **scenario.get('server', {})) as server:
+        scenario['setup'](server)
+        server.calls.clear()
+        server.stats.clear()
+        real_get_vlab_api = vlab._get_vlab_api
+
+        def get_vlab_api(ctx, *args):
+            # The CLI only talks HTTPS to vLab; the fake server is plain HTTP
+            ctx.obj.vlab_url = server.url
+            return real_get_vlab_api(ctx, *args)
+
+        # Every command runs in a new process in real life, so don't reuse connections
+        api._sessions.clear()
+        # Keep tasks on the fake server out of the real task journal
+        journal_dir = tempfile.mkdtemp()
+        fake_journal = partial(journal.TaskJournal, journal_file=os.path.join(journal_dir, 'tasks.jsonl'))
+        with patch.object(vlab, '_get_auth', return_value=('fake.token', {'username': USERNAME})), \
+             patch.object(vlab, '_get_vlab_api', get_vlab_api), \
+             patch.object(vlab, 'get_config', return_value=config), \
+             patch.object(agent, 'connect', return_value=None), \
+             patch.object(journal, 'TaskJournal', fake_journal):
+            started = time.perf_counter()
+            result = CliRunner().invoke(vlab.cli, GLOBAL_ARGS + scenario['args'], input=scenario.get('input'))
+            wall_ms = (time.perf_counter() - started) * 1000
+        shutil.rmtree(journal_dir, ignore_errors=True)
+        error = ''
+        if result.exit_code != 0:
+            if result.exception is not None and not isinstance(result.exception, SystemExit):
+                error = repr(result.exception)
+            else:
+                error = (result.output.strip().splitlines() or ['exit code {}'.format(result.exit_code)])[-1]
+        return {'wall_ms': round(wall_ms),
+                'requests': len(server.calls),
+                'bytes': server.stats['bytes_sent'] + server.stats['bytes_received'],
+                'error': error}
+
+
+def compare(name, measured, baselines):
+    """Find the ways a scenario got worse than its baseline
+
+    :Returns: List
+
+    :param name: The name of the scenario
+    :type name: String
+
+    :param measured: The numbers from running the scenario
+    :type measured: Dictionary
+
+    :param baselines: The parsed baseline file
+    :type baselines: Dictionary
+    """
+    baseline = baselines['scenarios'].get(name)
+    if baseline is None:
+        return ['{}: no baseline; run with --update-baselines'.format(name)]
+    regressions = []
+    for metric, tolerance in baselines['tolerance'].items():
+        allowed = baseline[metric] * (1 + tolerance)
+        if measured[metric] > allowed:
+            regressions.append('{}: {} went from {} to {} (allowed {:.0f})'.format(name, metric, baseline[metric],
+                                                                                   measured[metric], allowed))
+    return regressions
+
+
+@click.command()
+@click.option('--baseline-file', default=BASELINE_FILE, show_default=True,
+              help='The JSON file that defines the per-scenario baselines')
+@click.option('-s', '--scenario', 'only', multiple=True,
+              help='Only run scenarios that start with this, i.e. "create"')
+@click.option('--update-baselines', is_flag=True,
+              help='Save the measured numbers as the new baselines, instead of comparing to them')
+def main(baseline_file, only, update_baselines):
+    """Benchmark vlab commands against a fake vLab server"""
+    baselines = load_baselines(baseline_file)
+    rtt = baselines['rtt_ms'] / 1000.0
+    scenarios = [x for x in SCENARIOS if not only or any(x['name'].startswith(o) for o in only)]
+    rows = []
+    failures = []
+    for scenario in scenarios:
+        measured = run_scenario(scenario, rtt)
+        baseline = baselines['scenarios'].get(scenario['name'], {})
+        rows.append([scenario['name'], measured['wall_ms'], measured['requests'], measured['bytes'],
+                     baseline.get('wall_ms', '-'), baseline.get('requests', '-'), baseline.get('bytes', '-')])
+        if measured['error']:
+            failures.append('{}: {}'.format(scenario['name'], measured['error']))
+        elif update_baselines:
+            baselines['scenarios'][scenario['name']] = {x: measured[x] for x in ('wall_ms', 'requests', 'bytes')}
+        else:
+            failures += compare(scenario['name'], measured, baselines)
+    header = ['Scenario', 'Wall (ms)', 'Requests', 'Bytes', 'Baseline wall (ms)', 'Baseline requests', 'Baseline bytes']
+    click.echo(tabulate(rows, headers=header, tablefmt='presto', disable_numparse=True))
+    if failures:
+        click.echo('\nFailed {} of {} scenarios:'.format(len(failures), len(rows)))
+        for failure in failures:
+            click.echo('\t{}'.format(failure))
+        sys.exit(1)
+    if update_baselines:
+        with open(baseline_file, 'w') as the_file:
+            json.dump(baselines, the_file, indent=4, sort_keys=True)
+            the_file.write('\n')
+        click.echo('\nSaved new baselines to {}'.format(baseline_file))
+    else:
+        click.echo('\nAll {} scenarios are within their baselines'.format(len(rows)))
+
+
+if __name__ == '__main__':
+    main()
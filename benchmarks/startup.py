@@ -0,0 +1,248 @@
+# -*- coding: UTF-8 -*-
+"""
+Measures how long it takes the vLab CLI to start up.
+
+Every ``vlab`` command pays the cost of starting Python and importing the CLI
+before it does anything useful. This harness runs the help page of every
+command in a fresh interpreter, records the wall-clock time, breaks down the
+import cost of the "usual suspect" modules via ``python -X importtime``, and
+fails when any command exceeds its millisecond budget.
+
+Help pages are normally answered from the command manifest, without importing
+the commands at all. That hides what the commands cost to import, and every
+other invocation pays that cost, so the budgets (and the import breakdown) are
+for running with the manifest turned off. The manifest path is measured too,
+against ``manifest_budget_ms``; build the manifest first with
+``python -m vlab_cli.lib.manifest``.
+
+Budgets live in ``startup_budgets.json`` next to this file. Run it with::
+
+    python -m benchmarks.startup
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import importlib
+import configparser
+import statistics
+import subprocess
+
+import click
+from tabulate import tabulate
+
+from vlab_cli.lib.manifest import NO_MANIFEST_VAR, load_manifest
+from vlab_cli.lib.configurizer import CONFIG_SECTIONS
+
+
+BUDGET_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'startup_budgets.json')
+# Mimics the console_scripts entry point, without needing the package installed
+ENTRY_POINT = 'import sys; sys.argv[0] = "vlab"; from vlab_cli.vlab import main; main()'
+TIMEOUT = 30
+
+
+def load_budgets(budget_file=BUDGET_FILE):
+    """Read the benchmark configuration
+
+    :Returns: Dictionary
+
+    :param budget_file: The JSON file that defines the per-command budgets
+    :type budget_file: String
+    """
+    with open(budget_file) as the_file:
+        return json.load(the_file)
+
+
+def write_config(home):
+    """Save a valid config file, so commands like ``vlab connect`` don't prompt for one
+
+    :Returns: None
+
+    :param home: The home directory of the child processes
+    :type home: String
+    """
+    config = configparser.ConfigParser()
+    for section in CONFIG_SECTIONS:
+        config[section] = {'agent': 'benchmark', 'location': '/bin/true'}
+    os.makedirs(os.path.join(home, '.vlab'))
+    with open(os.path.join(home, '.vlab', 'config.ini'), 'w') as the_file:
+        config.write(the_file)
+
+
+def discover_commands():
+    """Find every ``vlab <verb> <component>`` help page worth measuring.
+
+    The lazy command tables are read directly, so finding the commands doesn't
+    import every component module.
+
+    :Returns: List
+    """
+    from vlab_cli.vlab import SUBCOMMANDS
+    from vlab_cli.subcommands.power import power
+
+    commands = [['--help'], ['status', '--help']]
+    for verb in ('create', 'delete', 'show', 'connect', 'apply'):
+        group = importlib.import_module('vlab_cli.subcommands.{}.base'.format(verb))
+        for component in sorted(group.SUBCOMMANDS.keys()):
+            commands.append([verb, component, '--help'])
+    for action in sorted(power.commands.keys()):
+        commands.append(['power', action, '--help'])
+    for name in sorted(SUBCOMMANDS.keys()):
+        if name not in ('status', 'create', 'delete', 'show', 'connect', 'apply', 'power'):
+            commands.append([name, '--help'])
+    return commands
+
+
+def run_command(args, env, importtime=False):
+    """Execute the vLab CLI in a fresh interpreter
+
+    :Returns: Tuple (elapsed milliseconds, subprocess.CompletedProcess)
+
+    :param args: The arguments to supply to ``vlab``
+    :type args: List
+
+    :param env: The environment variables for the child process
+    :type env: Dictionary
+
+    :param importtime: Set to True to have Python report the cost of every import
+    :type importtime: Boolean
+    """
+    cmd = [sys.executable]
+    if importtime:
+        cmd += ['-X', 'importtime']
+    cmd += ['-c', ENTRY_POINT] + list(args)
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, timeout=TIMEOUT, universal_newlines=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    return elapsed, proc
+
+
+def parse_importtime(stderr, tracked_modules):
+    """Pull the cumulative import cost of specific modules out of ``-X importtime`` output
+
+    Each line looks like ``import time: self [us] | cumulative | imported package``,
+    and the first time a package shows up is when its import cost is paid.
+
+    :Returns: Dictionary
+
+    :param stderr: The output from running Python with ``-X importtime``
+    :type stderr: String
+
+    :param tracked_modules: The top-level modules to report on
+    :type tracked_modules: List
+    """
+    costs = {x: 0.0 for x in tracked_modules}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            _, cumulative, module = line.split(':', 1)[1].split('|')
+            cumulative = int(cumulative)
+        except ValueError:
+            # the header line, or output from something that's not importtime
+            continue
+        module = module.strip()
+        if module in costs and not costs[module]:
+            costs[module] = cumulative / 1000.0
+    return costs
+
+
+def measure(args, env, repeat):
+    """Run a command several times
+
+    :Returns: Tuple (median milliseconds, error message)
+
+    :param args: The arguments to supply to ``vlab``
+    :type args: List
+
+    :param env: The environment variables for the child process
+    :type env: Dictionary
+
+    :param repeat: How many times to run the command
+    :type repeat: Integer
+    """
+    timings = []
+    for _ in range(repeat):
+        elapsed, proc = run_command(args, env)
+        if proc.returncode != 0:
+            error = (proc.stderr.strip().splitlines() or ['exit code {}'.format(proc.returncode)])[-1]
+            return float('nan'), error
+        timings.append(elapsed)
+    return statistics.median(timings), ''
+
+
+def benchmark(commands, budgets, env):
+    """Measure each command, with and without the manifest, and compare it to the allowed budgets
+
+    :Returns: Tuple (rows, failures)
+
+    :param commands: The different ``vlab`` arguments to benchmark
+    :type commands: List
+
+    :param budgets: The parsed benchmark configuration
+    :type budgets: Dictionary
+
+    :param env: The environment variables for the child processes
+    :type env: Dictionary
+    """
+    rows = []
+    failures = []
+    tracked = budgets['tracked_modules']
+    import_env = dict(env)
+    import_env[NO_MANIFEST_VAR] = '1'
+    for args in commands:
+        label = ' '.join(['vlab'] + args)
+        budget = budgets['budgets_ms'].get(label, budgets['default_budget_ms'])
+        median, error = measure(args, import_env, budgets['repeat'])
+        if not error:
+            manifest_median, error = measure(args, env, budgets['repeat'])
+        _, proc = run_command(args, import_env, importtime=True)
+        costs = parse_importtime(proc.stderr, tracked)
+        if error:
+            median = manifest_median = float('nan')
+            failures.append('{}: {}'.format(label, error))
+        else:
+            if median > budget:
+                failures.append('{}: {:.0f}ms exceeds budget of {}ms'.format(label, median, budget))
+            if manifest_median > budgets['manifest_budget_ms']:
+                failures.append('{}: {:.0f}ms with the manifest exceeds budget of {}ms'.format(
+                                label, manifest_median, budgets['manifest_budget_ms']))
+        rows.append([label, '{:.0f}'.format(median), budget, '{:.0f}'.format(manifest_median)] +
+                    ['{:.1f}'.format(costs[x]) for x in tracked])
+    return rows, failures
+
+
+@click.command()
+@click.option('--budget-file', default=BUDGET_FILE, show_default=True,
+              help='The JSON file that defines the per-command budgets')
+@click.option('-c', '--command', 'only', multiple=True,
+              help='Only benchmark commands that start with this, i.e. "vlab create"')
+def main(budget_file, only):
+    """Benchmark how long the vLab CLI takes to start"""
+    budgets = load_budgets(budget_file)
+    if load_manifest() is None:
+        click.echo('No manifest; the manifest timings are the same as the import timings', err=True)
+    commands = discover_commands()
+    if only:
+        commands = [x for x in commands if any(' '.join(['vlab'] + x).startswith(o) for o in only)]
+    with tempfile.TemporaryDirectory() as fake_home:
+        # Avoid using (or prompting for) a real auth token, and avoid updating
+        # real config files
+        env = dict(os.environ, HOME=fake_home, USERPROFILE=fake_home)
+        write_config(fake_home)
+        rows, failures = benchmark(commands, budgets, env)
+    header = ['Command', 'Median (ms)', 'Budget (ms)', 'Manifest (ms)'] + \
+             ['{} (ms)'.format(x) for x in budgets['tracked_modules']]
+    click.echo(tabulate(rows, headers=header, tablefmt='presto'))
+    if failures:
+        click.echo('\nFailed {} of {} commands:'.format(len(failures), len(rows)))
+        for failure in failures:
+            click.echo('\t{}'.format(failure))
+        sys.exit(1)
+    click.echo('\nAll {} commands are within budget'.format(len(rows)))
+
+
+if __name__ == '__main__':
+    main()
@@ -12,6 +12,7 @@ setup(name="vlab-cli",
       author="Nicholas Willhite",
       version=version.__version__,
       packages=find_packages(),
+      package_data={'vlab_cli' : ['manifest.json']},
       classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: System Administrators',
@@ -24,7 +25,8 @@ setup(name="vlab-cli",
       ],
       description="Command Line Interface for vLab",
       long_description=open('README.rst').read(),
-      entry_points={'console_scripts' : 'vlab=vlab_cli.vlab:cli'},
+      entry_points={'console_scripts' : 'vlab=vlab_cli.vlab:main'},
       install_requires=['click', 'pyjwt', 'requests', 'tabulate', 'cryptography',
                         'colorama', 'beautifulsoup4', 'click-completion'],
+      extras_require={'http2': ['httpx[http2]']},
       )
@@ -26,11 +26,12 @@ setup(name="vlab-cli",
       ],
       description="Command Line Interface for vLab",
       long_description=open('README.rst').read(),
-      entry_points={'console_scripts' : 'vlab=vlab_cli.vlab:cli'},
+      entry_points={'console_scripts' : 'vlab=vlab_cli.vlab:main'},
       install_requires=['click', 'pyjwt', 'requests', 'tabulate', 'cryptography',
                         'colorama', 'beautifulsoup4'],
       executables = [Executable('vlab', base=None, icon='vlab_icon.ico')],
-      options = {'build_exe' : {'packages' : packages},
+      options = {'build_exe' : {'packages' : packages,
+                                'include_files' : [('vlab_cli/manifest.json', 'lib/vlab_cli/manifest.json')]},
                  'bdist_msi' : {'upgrade_code': '{4adf8ee9-526b-4b37-a9c3-c46f42de5a53}',
                                 'add_to_path': True,
                                 'all_users' : True,
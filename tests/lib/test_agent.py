@@ -0,0 +1,145 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.agent module
+"""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+import socket
+import threading
+from mock import MagicMock, patch
+
+import requests
+
+from vlab_cli.lib import agent
+
+
+@unittest.skipUnless(agent.supported(), 'Platform does not support Unix sockets')
+class TestAgent(unittest.TestCase):
+    """A suite of tests for the vLab agent"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmp_dir, 'agent.sock')
+        self.agent = threading.Thread(target=agent.run_agent,
+                                      args=(self.socket_path, 60, MagicMock()))
+        self.agent.start()
+        for _ in range(50):
+            if agent.ping(self.socket_path):
+                break
+            time.sleep(0.05)
+
+    def tearDown(self):
+        """Runs after every test case"""
+        agent.stop(self.socket_path)
+        self.agent.join()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_ping(self):
+        """agent - ``ping`` returns stats about a running agent"""
+        info = agent.ping(self.socket_path)
+
+        self.assertEqual(info['pid'], os.getpid())
+
+    def test_ping_not_running(self):
+        """agent - ``ping`` returns None when the agent isn't running"""
+        info = agent.ping(os.path.join(self.tmp_dir, 'nope.sock'))
+
+        self.assertTrue(info is None)
+
+    def test_connect_not_running(self):
+        """agent - ``connect`` returns None when the agent isn't running"""
+        session = agent.connect(os.path.join(self.tmp_dir, 'nope.sock'))
+
+        self.assertTrue(session is None)
+
+    def test_token(self):
+        """agent - the agent hands back tokens it's been given"""
+        contents = {'exp': time.time() + 3600, 'username': 'alice'}
+        agent.put_token('https://vlab.corp', 'aa.bb.cc', contents, socket_path=self.socket_path)
+        token, token_contents = agent.get_token('https://vlab.corp', socket_path=self.socket_path)
+
+        self.assertEqual(token, 'aa.bb.cc')
+        self.assertEqual(token_contents, contents)
+
+    def test_token_expiring(self):
+        """agent - the agent does not hand back tokens that are about to expire"""
+        contents = {'exp': time.time() + 60, 'username': 'alice'}
+        agent.put_token('https://vlab.corp', 'aa.bb.cc', contents, socket_path=self.socket_path)
+        token, _ = agent.get_token('https://vlab.corp', socket_path=self.socket_path)
+
+        self.assertTrue(token is None)
+
+    def test_forget_token(self):
+        """agent - ``forget_token`` makes the agent drop a token"""
+        contents = {'exp': time.time() + 3600, 'username': 'alice'}
+        agent.put_token('https://vlab.corp', 'aa.bb.cc', contents, socket_path=self.socket_path)
+        agent.forget_token('https://vlab.corp', socket_path=self.socket_path)
+        token, _ = agent.get_token('https://vlab.corp', socket_path=self.socket_path)
+
+        self.assertTrue(token is None)
+
+    def test_call_error(self):
+        """agent - connection errors in the agent are raised in the client"""
+        session = agent.connect(self.socket_path)
+
+        self.assertRaises(requests.exceptions.ConnectionError,
+                          session.get, 'http://127.0.0.1:1/api/1/inf/inventory', timeout=1)
+
+    def test_call_bad_kwargs(self):
+        """agent - AgentSession refuses arguments it can't send to the agent"""
+        session = agent.connect(self.socket_path)
+
+        self.assertRaises(ValueError, session.get, 'http://127.0.0.1:1', stream=True)
+
+
+@unittest.skipUnless(agent.supported(), 'Platform does not support Unix sockets')
+class TestAgentTimeout(unittest.TestCase):
+    """A suite of tests for an agent that stops answering"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        from vlab_cli.testing.fake_server import FakeVLab
+
+        self.server = FakeVLab()
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        # accepts connections, but never answers
+        socket_path = os.path.join(self.tmp_dir, 'agent.sock')
+        self.wedged = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.wedged.bind(socket_path)
+        self.wedged.listen(5)
+        self.addCleanup(self.wedged.close)
+        self.session = agent.AgentSession(socket_path)
+        patcher = patch.object(agent, 'CALL_TIMEOUT_SLACK', 0.1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_call_timeout(self):
+        """agent - ``call_timeout`` is the request's timeout, plus some slack"""
+        self.assertEqual(agent.call_timeout(2), 2.1)
+        self.assertEqual(agent.call_timeout([1, 2]), 3.1)
+        self.assertEqual(agent.call_timeout(None), agent.CALL_TIMEOUT)
+
+    def test_fallback(self):
+        """agent - a GET the agent doesn't answer is made directly"""
+        resp = self.session.get('{}/api/1/quota'.format(self.server.url), timeout=0.1)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertFalse(self.session.use_agent)
+
+    def test_fallback_post(self):
+        """agent - a POST the agent doesn't answer is not sent again"""
+        self.assertRaises(requests.exceptions.ConnectionError, self.session.post,
+                          '{}/api/2/inf/gateway'.format(self.server.url), timeout=0.1)
+        self.assertEqual(self.server.calls, [])
+        self.assertFalse(self.session.use_agent)
+
+
+if __name__ == '__main__':
+    unittest.main()
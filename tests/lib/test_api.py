@@ -0,0 +1,210 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.api module
+"""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from mock import MagicMock, patch
+
+import click
+import requests
+
+from vlab_cli.lib import api, polling
+
+
+def make_response(status_code=200):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = b'{"content": {}, "error": null}'
+    return resp
+
+
+class TestBulk(unittest.TestCase):
+    """A suite of tests for vLabApi.bulk"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.session = MagicMock()
+        self.vlab_api = api.vLabApi(server='https://vlab.corp', token='aa.bb.cc',
+                                    log=MagicMock(), session=self.session)
+
+    def test_order(self):
+        """vLabApi - ``bulk`` returns results in the same order as the calls"""
+        def slow_get(url, **kwargs):
+            # the first call finishes last
+            time.sleep(0.05 if url.endswith('vm1') else 0)
+            resp = make_response()
+            resp.url = url
+            return resp
+        self.session.get.side_effect = slow_get
+        results = self.vlab_api.bulk([('get', '/api/1/vm1'), ('get', '/api/1/vm2')])
+        urls = [x.response.url for x in results]
+
+        self.assertEqual(urls, ['https://vlab.corp/api/1/vm1', 'https://vlab.corp/api/1/vm2'])
+
+    def test_errors(self):
+        """vLabApi - ``bulk`` collects errors per call, instead of stopping"""
+        self.session.delete.side_effect = [make_response(), make_response(404)]
+        results = self.vlab_api.bulk([('delete', '/api/1/ipam/portmap', {'json': {'conn_port': 1}}),
+                                      ('delete', '/api/1/ipam/portmap', {'json': {'conn_port': 2}})],
+                                     max_workers=1)
+
+        self.assertTrue(results[0].error is None)
+        self.assertTrue(isinstance(results[1].error, click.ClickException))
+
+    def test_empty(self):
+        """vLabApi - ``bulk`` supports an empty batch"""
+        self.assertEqual(self.vlab_api.bulk([]), [])
+
+    def test_raise_on_errors(self):
+        """raise_on_errors - raises one exception for every failed call"""
+        results = [api.BulkResult(make_response(), None),
+                   api.BulkResult(None, click.ClickException('doh')),
+                   api.BulkResult(None, click.ClickException('oops'))]
+        with self.assertRaises(click.ClickException) as caught:
+            api.raise_on_errors(results)
+
+        self.assertTrue('2 of 3' in caught.exception.message)
+
+    def test_raise_on_errors_ok(self):
+        """raise_on_errors - does nothing when every call worked"""
+        api.raise_on_errors([api.BulkResult(make_response(), None)])
+
+
+
+class TestSessions(unittest.TestCase):
+    """A suite of tests for the HTTP sessions used to talk to vLab"""
+
+    def test_get_session(self):
+        """get_session - the same session is used for every call to a server"""
+        session = api.get_session('https://vlab.corp/api/2/auth/token')
+
+        self.assertTrue(api.get_session('https://vlab.corp') is session)
+
+    def test_get_session_servers(self):
+        """get_session - different servers use different sessions"""
+        session = api.get_session('https://vlab.corp')
+
+        self.assertFalse(api.get_session('https://other.vlab.corp') is session)
+
+    def test_pool_size(self):
+        """new_session - the connection pool is as big as the number of concurrent calls"""
+        session = api.new_session('https://vlab.corp', pool_size=25)
+        adapter = session.get_adapter('https://vlab.corp')
+
+        self.assertEqual(adapter._pool_maxsize, 25)
+
+    def test_ssl_context(self):
+        """SSLContextAdapter - every adapter shares one TLS context"""
+        adapter1 = api.SSLContextAdapter()
+        adapter2 = api.SSLContextAdapter()
+
+        self.assertTrue(adapter1.poolmanager.connection_pool_kw['ssl_context'] is
+                        adapter2.poolmanager.connection_pool_kw['ssl_context'])
+
+
+class TestBlockOnTasks(unittest.TestCase):
+    """A suite of tests for block_on_tasks and iter_tasks"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.session = MagicMock()
+        self.vlab_api = api.vLabApi(server='https://vlab.corp', token='aa.bb.cc',
+                                    log=MagicMock(), session=self.session)
+
+    def test_concurrent(self):
+        """block_on_tasks - every unfinished task is checked at once"""
+        def slow_get(url, **kwargs):
+            time.sleep(0.2)
+            return make_response()
+        self.session.get.side_effect = slow_get
+        tasks = {'node-{}'.format(x): '/api/2/inf/onefs/task/{}'.format(x) for x in range(6)}
+        started = time.time()
+        info = api.block_on_tasks(self.vlab_api, tasks)
+
+        self.assertEqual(sorted(info.keys()), sorted(tasks.keys()))
+        self.assertTrue(time.time() - started < 1)
+
+    def test_iter_tasks(self):
+        """iter_tasks - yields each task as soon as it's done"""
+        def slow_get(url, **kwargs):
+            # node-1 finishes last
+            time.sleep(0.1 if url.endswith('/1') else 0)
+            return make_response()
+        self.session.get.side_effect = slow_get
+        tasks = {'node-1': '/api/2/inf/onefs/task/1', 'node-2': '/api/2/inf/onefs/task/2'}
+        done = [x for x, _ in api.iter_tasks(self.vlab_api, tasks)]
+
+        self.assertEqual(done, ['node-2', 'node-1'])
+
+    @patch.object(api.time, 'sleep')
+    def test_method(self, fake_sleep):
+        """block_on_tasks - creating and deleting on the same end point are learned apart"""
+        history_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, history_dir)
+        history = polling.TaskHistory(history_file=os.path.join(history_dir, 'task_history.json'))
+        history.record('POST /api/2/inf/onefs', 600)
+        vlab_api = api.vLabApi(server='https://vlab.corp', token='aa.bb.cc', log=MagicMock(),
+                               session=self.session, task_history=history)
+        tasks = {'node-1': '/api/2/inf/onefs/task/1'}
+        self.session.get.side_effect = [make_response(202), make_response()]
+        api.block_on_tasks(vlab_api, tasks, method='DELETE')
+        delete_delay = fake_sleep.call_args[0][0]
+        self.session.get.side_effect = [make_response(202), make_response()]
+        api.block_on_tasks(vlab_api, tasks, method='POST')
+        create_delay = fake_sleep.call_args[0][0]
+
+        self.assertTrue(delete_delay < 1)
+        self.assertEqual(create_delay, 5 * polling.EARLY_PAUSES)
+        self.assertTrue(history.expected('DELETE /api/2/inf/onefs') < 1)
+
+
+class TestDetach(unittest.TestCase):
+    """A suite of tests for not waiting on tasks (``vlab --no-wait``)"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.session = MagicMock()
+        self.vlab_api = api.vLabApi(server='https://vlab.corp', token='aa.bb.cc',
+                                    log=MagicMock(), session=self.session, detach=True)
+
+    @patch.object(api, 'Spinner')
+    def test_consume_task(self, fake_Spinner):
+        """consume_task - raises TasksDetached once a task that changes something is issued"""
+        resp = make_response(202)
+        resp._content = b'{"content": {"task-id": "asdf"}}'
+        self.session.post.return_value = resp
+
+        with self.assertRaises(api.TasksDetached) as caught:
+            api.consume_task(self.vlab_api, endpoint='/api/2/inf/onefs', message='testing')
+        self.assertEqual(caught.exception.handles,
+                         [{'task_id': 'asdf', 'status_url': 'https://vlab.corp/api/2/inf/onefs/task/asdf'}])
+        self.assertEqual(caught.exception.exit_code, 0)
+        self.assertFalse(self.session.get.called)
+
+    @patch.object(api, 'Spinner')
+    def test_consume_task_get(self, fake_Spinner):
+        """consume_task - still waits on tasks that only look things up"""
+        resp = make_response(202)
+        resp._content = b'{"content": {"task-id": "asdf"}}'
+        self.session.get.side_effect = [resp, make_response(200)]
+        resp = api.consume_task(self.vlab_api, endpoint='/api/2/inf/onefs', message='testing', method='GET')
+
+        self.assertEqual(resp.status_code, 200)
+
+    def test_block_on_tasks(self):
+        """block_on_tasks - raises TasksDetached with a handle for every task"""
+        tasks = {'node-1': '/api/2/inf/onefs/task/1'}
+
+        with self.assertRaises(api.TasksDetached) as caught:
+            api.block_on_tasks(self.vlab_api, tasks)
+        self.assertEqual(caught.exception.handles, [{'task_id': '1', 'name': 'node-1',
+                                                     'status_url': 'https://vlab.corp/api/2/inf/onefs/task/1'}])
+        self.assertFalse(self.session.get.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.async_api module
+"""
+import time
+import asyncio
+import unittest
+import threading
+from mock import MagicMock, patch
+
+import click
+
+from vlab_cli.lib import api, async_api
+
+
+class FakeApi(object):
+    """Stands in for vLabApi; every call to a task URL is done after ``polls`` checks"""
+    def __init__(self, polls=1, delay=0):
+        self.polls = polls
+        self.tracer = None
+        self.task_history = None
+        self.journal = None
+        self.detach = False
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self._lock = threading.Lock()
+
+    def _call(self, method, endpoint, auto_check=True, **kwargs):
+        with self._lock:
+            self.calls.append((method, endpoint))
+            self.in_flight += 1
+            self.most_in_flight = max(self.most_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        resp = MagicMock()
+        resp.from_cache = False
+        if '/task/' in endpoint:
+            checks = len([x for x in self.calls if x[1] == endpoint])
+            resp.status_code = 202 if checks <= self.polls else 200
+            resp.json.return_value = {'content': endpoint}
+        else:
+            resp.status_code = 202
+            resp.json.return_value = {'content': {'task-id': endpoint.split('/')[-1]}}
+        return resp
+
+    def get(self, endpoint, auto_check=True, **kwargs):
+        return self._call('get', endpoint, auto_check=auto_check, **kwargs)
+
+
+@patch.object(api, 'Spinner')
+class TestAsyncApi(unittest.TestCase):
+    """A suite of tests for the async_api module"""
+
+    def test_call(self, fake_Spinner):
+        """AsyncVLabApi - calls are made by the wrapped vLabApi"""
+        fake_api = FakeApi()
+        async def go():
+            with async_api.AsyncVLabApi(fake_api) as async_vlab:
+                return await async_vlab.get('/api/1/quota')
+        async_api.run(go())
+
+        self.assertEqual(fake_api.calls, [('get', '/api/1/quota')])
+
+    def test_concurrency(self, fake_Spinner):
+        """AsyncVLabApi - bounds how many calls are in flight"""
+        fake_api = FakeApi(delay=0.05)
+        async def go():
+            with async_api.AsyncVLabApi(fake_api, concurrency=3) as async_vlab:
+                await asyncio.gather(*[async_vlab.get('/api/1/quota') for _ in range(9)])
+        async_api.run(go())
+
+        self.assertEqual(fake_api.most_in_flight, 3)
+
+    def test_errors(self, fake_Spinner):
+        """AsyncVLabApi - errors from the API are raised in the coroutine"""
+        fake_api = MagicMock()
+        fake_api._call.side_effect = click.ClickException('doh')
+        async def go():
+            with async_api.AsyncVLabApi(fake_api) as async_vlab:
+                await async_vlab.post('/api/1/quota')
+
+        with self.assertRaises(click.ClickException):
+            async_api.run(go())
+
+    @patch.object(api.time, 'sleep')
+    def test_consume_task(self, fake_sleep, fake_Spinner):
+        """consume_task - polls the task until it's done"""
+        fake_api = FakeApi(polls=2)
+        async def go():
+            with async_api.AsyncVLabApi(fake_api) as async_vlab:
+                return await async_api.consume_task(async_vlab, '/api/2/inf/esxi', message=None, pause=1)
+        resp = async_api.run(go())
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(fake_api.calls), 4)
+
+    @patch.object(api.time, 'sleep')
+    def test_consume_task_timeout(self, fake_sleep, fake_Spinner):
+        """consume_task - raises ClickException if the task takes too long"""
+        fake_api = FakeApi(polls=100)
+        async def go():
+            with async_api.AsyncVLabApi(fake_api) as async_vlab:
+                return await async_api.consume_task(async_vlab, '/api/2/inf/esxi', message='hi', timeout=2, pause=1)
+
+        with self.assertRaises(click.ClickException):
+            async_api.run(go())
+
+    @patch.object(api.time, 'sleep')
+    def test_block_on_tasks(self, fake_sleep, fake_Spinner):
+        """block_on_tasks - returns the result of every task"""
+        fake_api = FakeApi(polls=1)
+        tasks = {'node-1': '/api/2/inf/onefs/task/1', 'node-2': '/api/2/inf/onefs/task/2'}
+        async def go():
+            with async_api.AsyncVLabApi(fake_api) as async_vlab:
+                return await async_api.block_on_tasks(async_vlab, tasks, pause=1, timeout=10)
+        info = async_api.run(go())
+
+        self.assertEqual(info, {'node-1': {'content': '/api/2/inf/onefs/task/1'},
+                                'node-2': {'content': '/api/2/inf/onefs/task/2'}})
+
+    def test_block_on_tasks_method(self, fake_Spinner):
+        """block_on_tasks - creating and deleting on the same end point are learned apart"""
+        fake_api = FakeApi(polls=1)
+        fake_api.task_history = MagicMock()
+        fake_api.task_history.expected.side_effect = {'POST /api/2/inf/onefs': 600}.get
+        tasks = {'node-1': '/api/2/inf/onefs/task/1'}
+        async def go():
+            with async_api.AsyncVLabApi(fake_api) as async_vlab:
+                return await async_api.block_on_tasks(async_vlab, tasks, method='DELETE')
+        with patch.object(api.time, 'sleep') as fake_sleep:
+            async_api.run(go())
+
+        self.assertTrue(fake_sleep.call_args[0][0] < 1)
+        args, _ = fake_api.task_history.record.call_args
+        self.assertEqual(args[0], 'DELETE /api/2/inf/onefs')
+
+    def test_run(self, fake_Spinner):
+        """run - works more than once, without an event loop already set up"""
+        async def go(x):
+            return x
+
+        self.assertEqual([async_api.run(go(1)), async_api.run(go(2))], [1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
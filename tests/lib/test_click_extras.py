@@ -0,0 +1,172 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.click_extras module
+"""
+import unittest
+
+import click
+from click.testing import CliRunner
+
+from vlab_cli import vlab
+from vlab_cli.lib import click_extras
+
+
+@click.command()
+def loaded():
+    """A command that's always loaded"""
+    click.echo('loaded')
+
+
+def factory(name):
+    """Builds a command named after the name it's loaded as"""
+    @click.command(name=name)
+    def built():
+        click.echo(name)
+    return built
+
+
+class TestLazyAliasedGroup(unittest.TestCase):
+    """A suite of tests for the LazyAliasedGroup object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        lazy = {'lazy': __name__ + '.loaded',
+                'lazy2': __name__ + '.loaded',
+                'built': __name__ + '.factory'}
+
+        @click.group(cls=click_extras.LazyAliasedGroup, lazy_subcommands=lazy, aliases={'l': 'built'})
+        def the_group():
+            pass
+
+        the_group.add_command(loaded)
+        self.group = the_group
+        self.runner = CliRunner()
+
+    def test_list_commands(self):
+        """LazyAliasedGroup - ``list_commands`` includes the unloaded commands"""
+        ctx = click.Context(self.group)
+        expected = ['built', 'lazy', 'lazy2', 'loaded']
+
+        self.assertEqual(self.group.list_commands(ctx), expected)
+
+    def test_not_loaded(self):
+        """LazyAliasedGroup - subcommands are not added until resolved"""
+        self.assertFalse('lazy' in self.group.commands)
+
+    def test_get_command(self):
+        """LazyAliasedGroup - ``get_command`` imports the subcommand"""
+        ctx = click.Context(self.group)
+        cmd = self.group.get_command(ctx, 'lazy')
+
+        self.assertTrue(cmd is loaded)
+        self.assertTrue('lazy' in self.group.commands)
+
+    def test_get_command_factory(self):
+        """LazyAliasedGroup - ``get_command`` calls a factory with the command name"""
+        result = self.runner.invoke(self.group, ['built'])
+
+        self.assertEqual(result.output, 'built\n')
+
+    def test_prefix_match(self):
+        """LazyAliasedGroup - partially typed commands resolve to lazy commands"""
+        result = self.runner.invoke(self.group, ['lazy2'])
+
+        self.assertEqual(result.output, 'loaded\n')
+
+    def test_too_many_matches(self):
+        """LazyAliasedGroup - an ambiguous prefix is an error"""
+        result = self.runner.invoke(self.group, ['la'])
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue('Too many matches' in result.output)
+
+    def test_alias(self):
+        """LazyAliasedGroup - an alias resolves to its command, even when the prefix is ambiguous"""
+        ctx = click.Context(self.group)
+        cmd = self.group.get_command(ctx, 'l')
+
+        self.assertEqual(cmd.name, 'built')
+
+    def test_vlab_aliases(self):
+        """LazyAliasedGroup - prefixes of vlab commands keep working once newer commands share them"""
+        ctx = click.Context(vlab.cli)
+        found = {x: vlab.cli.get_command(ctx, x).name for x in ('a', 'ap', 'sh', 't')}
+
+        self.assertEqual(found, {'a': 'apply', 'ap': 'apply', 'sh': 'show', 't': 'token'})
+
+    def test_command_path(self):
+        """LazyAliasedGroup - the full command that was run is saved in the context ``meta``"""
+        ctx = click.Context(self.group, info_name='vlab')
+        self.group.resolve_command(ctx, ['lazy2'])
+
+        self.assertEqual(ctx.meta[click_extras.COMMAND_PATH], 'vlab lazy2')
+
+    def test_unknown(self):
+        """LazyAliasedGroup - unknown commands do not resolve"""
+        ctx = click.Context(self.group)
+
+        self.assertTrue(self.group.get_command(ctx, 'nope') is None)
+
+
+class TestGlobalContext(unittest.TestCase):
+    """A suite of tests for the GlobalContext object"""
+
+    def test_attrs(self):
+        """GlobalContext - supplied key-word arguments become attributes"""
+        obj = click_extras.GlobalContext(foo=1)
+
+        self.assertEqual(obj.foo, 1)
+
+    def test_lazy(self):
+        """GlobalContext - lazy values are only created when accessed"""
+        calls = []
+        obj = click_extras.GlobalContext(lazy={'foo': lambda: calls.append(1) or 'bar'})
+
+        self.assertEqual(calls, [])
+        self.assertEqual(obj.foo, 'bar')
+
+    def test_lazy_once(self):
+        """GlobalContext - lazy values are only created once"""
+        calls = []
+        obj = click_extras.GlobalContext(lazy={'foo': lambda: calls.append(1) or 'bar'})
+        obj.foo
+        obj.foo
+
+        self.assertEqual(calls, [1])
+
+    def test_missing(self):
+        """GlobalContext - undefined attributes raise AttributeError"""
+        obj = click_extras.GlobalContext(foo=1)
+
+        self.assertRaises(AttributeError, getattr, obj, 'bar')
+
+    def test_setattr(self):
+        """GlobalContext - attributes can be replaced"""
+        obj = click_extras.GlobalContext(lazy={'foo': lambda: 'bar'})
+        obj.foo = 'baz'
+
+        self.assertEqual(obj.foo, 'baz')
+
+
+class TestMultiValue(unittest.TestCase):
+    """A suite of tests for the MultiValue option"""
+
+    def test_values(self):
+        """MultiValue - supplies every value up to the next option, as a tuple"""
+        seen = {}
+
+        @click.command()
+        @click.option('-m', '--machines', cls=click_extras.MultiValue)
+        @click.option('-s', '--summary', cls=click_extras.MultiValue)
+        def cmd(machines, summary):
+            seen['machines'] = machines
+            seen['summary'] = summary
+
+        result = CliRunner().invoke(cmd, ['-m', 'vm1', 'vm2', '-s', 'a', 'summary'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertEqual(seen, {'machines': ('vm1', 'vm2'), 'summary': ('a', 'summary')})
+
+
+if __name__ == '__main__':
+    unittest.main()
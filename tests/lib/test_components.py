@@ -0,0 +1,57 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.components module
+"""
+import unittest
+
+from vlab_cli.lib import components
+from vlab_cli.subcommands.show.base import GENERATED as SHOW
+from vlab_cli.subcommands.delete.base import GENERATED as DELETE
+from vlab_cli.subcommands.connect.base import GENERATED as CONNECT
+
+
+class TestComponents(unittest.TestCase):
+    """A suite of tests for the component registry"""
+
+    def test_get_component(self):
+        """components - ``get_component`` looks up components by the type the server reports"""
+        component = components.get_component('DataDomain')
+
+        self.assertTrue(component is components.COMPONENTS['dd'])
+
+    def test_get_component_unknown(self):
+        """components - ``get_component`` raises KeyError for unknown components"""
+        self.assertRaises(KeyError, components.get_component, 'nope')
+
+    def test_https_ports(self):
+        """components - ``https_ports`` includes management ports"""
+        self.assertEqual(components.https_ports(), {443, 7543, 8080, 9443})
+
+    def test_lazy_subcommands(self):
+        """components - ``lazy_subcommands`` points every command at the group's factory"""
+        found = components.lazy_subcommands('show', ['esxi'])
+        expected = {'esxi' : 'vlab_cli.subcommands.show.component.build'}
+
+        self.assertEqual(found, expected)
+
+    def test_show_entries(self):
+        """components - every generated ``show`` command has what it needs in the registry"""
+        for name in SHOW:
+            component = components.COMPONENTS[name]
+            self.assertTrue(component['images']['sort'] in (None, 'version', 'number'), name)
+
+    def test_delete_entries(self):
+        """components - every generated ``delete`` command has what it needs in the registry"""
+        for name in DELETE:
+            component = components.COMPONENTS[name]
+            self.assertTrue(component['article'] in ('a', 'an'), name)
+
+    def test_connect_entries(self):
+        """components - every generated ``connect`` command defaults to a protocol it supports"""
+        for name in CONNECT:
+            settings = components.COMPONENTS[name]['connect']
+            self.assertTrue(settings['default'] in settings['protocols'], name)
+
+
+if __name__ == '__main__':
+    unittest.main()
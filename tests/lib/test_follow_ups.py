@@ -0,0 +1,93 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.follow_ups module
+"""
+import json
+import unittest
+from mock import MagicMock, patch
+
+from vlab_cli.lib import follow_ups
+
+
+def _info(name, component='ESXi', ips=None):
+    ips = ['192.168.1.2', '10.1.1.2', 'fe80::1'] if ips is None else ips
+    return {name: {'meta': {'component': component}, 'ips': ips}}
+
+
+class TestFollowUp(unittest.TestCase):
+    """A suite of tests for the FollowUp object"""
+
+    def test_unknown(self):
+        """FollowUp - raises ValueError for an action it doesn't know"""
+        with self.assertRaises(ValueError):
+            follow_ups.FollowUp('make_coffee')
+
+    def test_round_trip(self):
+        """FollowUp - is the same once it's been through JSON"""
+        follow_up = follow_ups.FollowUp('delete_portmaps', names=['foo'])
+        again = follow_ups.FollowUp.from_dict(json.loads(json.dumps(follow_up.to_dict())))
+
+        self.assertEqual(again.id, follow_up.id)
+        self.assertEqual(again.to_dict(), follow_up.to_dict())
+
+    def test_from_dict_bad(self):
+        """FollowUp - from_dict raises ValueError for something that isn't a follow-up"""
+        with self.assertRaises(ValueError):
+            follow_ups.FollowUp.from_dict({'action': 'delete_portmaps'})
+
+    def test_unique_id(self):
+        """FollowUp - every follow-up has its own ID"""
+        first = follow_ups.FollowUp('destroy_lab')
+        second = follow_ups.FollowUp('destroy_lab')
+
+        self.assertNotEqual(first.id, second.id)
+
+    def test_run(self):
+        """FollowUp - run passes the results of the tasks, and its args, to the action"""
+        fake_delete_portmaps = MagicMock()
+        with patch.dict(follow_ups.FOLLOW_UPS, {'delete_portmaps': (fake_delete_portmaps, 'Delete')}):
+            follow_ups.FollowUp('delete_portmaps', names=['foo']).run('vlab_api', {'foo': {}})
+
+        fake_delete_portmaps.assert_called_with('vlab_api', {'foo': {}}, names=['foo'])
+
+
+class TestCreatePortmaps(unittest.TestCase):
+    """A suite of tests for the create_portmaps follow-up"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.vlab_api = MagicMock()
+        self.vlab_api.post.return_value.json.return_value = {'content': {'conn_port': 50000}}
+
+    def _posted(self):
+        return [(x[1]['json']['target_addr'], x[1]['json']['target_port']) for x in self.vlab_api.post.call_args_list]
+
+    def test_ipv4(self):
+        """create_portmaps - maps every IPv4 address of the VM"""
+        follow_ups.create_portmaps(self.vlab_api, _info('esxi1'), 'esxi1', protocols=['ssh'])
+
+        self.assertEqual(self._posted(), [('192.168.1.2', 22), ('10.1.1.2', 22)])
+
+    def test_first_only(self):
+        """create_portmaps - can map only the first IPv4 address"""
+        follow_ups.create_portmaps(self.vlab_api, _info('esxi1'), 'esxi1', protocols=['ssh'], first_only=True)
+
+        self.assertEqual(self._posted(), [('192.168.1.2', 22)])
+
+    def test_addrs(self):
+        """create_portmaps - maps the supplied addresses instead of the VM's"""
+        follow_ups.create_portmaps(self.vlab_api, _info('esxi1', ips=[]), 'esxi1', protocols=['ssh'],
+                                   addrs=['192.168.1.50'])
+
+        self.assertEqual(self._posted(), [('192.168.1.50', 22)])
+
+    def test_returns(self):
+        """create_portmaps - returns the connection port of every rule"""
+        output = follow_ups.create_portmaps(self.vlab_api, _info('esxi1', ips=['192.168.1.2']),
+                                            'esxi1', protocols=['ssh'])
+
+        self.assertEqual(output, {'192.168.1.2': {22: 50000}})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.http2 module
+"""
+import types
+import unittest
+from mock import MagicMock, patch
+
+import requests
+
+from vlab_cli.lib import http2
+
+
+def make_httpx():
+    """A stand-in for the httpx package, so these tests don't need it installed"""
+    fake = types.ModuleType('httpx')
+    fake.TransportError = type('TransportError', (Exception,), {})
+    fake.TimeoutException = type('TimeoutException', (fake.TransportError,), {})
+    fake.ConnectTimeout = type('ConnectTimeout', (fake.TimeoutException,), {})
+    fake.RemoteProtocolError = type('RemoteProtocolError', (fake.TransportError,), {})
+    fake.LocalProtocolError = type('LocalProtocolError', (fake.TransportError,), {})
+    fake.Limits = MagicMock()
+    fake.Timeout = lambda *args, **kwargs: ('Timeout', args, kwargs)
+    fake.Client = MagicMock()
+    return fake
+
+
+def make_httpx_response(http_version='HTTP/2'):
+    resp = MagicMock()
+    resp.status_code = 202
+    resp.reason_phrase = 'Accepted'
+    resp.url = 'https://vlab.corp/api/2/inf/onefs'
+    resp.headers = {'Link': '<https://vlab.corp/api/2/inf/onefs/task/asdf>; rel=status',
+                    'Content-Type': 'application/json'}
+    resp.content = b'{"content": {"task-id": "asdf"}}'
+    resp.http_version = http_version
+    return resp
+
+
+class TestHttp2Session(unittest.TestCase):
+    """A suite of tests for the Http2Session object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.httpx = make_httpx()
+        patcher = patch.dict('sys.modules', {'httpx': self.httpx})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = self.httpx.Client.return_value
+        self.fallback = MagicMock()
+        self.session = http2.Http2Session('https://vlab.corp', log=MagicMock(), fallback=self.fallback)
+
+    def test_response(self):
+        """Http2Session - returns a requests.Response the rest of the CLI understands"""
+        self.client.request.return_value = make_httpx_response()
+        resp = self.session.post('https://vlab.corp/api/2/inf/onefs', json={'name': 'node-1'}, verify=True)
+
+        self.assertTrue(isinstance(resp, requests.Response))
+        self.assertEqual(resp.json(), {'content': {'task-id': 'asdf'}})
+        self.assertEqual(resp.links['status']['url'], 'https://vlab.corp/api/2/inf/onefs/task/asdf')
+        self.assertTrue(self.session.use_http2)
+
+    def test_one_client(self):
+        """Http2Session - concurrent calls share one client (and connection)"""
+        self.client.request.return_value = make_httpx_response()
+        self.session.get('https://vlab.corp/api/1', verify=True)
+        self.session.get('https://vlab.corp/api/2', verify=True)
+
+        self.assertEqual(self.httpx.Client.call_count, 1)
+        _, kwargs = self.httpx.Client.call_args
+        self.assertTrue(kwargs['http2'])
+
+    def test_os_certs(self):
+        """Http2Session - verifies TLS with the same OS certificates as SSLContextAdapter"""
+        self.client.request.return_value = make_httpx_response()
+        with patch.object(http2, 'get_ssl_context') as fake_get_ssl_context:
+            self.session.get('https://vlab.corp/api/1', verify=True)
+
+        _, kwargs = self.httpx.Client.call_args
+        self.assertTrue(kwargs['verify'] is fake_get_ssl_context.return_value)
+
+    def test_http11_server(self):
+        """Http2Session - uses the HTTP/1.1 session once the server doesn't negotiate HTTP/2"""
+        self.client.request.return_value = make_httpx_response(http_version='HTTP/1.1')
+        self.session.get('https://vlab.corp/api/1', verify=True)
+        self.session.get('https://vlab.corp/api/1', verify=True)
+
+        self.assertFalse(self.session.use_http2)
+        self.assertEqual(self.client.request.call_count, 1)
+        self.assertEqual(self.fallback.request.call_count, 1)
+
+    def test_protocol_error(self):
+        """Http2Session - falls back to HTTP/1.1 when the HTTP/2 connection breaks"""
+        self.client.request.side_effect = self.httpx.RemoteProtocolError('doh')
+        self.session.get('https://vlab.corp/api/1', verify=True)
+
+        self.assertFalse(self.session.use_http2)
+        self.fallback.request.assert_called_with('GET', 'https://vlab.corp/api/1', verify=True, timeout=None)
+
+    def test_protocol_error_post(self):
+        """Http2Session - a request that changes things isn't sent again when the HTTP/2 connection breaks"""
+        self.client.request.side_effect = self.httpx.RemoteProtocolError('Server disconnected')
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.session.post('https://vlab.corp/api/2/inf/onefs', json={'name': 'node-1'}, verify=True)
+        self.assertFalse(self.session.use_http2)
+        self.assertFalse(self.fallback.request.called)
+
+    def test_timeout(self):
+        """Http2Session - calls only time out when they say so, like with requests"""
+        self.client.request.return_value = make_httpx_response()
+        self.session.get('https://vlab.corp/api/1', verify=True)
+        self.session.get('https://vlab.corp/api/1', verify=True, timeout=(3, 20))
+
+        _, kwargs = self.httpx.Client.call_args
+        self.assertTrue(kwargs['timeout'] is None)
+        timeouts = [x[1]['timeout'] for x in self.client.request.call_args_list]
+        self.assertEqual(timeouts, [('Timeout', (None,), {}), ('Timeout', (20,), {'connect': 3})])
+
+    def test_connection_error(self):
+        """Http2Session - network errors are raised as requests exceptions, so they can be retried"""
+        self.client.request.side_effect = self.httpx.ConnectTimeout('doh')
+
+        with self.assertRaises(requests.exceptions.ConnectTimeout):
+            self.session.get('https://vlab.corp/api/1', verify=True)
+
+    def test_unavailable(self):
+        """connect - returns None when httpx isn't installed"""
+        with patch.dict('sys.modules', {'httpx': None}):
+            self.assertTrue(http2.connect('https://vlab.corp', log=MagicMock()) is None)
+
+
+
+@unittest.skipUnless(http2.available(), 'needs the httpx and h2 packages')
+class TestHttp2FakeVLab(unittest.TestCase):
+    """A suite of tests for Http2Session against the fake vLab server"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        from vlab_cli.testing.fake_server import FakeVLab
+
+        self.server = FakeVLab(latency=0.3)
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.session = http2.Http2Session(self.server.url, log=MagicMock())
+        self.addCleanup(self.session.close)
+
+    def test_no_timeout(self):
+        """Http2Session - a slow call isn't cut off by a default timeout"""
+        import httpx
+
+        resp = self.session.get('{}/api/1/quota'.format(self.server.url), verify=False)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.session._client(False).timeout, httpx.Timeout(None))
+
+    def test_timeout(self):
+        """Http2Session - honors the timeout of a call"""
+        with self.assertRaises(requests.exceptions.ReadTimeout):
+            self.session.get('{}/api/1/quota'.format(self.server.url), verify=False, timeout=0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.http_cache module
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from mock import MagicMock
+
+import requests
+
+from vlab_cli.lib import http_cache
+
+
+def make_response(status_code=200, content=None, headers=None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.url = 'https://vlab.corp/api/2/inf/onefs/image'
+    resp.headers.update(headers or {})
+    resp._content = json.dumps(content or {'content': {'image': ['8.0.0.4']}}).encode()
+    return resp
+
+
+class TestHttpCache(unittest.TestCase):
+    """A suite of tests for the HttpCache object"""
+    url = 'https://vlab.corp/api/2/inf/onefs/image'
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = http_cache.HttpCache(user='alice', cache_dir=self.cache_dir)
+        self.cache._clock = MagicMock(return_value=1000)
+        self.log = MagicMock()
+
+    def tearDown(self):
+        """Runs after every test case"""
+        shutil.rmtree(self.cache_dir)
+
+    def test_ttl_for(self):
+        """HttpCache - only read-mostly end points are cached"""
+        self.assertEqual(self.cache.ttl_for('/api/2/inf/onefs/image'), 86400)
+        self.assertEqual(self.cache.ttl_for('/api/2/inf/deployment/image'), 3600)
+        self.assertTrue(self.cache.ttl_for('/api/2/inf/onefs') is None)
+        self.assertTrue(self.cache.ttl_for('/api/2/inf/gateway/task/asdf') is None)
+
+    def test_hit(self):
+        """HttpCache - a fresh answer is reused without calling the server"""
+        do_request = MagicMock(return_value=make_response())
+        self.cache.send('get', self.url, None, do_request, self.log)
+        resp = self.cache.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 1)
+        self.assertTrue(resp.from_cache)
+        self.assertEqual(resp.json(), {'content': {'image': ['8.0.0.4']}})
+
+    def test_per_user(self):
+        """HttpCache - users never see each others' answers"""
+        do_request = MagicMock(return_value=make_response())
+        self.cache.send('get', self.url, None, do_request, self.log)
+        bob = http_cache.HttpCache(user='bob', cache_dir=self.cache_dir)
+        bob.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 2)
+
+    def test_revalidate(self):
+        """HttpCache - a stale answer is revalidated with its ETag"""
+        do_request = MagicMock(return_value=make_response(headers={'ETag': '"v1"'}))
+        self.cache.send('get', self.url, None, do_request, self.log)
+        self.cache._clock.return_value = 1000 + 86401
+        do_request.return_value = make_response(status_code=304)
+        resp = self.cache.send('get', self.url, None, do_request, self.log)
+
+        do_request.assert_called_with({'If-None-Match': '"v1"'})
+        self.assertTrue(resp.from_cache)
+        self.assertEqual(resp.status_code, 200)
+
+    def test_task(self):
+        """HttpCache - the result of a task is saved as the answer of the URL that issued the task"""
+        task = make_response(status_code=202, content={'content': {'task-id': 'asdf'}})
+        do_request = MagicMock(side_effect=[task, make_response()])
+        self.cache.send('get', self.url, None, do_request, self.log)
+        self.cache.send('get', self.url + '/task/asdf', None, do_request, self.log)
+        resp = self.cache.send('get', self.url, None, do_request, self.log)
+
+        self.assertTrue(resp.from_cache)
+        self.assertEqual(resp.json(), {'content': {'image': ['8.0.0.4']}})
+
+    def test_invalidate(self):
+        """HttpCache - changing an end point throws away the answers it affects"""
+        url = 'https://vlab.corp/api/1/quota'
+        do_request = MagicMock(return_value=make_response())
+        self.cache.send('get', url, None, do_request, self.log)
+        self.cache.send('post', 'https://vlab.corp/api/2/inf/onefs', None, do_request, self.log)
+        resp = self.cache.send('get', url, None, do_request, self.log)
+
+        self.assertFalse(getattr(resp, 'from_cache', False))
+
+    def test_evict(self):
+        """HttpCache - the least recently used answers are deleted when the cache is too big"""
+        self.cache._max_bytes = 1
+        do_request = MagicMock(return_value=make_response())
+        self.cache.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_private(self):
+        """HttpCache - only the user who saved the answers can read them"""
+        cache_dir = os.path.join(self.cache_dir, 'cache')
+        cache = http_cache.HttpCache(user='alice', cache_dir=cache_dir)
+        cache.send('get', self.url, None, MagicMock(return_value=make_response()), self.log)
+
+        self.assertEqual(os.stat(cache_dir).st_mode & 0o777, 0o700)
+
+    def test_unwritable(self):
+        """HttpCache - a cache that cannot be written doesn't break API calls"""
+        cache = http_cache.HttpCache(user='alice', cache_dir='/dev/null/cache')
+        resp = cache.send('get', self.url, None, MagicMock(return_value=make_response()), self.log)
+
+        self.assertEqual(resp.status_code, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,201 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.journal module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from mock import MagicMock
+
+import requests
+
+from vlab_cli.lib import api, journal
+
+
+class TestTaskJournal(unittest.TestCase):
+    """A suite of tests for the TaskJournal object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.journal_dir = tempfile.mkdtemp()
+        self.journal_file = os.path.join(self.journal_dir, 'vlab', 'tasks.jsonl')
+        self.journal = journal.TaskJournal(journal_file=self.journal_file)
+        self.now = [100]
+        self.journal._clock = lambda: self.now[0]
+
+    def tearDown(self):
+        """Runs after every test case"""
+        shutil.rmtree(self.journal_dir)
+
+    def _issue(self, task_id, server='https://vlab.corp'):
+        self.journal.issued(server, 'post', '/api/2/inf/onefs', task_id,
+                            '{}/api/2/inf/onefs/task/{}'.format(server, task_id), 'some-request-id')
+        self.now[0] += 1
+
+    def test_issued(self):
+        """TaskJournal - a task that was issued, but not checked on, is unfinished"""
+        self._issue('asdf')
+        task = self.journal.tasks()[0]
+
+        self.assertEqual(task['task_id'], 'asdf')
+        self.assertEqual(task['method'], 'POST')
+        self.assertTrue(task['status'] is None)
+
+    def test_finished(self):
+        """TaskJournal - records how a task finished"""
+        self._issue('asdf')
+        self.journal.finished('asdf', 200)
+
+        self.assertEqual(self.journal.tasks()[0]['status'], 200)
+
+    def test_newest_first(self):
+        """TaskJournal - lists the newest tasks first"""
+        self._issue('first')
+        self._issue('second')
+
+        self.assertEqual([x['task_id'] for x in self.journal.tasks()], ['second', 'first'])
+
+    def test_server(self):
+        """TaskJournal - tasks can be limited to one vLab server"""
+        self._issue('asdf')
+        self._issue('hjkl', server='https://other.vlab.corp')
+
+        self.assertEqual([x['task_id'] for x in self.journal.tasks(server='https://vlab.corp')], ['asdf'])
+
+    def test_find(self):
+        """TaskJournal - finds a task by the start of its ID"""
+        self._issue('asdf1234')
+
+        self.assertEqual(self.journal.find('asdf')['task_id'], 'asdf1234')
+
+    def test_find_ambiguous(self):
+        """TaskJournal - raises KeyError when more than one task matches"""
+        self._issue('asdf1234')
+        self._issue('asdf5678')
+
+        with self.assertRaises(KeyError):
+            self.journal.find('asdf')
+
+    def test_compact(self):
+        """TaskJournal - only the newest tasks are kept once the journal is too big"""
+        self.journal = journal.TaskJournal(journal_file=self.journal_file, max_bytes=1024, keep=2)
+        self.journal._clock = lambda: self.now[0]
+        for idx in range(10):
+            self._issue('task{}'.format(idx))
+            self.journal.finished('task{}'.format(idx), 200)
+
+        self.assertTrue(len(self.journal.tasks()) < 10)
+        self.assertEqual(self.journal.tasks()[0]['status'], 200)
+
+    def test_follow_up(self):
+        """TaskJournal - records the work to do once a task is done"""
+        self._issue('asdf')
+        self.journal.follow_up('asdf', {'id': 'fu1', 'action': 'delete_portmaps', 'args': {'names': ['foo']}})
+        task = self.journal.tasks()[0]
+
+        self.assertEqual(task['follow_up']['action'], 'delete_portmaps')
+        self.assertFalse(task['followed_up'])
+
+    def test_followed_up(self):
+        """TaskJournal - records when a follow-up is done, for every task it's for"""
+        self._issue('asdf')
+        self._issue('hjkl')
+        for task_id in ('asdf', 'hjkl'):
+            self.journal.follow_up(task_id, {'id': 'fu1', 'action': 'delete_portmaps', 'args': {}})
+        self.journal.followed_up('fu1')
+
+        self.assertEqual([x['followed_up'] for x in self.journal.tasks()], [True, True])
+
+    def test_no_follow_up(self):
+        """TaskJournal - most tasks have no follow-up"""
+        self._issue('asdf')
+        task = self.journal.tasks()[0]
+
+        self.assertTrue(task['follow_up'] is None)
+        self.assertFalse(task['followed_up'])
+
+    def test_task_id_of(self):
+        """task_id_of - pulls the task ID out of a status URL"""
+        self.assertEqual(journal.task_id_of('https://vlab.corp/api/2/inf/onefs/task/asdf'), 'asdf')
+        self.assertTrue(journal.task_id_of('https://vlab.corp/api/2/inf/onefs') is None)
+
+
+class TestJournaledApi(unittest.TestCase):
+    """A suite of tests for how vLabApi keeps the journal up to date"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.session = MagicMock()
+        self.journal = MagicMock()
+        self.vlab_api = api.vLabApi(server='https://vlab.corp', token='aa.bb.cc', log=MagicMock(),
+                                    session=self.session, journal=self.journal)
+
+    def test_issued(self):
+        """vLabApi - records the tasks that change things"""
+        resp = requests.Response()
+        resp.status_code = 202
+        resp._content = b'{"content": {"task-id": "asdf"}}'
+        self.session.post.return_value = resp
+        self.vlab_api.post('/api/2/inf/onefs', json={'name': 'node-1'})
+
+        args, _ = self.journal.issued.call_args
+        self.assertEqual(args[1:5], ('post', '/api/2/inf/onefs', 'asdf', 'https://vlab.corp/api/2/inf/onefs/task/asdf'))
+
+    def _issue(self):
+        resp = requests.Response()
+        resp.status_code = 202
+        resp._content = b'{"content": {"task-id": "asdf"}}'
+        self.session.post.return_value = resp
+        self.vlab_api.post('/api/2/inf/onefs', json={'name': 'node-1'})
+
+    def _check(self, status_code, task_id='asdf'):
+        resp = requests.Response()
+        resp.status_code = status_code
+        resp._content = b'{"content": {}}'
+        self.session.get.return_value = resp
+        self.vlab_api.get('/api/2/inf/onefs/task/{}'.format(task_id))
+
+    def test_finished(self):
+        """vLabApi - records when a task is done"""
+        self._issue()
+        self._check(200)
+
+        self.journal.finished.assert_called_once_with('asdf', 200)
+
+    def test_finished_once(self):
+        """vLabApi - a task is only recorded as done once, no matter how often it's checked"""
+        self._issue()
+        self._check(202)
+        self._check(202)
+        self._check(200)
+        self._check(200)
+
+        self.assertEqual(self.journal.finished.call_count, 1)
+
+    def test_finished_untracked(self):
+        """vLabApi - checking on a task this command didn't issue doesn't write to the journal"""
+        self._check(200)
+
+        self.assertFalse(self.journal.finished.called)
+
+    def test_track_task(self):
+        """vLabApi - tasks issued by an earlier command can be recorded as done"""
+        self.vlab_api.track_task('hjkl')
+        self._check(200, task_id='hjkl')
+
+        self.journal.finished.assert_called_once_with('hjkl', 200)
+
+    def test_reads(self):
+        """vLabApi - tasks that only look things up are not recorded"""
+        resp = requests.Response()
+        resp.status_code = 202
+        resp._content = b'{"content": {"task-id": "asdf"}}'
+        self.session.get.return_value = resp
+        self.vlab_api.get('/api/2/inf/onefs')
+
+        self.assertFalse(self.journal.issued.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.manifest module
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from io import StringIO
+from mock import patch
+
+import click
+
+from vlab_cli.lib import manifest
+from vlab_cli.lib.click_extras import AliasedGroup, HiddenOption
+
+
+@click.group(cls=AliasedGroup, context_settings=dict(help_option_names=['-h', '--help']))
+@click.option('--vlab-url', default='https://vlab.corp', help='The URL')
+@click.option('--vlab-username', default='alice', show_default=True, help='The user')
+@click.option('--verbose', is_flag=True, help='More output')
+def fake_cli(vlab_url, vlab_username, verbose):
+    """A fake CLI"""
+    pass
+
+
+@fake_cli.group(cls=AliasedGroup, aliases={'e': 'esxi'})
+def create():
+    """Create things"""
+    pass
+
+
+@create.command()
+@click.option('-n', '--name', help='The name')
+@click.option('-p', '--protocol', type=click.Choice(['ssh', 'https']), help='The protocol')
+@click.option('--secret', cls=HiddenOption)
+def esxi(name, protocol, secret):
+    """Create ESXi"""
+    pass
+
+
+@create.command()
+def esrs():
+    """Create ESRS"""
+    pass
+
+
+class TestManifest(unittest.TestCase):
+    """A suite of tests for building and using the command manifest"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Runs once before all test cases"""
+        cls.manifest = manifest.build_manifest(fake_cli)
+        cls.root = cls.manifest['command']
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manifest_file = os.path.join(self.tmp_dir, 'manifest.json')
+        with open(self.manifest_file, 'w') as the_file:
+            json.dump(self.manifest, the_file)
+
+    def tearDown(self):
+        """Runs after every test case"""
+        shutil.rmtree(self.tmp_dir)
+
+    def test_build(self):
+        """manifest - ``build_manifest`` describes every command"""
+        self.assertEqual(sorted(self.root['commands']['create']['commands'].keys()), ['esrs', 'esxi'])
+
+    def test_build_username(self):
+        """manifest - ``build_manifest`` does not save the username of the person who built it"""
+        self.assertTrue(manifest.USER_MARKER in self.root['help'])
+        self.assertFalse('alice' in self.root['help'])
+
+    def test_build_restores_default(self):
+        """manifest - ``build_manifest`` puts the default username back"""
+        username = [x for x in fake_cli.params if x.name == 'vlab_username'][0]
+
+        self.assertEqual(username.default, 'alice')
+
+    def test_resolve(self):
+        """manifest - ``resolve`` skips options, and their values"""
+        node, remaining = manifest.resolve(self.root, ['--vlab-url', 'foo', 'create', 'esxi', '-n', 'bar'])
+
+        self.assertEqual(node['short_help'], 'Create ESXi')
+        self.assertEqual(remaining, [])
+
+    def test_resolve_prefix(self):
+        """manifest - ``resolve`` supports partially typed commands"""
+        node, _ = manifest.resolve(self.root, ['cr', 'esx'])
+
+        self.assertEqual(node['short_help'], 'Create ESXi')
+
+    def test_resolve_ambiguous(self):
+        """manifest - ``resolve`` gives up on ambiguous commands"""
+        node, _ = manifest.resolve(self.root, ['create', 'es'])
+
+        self.assertTrue(node is None)
+
+    def test_resolve_alias(self):
+        """manifest - ``resolve`` follows aliases, even for ambiguous prefixes"""
+        node, _ = manifest.resolve(self.root, ['create', 'e'])
+
+        self.assertEqual(node['short_help'], 'Create ESXi')
+
+    def test_resolve_unknown_option(self):
+        """manifest - ``resolve`` gives up on unknown options"""
+        node, _ = manifest.resolve(self.root, ['--nope', 'create'])
+
+        self.assertTrue(node is None)
+
+    def test_choices_commands(self):
+        """manifest - ``get_choices`` completes subcommand names"""
+        choices = manifest.get_choices(self.root, ['create'], 'es')
+        expected = [('esrs', 'Create ESRS'), ('esxi', 'Create ESXi')]
+
+        self.assertEqual(choices, expected)
+
+    def test_choices_option_values(self):
+        """manifest - ``get_choices`` completes the values of a Choice option"""
+        choices = manifest.get_choices(self.root, ['create', 'esxi', '-p'], 'h')
+
+        self.assertEqual(choices, [('https', None)])
+
+    def test_choices_options(self):
+        """manifest - ``get_choices`` completes options, but not hidden ones"""
+        choices = [x for x, _ in manifest.get_choices(self.root, ['create', 'esxi'], '--')]
+
+        self.assertEqual(choices, ['--name', '--protocol', '--help'])
+
+    def test_serve_help(self):
+        """manifest - ``serve_from_manifest`` prints the help of the right command"""
+        with patch('sys.stdout', new_callable=StringIO) as fake_stdout:
+            served = manifest.serve_from_manifest(['create', 'esxi', '-h'], environ={},
+                                                  manifest_file=self.manifest_file)
+
+        self.assertTrue(served)
+        self.assertTrue(fake_stdout.getvalue().startswith('Usage: vlab create esxi'))
+
+    def test_serve_not_help(self):
+        """manifest - ``serve_from_manifest`` ignores everything that isn't help or tab-completion"""
+        served = manifest.serve_from_manifest(['create', 'esxi'], environ={},
+                                              manifest_file=self.manifest_file)
+
+        self.assertFalse(served)
+
+    def test_serve_no_manifest(self):
+        """manifest - ``serve_from_manifest`` lets the CLI handle things without a manifest"""
+        served = manifest.serve_from_manifest(['-h'], environ={},
+                                              manifest_file=os.path.join(self.tmp_dir, 'nope.json'))
+
+        self.assertFalse(served)
+
+    def test_serve_manifest_disabled(self):
+        """manifest - ``serve_from_manifest`` lets the CLI handle everything when the manifest is turned off"""
+        served = manifest.serve_from_manifest(['-h'], environ={'VLAB_NO_MANIFEST': '1'},
+                                              manifest_file=self.manifest_file)
+
+        self.assertFalse(served)
+
+    def test_serve_old_manifest(self):
+        """manifest - ``serve_from_manifest`` ignores a manifest from a different version"""
+        with open(self.manifest_file, 'w') as the_file:
+            json.dump(dict(self.manifest, version='0.0.1'), the_file)
+        served = manifest.serve_from_manifest(['-h'], environ={}, manifest_file=self.manifest_file)
+
+        self.assertFalse(served)
+
+    def test_serve_bash_completion(self):
+        """manifest - ``serve_from_manifest`` handles bash tab-completion"""
+        environ = {'_VLAB_COMPLETE': 'complete-bash', 'COMP_WORDS': 'vlab create es', 'COMP_CWORD': '2'}
+        with patch('sys.stdout', new_callable=StringIO) as fake_stdout:
+            served = manifest.serve_from_manifest([], environ=environ, manifest_file=self.manifest_file)
+
+        self.assertTrue(served)
+        self.assertEqual(fake_stdout.getvalue(), 'esrs\tesxi')
+
+    def test_serve_install_completion(self):
+        """manifest - ``serve_from_manifest`` lets click_completion install tab-completion"""
+        environ = {'_VLAB_COMPLETE': 'install-bash'}
+        served = manifest.serve_from_manifest([], environ=environ, manifest_file=self.manifest_file)
+
+        self.assertFalse(served)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.memo module
+"""
+import json
+import threading
+import unittest
+from mock import MagicMock
+
+import requests
+
+from vlab_cli.lib import memo
+
+
+def make_response(status_code=200, content=None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.url = 'https://vlab.corp/api/2/inf/onefs'
+    resp._content = json.dumps(content or {'content': {'node-1': {}, 'defaultGateway': {}}}).encode()
+    return resp
+
+
+class TestRequestMemo(unittest.TestCase):
+    """A suite of tests for the RequestMemo object"""
+    url = 'https://vlab.corp/api/2/inf/onefs'
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.memo = memo.RequestMemo()
+        self.log = MagicMock()
+
+    def test_reuse(self):
+        """RequestMemo - an identical GET is answered from memory"""
+        do_request = MagicMock(return_value=make_response())
+        first = self.memo.send('get', self.url, None, do_request, self.log)
+        second = self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 1)
+        self.assertFalse(first.from_cache)
+        self.assertTrue(second.from_cache)
+
+    def test_params(self):
+        """RequestMemo - GETs with different query parameters are different answers"""
+        do_request = MagicMock(return_value=make_response())
+        self.memo.send('get', self.url, {'name': 'a'}, do_request, self.log)
+        self.memo.send('get', self.url, {'name': 'b'}, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 2)
+
+    def test_copies(self):
+        """RequestMemo - changing the JSON of one answer doesn't change the others"""
+        do_request = MagicMock(return_value=make_response())
+        first = self.memo.send('get', self.url, None, do_request, self.log)
+        first.json()['content'].pop('defaultGateway')
+        second = self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertTrue('defaultGateway' in second.json()['content'])
+
+    def test_json_decoded_once(self):
+        """RequestMemo - each answer only decodes its JSON once"""
+        do_request = MagicMock(return_value=make_response())
+        resp = self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertTrue(resp.json() is resp.json())
+
+    def test_coalesce(self):
+        """RequestMemo - identical GETs in flight at the same time make one HTTP request"""
+        release = threading.Event()
+        started = threading.Event()
+        calls = []
+
+        def do_request():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return make_response()
+
+        results = []
+        leader = threading.Thread(target=lambda: results.append(self.memo.send('get', self.url, None, do_request, self.log)))
+        leader.start()
+        started.wait(5)
+        follower = threading.Thread(target=lambda: results.append(self.memo.send('get', self.url, None, do_request, self.log)))
+        follower.start()
+        while not self.memo.stats['coalesced']:
+            follower.join(0.01)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(results), 2)
+
+    def test_coalesce_error(self):
+        """RequestMemo - a failed GET isn't remembered"""
+        do_request = MagicMock(side_effect=[requests.exceptions.ConnectionError('doh'), make_response()])
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.memo.send('get', self.url, None, do_request, self.log)
+        self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 2)
+
+    def test_invalidate_family(self):
+        """RequestMemo - changing a resource forgets answers from the same family of end points"""
+        do_request = MagicMock(return_value=make_response())
+        self.memo.send('get', self.url, None, do_request, self.log)
+        self.memo.send('get', 'https://vlab.corp/api/1/ipam/portmap', None, do_request, self.log)
+        self.memo.send('delete', self.url, None, do_request, self.log)
+        self.memo.send('get', self.url, None, do_request, self.log)
+        self.memo.send('get', 'https://vlab.corp/api/1/ipam/portmap', None, do_request, self.log)
+
+        # 2 GETs, the DELETE, and the forgotten onefs GET
+        self.assertEqual(do_request.call_count, 4)
+
+    def test_invalidate_power(self):
+        """RequestMemo - powering a VM on/off forgets every answer"""
+        do_request = MagicMock(return_value=make_response())
+        self.memo.send('get', self.url, None, do_request, self.log)
+        self.memo.send('post', 'https://vlab.corp/api/1/inf/power', None, do_request, self.log)
+        self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 3)
+
+    def test_task_result(self):
+        """RequestMemo - the result of a task is the answer to the GET that issued it"""
+        issued = make_response(status_code=202, content={'content': {'task-id': 'asdf'}})
+        do_request = MagicMock(side_effect=[issued, make_response()])
+        self.memo.send('get', self.url, None, do_request, self.log)
+        self.memo.send('get', '{}/task/asdf'.format(self.url), None, do_request, self.log)
+        resp = self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 2)
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.from_cache)
+
+    def test_clear(self):
+        """RequestMemo - clear forgets every answer"""
+        do_request = MagicMock(return_value=make_response())
+        self.memo.send('get', self.url, None, do_request, self.log)
+        self.memo.clear()
+        self.memo.send('get', self.url, None, do_request, self.log)
+
+        self.assertEqual(do_request.call_count, 2)
+
+    def test_family(self):
+        """family - is the first four parts of the path"""
+        self.assertEqual(memo.family('https://vlab.corp/api/2/inf/onefs/task/asdf'), '/api/2/inf/onefs')
+        self.assertEqual(memo.family('/api/1/ipam/portmap'), '/api/1/ipam/portmap')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.new_cli module
+"""
+import os
+import time
+import shutil
+import tempfile
+import unittest
+from mock import patch, MagicMock
+
+from vlab_cli import version
+from vlab_cli.lib import new_cli
+
+
+PAGE = b"""<html><body>
+<a href="/downloads/readme.txt">README</a>
+<a href="/downloads/vlab-cli-2020.5.21-amd64.msi">Download</a>
+</body></html>"""
+
+
+class TestUpdateCheck(unittest.TestCase):
+    """A suite of tests for the cached update check"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.tmp_dir = tempfile.mkdtemp()
+        stamp_file = os.path.join(self.tmp_dir, '.vlab', 'update_check.json')
+        self.patcher = patch.object(new_cli, 'UPDATE_CHECK_FILE', stamp_file)
+        self.patcher.start()
+
+    def tearDown(self):
+        """Runs after every test case"""
+        self.patcher.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_find_latest_version(self):
+        """new_cli - ``find_latest_version`` returns the version and URL of the package"""
+        expected = ('2020.5.21', '/downloads/vlab-cli-2020.5.21-amd64.msi')
+
+        self.assertEqual(new_cli.find_latest_version(PAGE), expected)
+
+    def test_find_latest_version_missing(self):
+        """new_cli - ``find_latest_version`` returns empty strings when there's no package"""
+        self.assertEqual(new_cli.find_latest_version(b'<html></html>'), ('', ''))
+
+    def test_read_stamp_missing(self):
+        """new_cli - ``read_stamp`` returns an empty dictionary when never checked"""
+        self.assertEqual(new_cli.read_stamp(), {})
+
+    def test_stamp_round_trip(self):
+        """new_cli - ``read_stamp`` returns what ``write_stamp`` saved"""
+        stamp = {'checked': 1234, 'version': '1.2.3', 'url': '/some/url'}
+        new_cli.write_stamp(stamp)
+
+        self.assertEqual(new_cli.read_stamp(), stamp)
+
+    @patch.object(new_cli, 'get_session')
+    def test_refresh_stamp(self, fake_get_session):
+        """new_cli - ``refresh_stamp`` saves the latest version"""
+        fake_get_session.return_value.get.return_value.content = PAGE
+        new_cli.refresh_stamp(MagicMock())
+
+        self.assertEqual(new_cli.read_stamp()['version'], '2020.5.21')
+
+    @patch.object(new_cli, 'get_session')
+    def test_refresh_stamp_error(self, fake_get_session):
+        """new_cli - ``refresh_stamp`` ignores errors"""
+        fake_get_session.return_value.get.side_effect = RuntimeError('testing')
+        new_cli.refresh_stamp(MagicMock())
+
+        self.assertEqual(new_cli.read_stamp(), {})
+
+    @patch.object(new_cli, 'get_session')
+    def test_refresh_stamp_no_retry(self, fake_get_session):
+        """new_cli - ``refresh_stamp`` makes one request, not a retried ``vlab_api`` call"""
+        fake_api = MagicMock()
+        fake_get_session.return_value.get.return_value.content = PAGE
+        new_cli.refresh_stamp(fake_api)
+
+        self.assertFalse(fake_api.get.called)
+        self.assertEqual(fake_get_session.return_value.get.call_count, 1)
+        _, kwargs = fake_get_session.return_value.get.call_args
+        self.assertEqual(kwargs['timeout'], new_cli.UPDATE_CHECK_TIMEOUT)
+
+    @patch.object(new_cli, 'prompt')
+    @patch.object(new_cli, 'refresh_stamp')
+    def test_fresh_stamp(self, fake_refresh_stamp, fake_prompt):
+        """new_cli - ``handle_updates`` does not refresh a recent stamp"""
+        new_cli.write_stamp({'checked': time.time(), 'version': version.__version__, 'url': ''})
+        new_cli.handle_updates(MagicMock(), None, skip_update_check=False)
+
+        self.assertFalse(fake_refresh_stamp.called)
+        self.assertFalse(fake_prompt.called)
+
+    @patch.object(new_cli, 'prompt')
+    @patch.object(new_cli, 'refresh_stamp')
+    def test_stale_stamp(self, fake_refresh_stamp, fake_prompt):
+        """new_cli - ``handle_updates`` refreshes an old stamp"""
+        new_cli.write_stamp({'checked': 0, 'version': version.__version__, 'url': ''})
+        new_cli.handle_updates(MagicMock(), None, skip_update_check=False)
+
+        self.assertTrue(fake_refresh_stamp.called)
+
+    @patch.object(new_cli, 'prompt')
+    @patch.object(new_cli, 'refresh_stamp')
+    def test_new_version(self, fake_refresh_stamp, fake_prompt):
+        """new_cli - ``handle_updates`` prompts the user when there's a new version"""
+        fake_prompt.return_value = False
+        new_cli.write_stamp({'checked': time.time(), 'version': '9999.1.1', 'url': ''})
+        new_cli.handle_updates(MagicMock(), None, skip_update_check=False)
+
+        self.assertTrue(fake_prompt.called)
+
+    @patch.object(new_cli, 'read_stamp')
+    def test_skip(self, fake_read_stamp):
+        """new_cli - ``handle_updates`` does nothing when told to skip the check"""
+        new_cli.handle_updates(MagicMock(), None, skip_update_check=True)
+
+        self.assertFalse(fake_read_stamp.called)
+
+
+if __name__ == '__main__':
+    unittest.main()
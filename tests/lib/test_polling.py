@@ -0,0 +1,127 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.polling module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from mock import MagicMock
+
+from vlab_cli.lib import polling
+
+
+class TestPoller(unittest.TestCase):
+    """A suite of tests for the Poller object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.now = [0]
+        self.clock = lambda: self.now[0]
+        self.no_jitter = lambda low, high: high
+
+    def test_backs_off(self):
+        """Poller - the pause between checks grows, up to the cap"""
+        poller = polling.Poller(timeout=60, pause=1, clock=self.clock, uniform=self.no_jitter)
+        delays = [round(poller.next_delay(), 3) for _ in range(6)]
+
+        self.assertEqual(delays, [0.25, 0.4, 0.64, 1, 1, 1])
+
+    def test_jitter(self):
+        """Poller - pauses are shortened at random"""
+        poller = polling.Poller(timeout=60, pause=1, clock=self.clock, uniform=lambda low, high: low)
+
+        self.assertEqual(poller.next_delay(), 0.2)
+
+    def test_timeout(self):
+        """Poller - times out once it's slept for the timeout, even if the clock doesn't move"""
+        poller = polling.Poller(timeout=2, pause=1, clock=self.clock, uniform=self.no_jitter)
+        delays = []
+        while not poller.timed_out:
+            delays.append(poller.next_delay())
+
+        self.assertEqual(round(sum(delays), 3), 2)
+
+    def test_timeout_clock(self):
+        """Poller - times out once the clock says the timeout has passed"""
+        poller = polling.Poller(timeout=2, pause=1, clock=self.clock)
+        self.now[0] = 2
+
+        self.assertTrue(poller.timed_out)
+
+    def test_expected(self):
+        """Poller - checks less until a task is almost done, then checks often"""
+        poller = polling.Poller(timeout=600, pause=5, expected=100, clock=self.clock, uniform=self.no_jitter)
+        delays = [round(poller.next_delay(), 3) for _ in range(5)]
+
+        self.assertEqual(delays, [30, 30, 20, 0.25, 0.4])
+
+    def test_long_poll(self):
+        """Poller - checks again right away once the server holds checks open"""
+        poller = polling.Poller(timeout=60, pause=5, clock=self.clock, uniform=self.no_jitter)
+        resp = MagicMock()
+        resp.headers = {'Preference-Applied': 'wait=20'}
+        poller.checked(resp)
+
+        self.assertEqual(poller.headers(), {'Prefer': 'wait=20'})
+        self.assertEqual(poller.next_delay(), 0)
+
+    def test_long_poll_fallback(self):
+        """Poller - backs off like normal when the server ignores the long-poll"""
+        poller = polling.Poller(timeout=60, pause=5, clock=self.clock, uniform=self.no_jitter)
+        resp = MagicMock()
+        resp.headers = {}
+        poller.checked(resp)
+
+        self.assertEqual(poller.next_delay(), 0.25)
+
+
+class TestTaskHistory(unittest.TestCase):
+    """A suite of tests for the TaskHistory object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.history_dir = tempfile.mkdtemp()
+        self.history_file = os.path.join(self.history_dir, 'vlab', 'task_history.json')
+        self.history = polling.TaskHistory(history_file=self.history_file, weight=0.5)
+
+    def tearDown(self):
+        """Runs after every test case"""
+        shutil.rmtree(self.history_dir)
+
+    def test_unknown(self):
+        """TaskHistory - a task never seen before has no typical duration"""
+        self.assertTrue(self.history.expected('POST /api/2/inf/onefs') is None)
+
+    def test_record(self):
+        """TaskHistory - the typical duration moves toward the latest duration"""
+        self.history.record('POST /api/2/inf/onefs', 100)
+        self.history.record('POST /api/2/inf/onefs', 200)
+
+        self.assertEqual(self.history.expected('POST /api/2/inf/onefs'), 150)
+
+    def test_save(self):
+        """TaskHistory - durations are remembered by the next command"""
+        self.history.record('POST /api/2/inf/onefs', 100)
+        self.history.save()
+        history = polling.TaskHistory(history_file=self.history_file)
+
+        self.assertEqual(history.expected('POST /api/2/inf/onefs'), 100)
+
+
+class TestTaskKey(unittest.TestCase):
+    """A suite of tests for the task_key function"""
+
+    def test_endpoint(self):
+        """task_key - groups tasks by HTTP method and end point"""
+        self.assertEqual(polling.task_key('/api/2/inf/onefs', 'post'), 'POST /api/2/inf/onefs')
+
+    def test_task_url(self):
+        """task_key - a task URL is grouped with the end point that issued it"""
+        key = polling.task_key('https://vlab.corp/api/2/inf/onefs/task/asdf-1234')
+
+        self.assertEqual(key, '/api/2/inf/onefs')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.portmap_helpers module
+"""
+import unittest
+from mock import MagicMock
+
+import click
+
+from vlab_cli.lib import portmap_helpers
+from vlab_cli.lib.api import BulkResult
+
+
+def _answer(ports):
+    resp = MagicMock()
+    resp.json.return_value = {'content': {'ports': ports, 'gateway_ip': '10.1.1.1'}}
+    return BulkResult(resp, None)
+
+
+class TestPortmapLookups(unittest.TestCase):
+    """A suite of tests for looking up, and deleting, port mapping rules"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.vlab_api = MagicMock()
+
+    def test_query_portmaps(self):
+        """query_portmaps - returns the whole answer of each VM, in order"""
+        self.vlab_api.bulk.return_value = [_answer({'5000': {}}), _answer({})]
+        found = portmap_helpers.query_portmaps(self.vlab_api, ['vm1', 'vm2'])
+
+        self.assertEqual(found[0]['gateway_ip'], '10.1.1.1')
+        self.assertEqual([x['ports'] for x in found], [{'5000': {}}, {}])
+
+    def test_target_port(self):
+        """query_portmaps - can limit the rules to one port on the VM"""
+        self.vlab_api.bulk.return_value = [_answer({})]
+        portmap_helpers.query_portmaps(self.vlab_api, ['vm1'], target_port=22)
+        calls = self.vlab_api.bulk.call_args[0][0]
+
+        self.assertEqual(calls, [('get', '/api/1/ipam/portmap', {'params': {'name': 'vm1', 'target_port': 22}})])
+
+    def test_lookup_portmaps(self):
+        """lookup_portmaps - returns only the rules of each VM"""
+        self.vlab_api.bulk.return_value = [_answer({'5000': {}})]
+
+        self.assertEqual(portmap_helpers.lookup_portmaps(self.vlab_api, ['vm1']), [{'5000': {}}])
+
+    def test_errors(self):
+        """query_portmaps - raises ClickException if a lookup failed"""
+        self.vlab_api.bulk.return_value = [BulkResult(None, click.ClickException('doh'))]
+
+        with self.assertRaises(click.ClickException):
+            portmap_helpers.query_portmaps(self.vlab_api, ['vm1'])
+
+    def test_delete_portmaps(self):
+        """delete_portmaps - deletes every rule of every VM"""
+        self.vlab_api.bulk.side_effect = [[_answer({'5000': {}}), _answer({'5001': {}})],
+                                          [BulkResult(MagicMock(), None)] * 2]
+        portmap_helpers.delete_portmaps(self.vlab_api, ['vm1', 'vm2'])
+        deletes = self.vlab_api.bulk.call_args[0][0]
+
+        self.assertEqual([x[2]['json']['conn_port'] for x in deletes], [5000, 5001])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.ratelimit module
+"""
+import unittest
+from mock import MagicMock
+
+import requests
+
+from vlab_cli.lib import ratelimit
+
+
+def make_response(status_code):
+    """Create a fake HTTP response"""
+    resp = requests.Response()
+    resp.status_code = status_code
+    return resp
+
+
+class TestTokenBucket(unittest.TestCase):
+    """A suite of tests for the TokenBucket object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.now = [0]
+        self.bucket = ratelimit.TokenBucket(rate=2, burst=2, clock=lambda: self.now[0])
+
+    def test_burst(self):
+        """TokenBucket - allows a burst without waiting"""
+        self.assertEqual([self.bucket.reserve() for _ in range(2)], [0, 0])
+
+    def test_waits_in_line(self):
+        """TokenBucket - callers past the burst wait their turn"""
+        waits = [self.bucket.reserve() for _ in range(4)]
+
+        self.assertEqual(waits, [0, 0, 0.5, 1.0])
+
+    def test_refills(self):
+        """TokenBucket - tokens come back over time, up to the burst"""
+        for _ in range(2):
+            self.bucket.reserve()
+        self.now[0] = 100
+
+        self.assertEqual([self.bucket.reserve() for _ in range(3)], [0, 0, 0.5])
+
+
+class TestRateLimiter(unittest.TestCase):
+    """A suite of tests for the RateLimiter object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.limiter = ratelimit.RateLimiter(read_rate=10, write_rate=4, burst=1, min_rate=1, increase=1)
+        self.now = [0]
+        self.slept = []
+        for bucket in self.limiter._buckets.values():
+            bucket._clock = lambda: self.now[0]
+            bucket._updated = 0
+        self.limiter._sleep = self.slept.append
+
+    def test_separate_budgets(self):
+        """RateLimiter - reads don't use up the budget for writes"""
+        for _ in range(10):
+            self.limiter.send('get', lambda: make_response(200))
+        self.limiter.send('post', lambda: make_response(200))
+
+        self.assertEqual(self.slept, [])
+
+    def test_throttles(self):
+        """RateLimiter - waits once the budget is used up"""
+        for _ in range(5):
+            self.limiter.send('post', lambda: make_response(200))
+
+        self.assertEqual(self.slept, [0.25])
+        self.assertEqual(self.limiter.stats['throttled'], 1)
+
+    def test_slows_down(self):
+        """RateLimiter - halves the rate when the server is overloaded"""
+        self.limiter.send('post', lambda: make_response(503))
+        self.limiter.send('post', lambda: make_response(429))
+
+        self.assertEqual(self.limiter.bucket_for('post').rate, 1)
+
+    def test_speeds_up(self):
+        """RateLimiter - grows the rate back on success, up to the configured rate"""
+        self.limiter.send('post', lambda: make_response(503))
+        for _ in range(5):
+            self.limiter.send('post', lambda: make_response(200))
+
+        self.assertEqual(self.limiter.bucket_for('post').rate, 4)
+
+    def test_not_adaptive(self):
+        """RateLimiter - the rate never changes when adaptive is False"""
+        self.limiter.adaptive = False
+        self.limiter.send('post', lambda: make_response(503))
+
+        self.assertEqual(self.limiter.bucket_for('post').rate, 4)
+
+    def test_unlimited(self):
+        """RateLimiter - a rate of zero means the calls aren't paced"""
+        limiter = ratelimit.RateLimiter(read_rate=0, write_rate=0)
+        limiter._sleep = MagicMock()
+        for _ in range(100):
+            limiter.send('post', lambda: make_response(200))
+
+        self.assertFalse(limiter._sleep.called)
+        self.assertTrue(limiter.bucket_for('get') is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
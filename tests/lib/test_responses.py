@@ -0,0 +1,43 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.responses module
+"""
+import json
+import unittest
+
+import requests
+
+from vlab_cli.lib import responses
+
+
+class TestResponses(unittest.TestCase):
+    """A suite of tests for serializing HTTP responses"""
+
+    def test_round_trip(self):
+        """responses - a response survives being serialized and deserialized"""
+        resp = requests.Response()
+        resp.status_code = 202
+        resp.reason = 'ACCEPTED'
+        resp.url = 'https://vlab.corp/api/1/inf/inventory'
+        resp.headers['Link'] = '<https://vlab.corp/api/1/inf/inventory/task/asdf>; rel=status'
+        resp._content = b'{"content": {"task-id": "asdf"}}'
+        new_resp = responses.to_response(responses.from_response(resp))
+
+        self.assertEqual(new_resp.status_code, 202)
+        self.assertEqual(new_resp.json(), {'content': {'task-id': 'asdf'}})
+        self.assertEqual(new_resp.links['status']['url'], 'https://vlab.corp/api/1/inf/inventory/task/asdf')
+
+    def test_json_safe(self):
+        """responses - a serialized response can be encoded as JSON"""
+        resp = requests.Response()
+        resp.status_code = 200
+        resp.reason = 'OK'
+        resp.url = 'https://vlab.corp/api/1/quota'
+        resp._content = b'\xff\x00'
+        reply = json.loads(json.dumps(responses.from_response(resp)))
+
+        self.assertEqual(responses.to_response(reply).content, b'\xff\x00')
+
+
+if __name__ == '__main__':
+    unittest.main()
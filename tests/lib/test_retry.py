@@ -0,0 +1,164 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.retry module
+"""
+import unittest
+import threading
+from mock import MagicMock
+
+import requests
+
+from vlab_cli.lib import retry
+
+
+def make_response(status_code, headers=None):
+    """Create a fake HTTP response"""
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp.headers.update(headers or {})
+    return resp
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """A suite of tests for the RetryPolicy object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.policy = retry.RetryPolicy(retries=3, base_delay=1, max_delay=10, deadline=60)
+        self.now = [0]
+        self.slept = []
+        self.policy._clock = lambda: self.now[0]
+        self.policy._sleep = self._fake_sleep
+        # always pick the longest delay
+        self.policy._uniform = lambda low, high: high
+        self.log = MagicMock()
+
+    def _fake_sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now[0] += seconds
+
+    def send(self, method, responses):
+        """Make a call, where each attempt gets the next of the supplied responses"""
+        responses = list(responses)
+        def do_request():
+            result = responses.pop(0)
+            if isinstance(result, Exception):
+                raise result
+            return result
+        return self.policy.send(method, 'https://vlab.corp/api/1/inf/inventory', do_request, self.log)
+
+    def test_no_retry(self):
+        """RetryPolicy - successful calls are not retried"""
+        resp = self.send('get', [make_response(200)])
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.slept, [])
+
+    def test_retry_503(self):
+        """RetryPolicy - HTTP 503 is retried"""
+        resp = self.send('get', [make_response(503), make_response(503), make_response(200)])
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.policy.stats['retries'], 2)
+
+    def test_stats_threads(self):
+        """RetryPolicy - calls made from many threads are all counted"""
+        def worker():
+            for _ in range(200):
+                self.policy.send('get', 'https://vlab.corp/api/1/inf/inventory', lambda: make_response(200), self.log)
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.policy.stats['calls'], 1600)
+
+    def test_jitter(self):
+        """RetryPolicy - the delay grows by up to 3x, but is capped at ``max_delay``"""
+        self.send('get', [make_response(502)] * 4)
+
+        self.assertEqual(self.slept, [3, 9, 10])
+
+    def test_exhausted(self):
+        """RetryPolicy - returns the last response once out of retries"""
+        resp = self.send('get', [make_response(504)] * 4)
+
+        self.assertEqual(resp.status_code, 504)
+        self.assertEqual(self.policy.stats['exhausted'], 1)
+
+    def test_post_not_retried(self):
+        """RetryPolicy - POST is not retried when the server might have processed it"""
+        resp = self.send('post', [make_response(502), make_response(200)])
+
+        self.assertEqual(resp.status_code, 502)
+
+    def test_post_retried_503(self):
+        """RetryPolicy - POST is retried when the server refused to process it"""
+        resp = self.send('post', [make_response(503), make_response(200)])
+
+        self.assertEqual(resp.status_code, 200)
+
+    def test_connection_reset(self):
+        """RetryPolicy - connection errors are retried for idempotent calls"""
+        resp = self.send('get', [requests.exceptions.ConnectionError(), make_response(200)])
+
+        self.assertEqual(resp.status_code, 200)
+
+    def test_connection_reset_post(self):
+        """RetryPolicy - connection errors are raised for non-idempotent calls"""
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            self.send('post', [requests.exceptions.ConnectionError(), make_response(200)])
+
+    def test_connect_timeout_post(self):
+        """RetryPolicy - a POST that never connected is retried"""
+        resp = self.send('post', [requests.exceptions.ConnectTimeout(), make_response(200)])
+
+        self.assertEqual(resp.status_code, 200)
+
+    def test_retry_after(self):
+        """RetryPolicy - honors the Retry-After header"""
+        self.send('get', [make_response(503, {'Retry-After': '7'}), make_response(200)])
+
+        self.assertEqual(self.slept, [7])
+
+    def test_deadline(self):
+        """RetryPolicy - does not retry past the deadline"""
+        resp = self.send('get', [make_response(503, {'Retry-After': '120'}), make_response(200)])
+
+        self.assertEqual(resp.status_code, 503)
+        self.assertEqual(self.slept, [])
+        self.assertEqual(self.policy.stats['deadline_exceeded'], 1)
+
+    def test_overrides(self):
+        """RetryPolicy - the longest matching end point override is used"""
+        self.policy.overrides = {'/api/1': {'retries': 1}, '/api/1/inf': {'retries': 0}}
+        resp = self.send('get', [make_response(503), make_response(200)])
+
+        self.assertEqual(resp.status_code, 503)
+
+
+class TestRetryAfter(unittest.TestCase):
+    """A suite of tests for the ``retry_after`` function"""
+
+    def test_seconds(self):
+        """retry_after - supports a number of seconds"""
+        self.assertEqual(retry.retry_after(make_response(503, {'Retry-After': '5'})), 5)
+
+    def test_date(self):
+        """retry_after - a date in the past means don't wait"""
+        resp = make_response(503, {'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'})
+
+        self.assertEqual(retry.retry_after(resp), 0)
+
+    def test_garbage(self):
+        """retry_after - ignores values that make no sense"""
+        self.assertTrue(retry.retry_after(make_response(503, {'Retry-After': 'soon'})) is None)
+
+    def test_missing(self):
+        """retry_after - returns None when the header isn't set"""
+        self.assertTrue(retry.retry_after(make_response(503)) is None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.lib.tracing module
+"""
+import os
+import json
+import shutil
+import tempfile
+import unittest
+from mock import MagicMock
+
+import requests
+
+from vlab_cli.lib import api, tracing
+
+
+class FakeClock(object):
+    """A clock that only moves when told to"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTracer(unittest.TestCase):
+    """A suite of tests for the Tracer object"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.clock = FakeClock()
+        self.tracer = tracing.Tracer(clock=self.clock, wall_clock=lambda: 1000.0)
+
+    def test_template_endpoint(self):
+        """template_endpoint - replaces task IDs with a placeholder"""
+        templated = tracing.template_endpoint('https://vlab.corp/api/2/inf/onefs/task/8a3b5c2d-ff00-4d6a-a5bd-0a5ae41c9a01')
+
+        self.assertEqual(templated, '/api/2/inf/onefs/task/{task-id}')
+
+    def test_template_endpoint_names(self):
+        """template_endpoint - leaves regular words alone"""
+        self.assertEqual(tracing.template_endpoint('/api/2/inf/onefs/image'), '/api/2/inf/onefs/image')
+
+    def test_percentile(self):
+        """percentile - uses the nearest rank"""
+        values = list(range(1, 101))
+
+        self.assertEqual(tracing.percentile(values, 50), 50)
+        self.assertEqual(tracing.percentile(values, 95), 95)
+        self.assertEqual(tracing.percentile([], 95), 0.0)
+
+    def test_endpoint_stats(self):
+        """Tracer - groups API calls by method and templated end point"""
+        for task_id, duration in [('a1b2c3d4e5f6a7b8c9d0', 0.1), ('f1e2d3c4b5a6f7e8d9c0', 0.3)]:
+            started = self.clock()
+            self.clock.now += duration
+            self.tracer.record_request('get', '/api/2/inf/onefs/task/{}'.format(task_id), started, status=202)
+        stats = self.tracer.endpoint_stats()
+
+        self.assertEqual(len(stats), 1)
+        self.assertEqual(stats[0]['calls'], 2)
+        self.assertAlmostEqual(stats[0]['max'], 0.3)
+
+    def test_totals(self):
+        """Tracer - splits the elapsed time between the client, network and server"""
+        self.clock.now = 1.0
+        timer = tracing.TaskTimer(self.tracer, '/api/2/inf/onefs')
+        self.clock.now = 2.0
+        self.tracer.record_request('post', '/api/2/inf/onefs', 1.0, status=202)
+        timer.issued('asdf')
+        self.clock.now = 5.0
+        timer.done()
+        self.clock.now = 6.0
+        totals = self.tracer.totals()
+
+        self.assertEqual(totals['elapsed'], 6.0)
+        self.assertEqual(totals['network'], 1.0)
+        self.assertEqual(totals['server'], 3.0)
+        self.assertEqual(totals['client'], 2.0)
+
+    def test_to_otlp(self):
+        """Tracer - API calls for a task are children of the task's span"""
+        self.tracer.request_id = 'a' * 32
+        timer = tracing.TaskTimer(self.tracer, '/api/2/inf/onefs')
+        self.clock.now = 1.0
+        self.tracer.record_request('post', 'https://vlab.corp/api/2/inf/onefs', 0.0, status=202)
+        timer.issued('a1b2c3d4e5f6a7b8c9d0')
+        self.tracer.record_request('get', 'https://vlab.corp/api/2/inf/onefs/task/a1b2c3d4e5f6a7b8c9d0', 1.0, status=200)
+        self.tracer.record_request('get', 'https://vlab.corp/api/1/quota', 1.0, status=200)
+        timer.done()
+        spans = self.tracer.to_otlp('vlab create onefs')['resourceSpans'][0]['scopeSpans'][0]['spans']
+        root, task, post, poll, quota = spans
+
+        self.assertEqual(set(x['traceId'] for x in spans), set(['a' * 32]))
+        self.assertEqual(root['name'], 'vlab create onefs')
+        self.assertFalse('parentSpanId' in root)
+        self.assertEqual(task['parentSpanId'], root['spanId'])
+        self.assertEqual(post['parentSpanId'], task['spanId'])
+        self.assertEqual(poll['parentSpanId'], task['spanId'])
+        self.assertEqual(quota['parentSpanId'], root['spanId'])
+
+    def test_save_spans(self):
+        """Tracer - only the newest traces are kept"""
+        trace_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, trace_dir)
+        for name in ('20200101T000000-old.json', '20200102T000000-older.json'):
+            with open(os.path.join(trace_dir, name), 'w') as the_file:
+                the_file.write('{}')
+        tracer = tracing.Tracer()
+        tracer.request_id = 'b' * 32
+        saved = tracer.save_spans('vlab status', trace_dir=trace_dir, max_files=2)
+
+        self.assertEqual(sorted(os.listdir(trace_dir)), ['20200102T000000-older.json', os.path.basename(saved)])
+
+    def test_no_tracer(self):
+        """TaskTimer - does nothing when the command isn't traced"""
+        timer = tracing.TaskTimer(None, '/api/2/inf/onefs')
+        with timer.poll():
+            pass
+        timer.done()
+
+    def test_vlab_api(self):
+        """vLabApi - records every API call when given a Tracer"""
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = b'{"content": {}}'
+        session = MagicMock()
+        session.post.return_value = resp
+        vlab_api = api.vLabApi(server='https://vlab.corp', token='aa.bb.cc', log=MagicMock(),
+                               session=session, tracer=self.tracer)
+        vlab_api.post('/api/1/ipam/portmap', json={'target_port': 22})
+        record = self.tracer.requests[0]
+
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['sent'], len(json.dumps({'target_port': 22})))
+        self.assertEqual(record['received'], len(resp.content))
+
+
+if __name__ == '__main__':
+    unittest.main()
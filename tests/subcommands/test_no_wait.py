@@ -0,0 +1,223 @@
+# -*- coding: UTF-8 -*-
+"""
+Runs real commands with ``vlab --no-wait`` against the fake vLab server
+"""
+import os
+import shutil
+import tempfile
+import unittest
+import configparser
+from functools import partial
+from mock import patch
+
+from click.testing import CliRunner
+
+from vlab_cli import vlab
+from vlab_cli.lib import api, agent, journal
+from vlab_cli.lib.configurizer import CONFIG_SECTIONS
+from vlab_cli.subcommands import tasks, wait
+from vlab_cli.testing.fake_server import FakeVLab
+
+
+GLOBAL_ARGS = ['--no-scroll', '--skip-update-check', '--no-cache', '--vlab-username', 'alice']
+
+
+class TestNoWait(unittest.TestCase):
+    """A suite of tests for which commands take ``--no-wait``, and finishing them with ``vlab wait``"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.server = FakeVLab(username='alice')
+        self.server.start()
+        self.addCleanup(self.server.stop)
+        self.journal_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.journal_dir)
+        self.journal_file = os.path.join(self.journal_dir, 'tasks.jsonl')
+        config = configparser.ConfigParser()
+        for section in CONFIG_SECTIONS:
+            config[section] = {'agent': 'testing', 'location': '/bin/true'}
+        real_get_vlab_api = vlab._get_vlab_api
+
+        def get_vlab_api(ctx, *args):
+            # the fake server is plain HTTP
+            ctx.obj.vlab_url = self.server.url
+            return real_get_vlab_api(ctx, *args)
+
+        api._sessions.clear()
+        patches = [patch.object(vlab, '_get_auth', return_value=('fake.token', {'username': 'alice'})),
+                   patch.object(vlab, '_get_vlab_api', get_vlab_api),
+                   patch.object(vlab, 'get_config', return_value=config),
+                   patch.object(agent, 'connect', return_value=None),
+                   patch.object(journal, 'TaskJournal', partial(journal.TaskJournal, journal_file=self.journal_file)),
+                   patch.object(tasks, 'TaskJournal', partial(journal.TaskJournal, journal_file=self.journal_file)),
+                   patch.object(wait, 'TaskJournal', partial(journal.TaskJournal, journal_file=self.journal_file))]
+        for a_patch in patches:
+            a_patch.start()
+            self.addCleanup(a_patch.stop)
+
+    def _vlab(self, *args, input=None):
+        return CliRunner().invoke(vlab.cli, GLOBAL_ARGS + list(args), input=input)
+
+    def _tasks_issued(self):
+        return [x for x in self.server.calls if x[0] != 'GET']
+
+    def _handles(self, result):
+        return [x for x in result.output.splitlines() if x.startswith('{')]
+
+    def _portmaps(self, name):
+        return sorted((x['target_addr'], x['target_port']) for x in self.server.portmaps.values() if x['name'] == name)
+
+    def test_create(self):
+        """vlab --no-wait - creating a VM leaves its port mapping rules to vlab wait"""
+        started = self._vlab('--no-wait', 'create', 'esxi', '--name', 'esxi1')
+
+        self.assertEqual(started.exit_code, 0, started.output)
+        self.assertEqual(len(self._handles(started)), 1)
+        self.assertTrue('follow_up' in self._handles(started)[0])
+        self.assertEqual(self.server.portmaps, {})
+
+    def test_create_wait(self):
+        """vlab wait - creates the port mapping rules of a VM created with --no-wait"""
+        started = self._vlab('--no-wait', 'create', 'esxi', '--name', 'esxi1')
+        waited = self._vlab('wait', '-', input=started.output)
+        ip = self.server.vms['esxi1']['ips'][0]
+
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertEqual(self._portmaps('esxi1'), [(ip, 22), (ip, 443)])
+        self.assertTrue('Create port mapping rules: done' in waited.output)
+
+    def test_create_wait_once(self):
+        """vlab wait - the follow-up of a task only runs once"""
+        started = self._vlab('--no-wait', 'create', 'esxi', '--name', 'esxi1')
+        self._vlab('wait', '-', input=started.output)
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertEqual(len(self.server.portmaps), 2)
+
+    def test_create_parallel(self):
+        """vlab wait - finishes many creates started at once with --no-wait"""
+        handles = []
+        for idx in range(5):
+            started = self._vlab('--no-wait', 'create', 'esxi', '--name', 'esxi{}'.format(idx))
+            self.assertEqual(started.exit_code, 0, started.output)
+            handles.extend(self._handles(started))
+        waited = self._vlab('wait', '-', input='\n'.join(handles))
+
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        for idx in range(5):
+            self.assertEqual(len(self._portmaps('esxi{}'.format(idx))), 2)
+
+    def test_create_resume(self):
+        """vlab tasks resume - finishes the follow-up of a task started with --no-wait"""
+        self._vlab('--no-wait', 'create', 'esxi', '--name', 'esxi1')
+        resumed = self._vlab('tasks', 'resume')
+
+        self.assertEqual(resumed.exit_code, 0, resumed.output)
+        self.assertEqual(len(self._portmaps('esxi1')), 2)
+        self.assertTrue(journal.TaskJournal().tasks()[0]['followed_up'])
+
+    def test_create_failed(self):
+        """vlab wait - skips the follow-up of a task that failed"""
+        self.server.add_vm('esxi1', component='ESXi')
+        started = self._vlab('--no-wait', 'create', 'esxi', '--name', 'esxi1')
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertNotEqual(waited.exit_code, 0)
+        self.assertTrue('skipped' in waited.output)
+        self.assertEqual(self.server.portmaps, {})
+
+    def test_delete_wait(self):
+        """vlab wait - deletes the port mapping rules of a VM deleted with --no-wait"""
+        self.server.add_vm('centos1', component='CentOS', ips=['192.168.1.11'])
+        self.server.portmaps['50001'] = {'name': 'centos1', 'target_addr': '192.168.1.11',
+                                         'target_port': 22, 'component': 'CentOS'}
+        started = self._vlab('--no-wait', 'delete', 'centos', '--name', 'centos1')
+
+        self.assertEqual(started.exit_code, 0, started.output)
+        self.assertTrue('50001' in self.server.portmaps)
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertFalse('centos1' in self.server.vms)
+        self.assertEqual(self.server.portmaps, {})
+
+    def test_delete_onefs_wait(self):
+        """vlab wait - deletes the port mapping rules of a OneFS cluster deleted with --no-wait"""
+        for idx in (1, 2):
+            self.server.add_vm('mycluster-{}'.format(idx), component='OneFS', ips=['192.168.1.2{}'.format(idx)])
+            self.server.portmaps['5000{}'.format(idx)] = {'name': 'mycluster-{}'.format(idx), 'target_port': 22,
+                                                          'target_addr': '192.168.1.2{}'.format(idx),
+                                                          'component': 'OneFS'}
+        started = self._vlab('--no-wait', 'delete', 'onefs', '--cluster', 'mycluster')
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertEqual(started.exit_code, 0, started.output)
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertEqual(self.server.vms, {})
+        self.assertEqual(self.server.portmaps, {})
+        # one follow-up for both nodes
+        self.assertEqual(waited.output.count('Delete port mapping rules: done'), 1)
+
+    def test_create_onefs_wait(self):
+        """vlab wait - configures a OneFS cluster created with --no-wait"""
+        started = self._vlab('--no-wait', 'create', 'onefs', '--name', 'mycluster', '--image', '8.2.0',
+                             '--node-count', '2', '--external-ip-range', '192.168.1.20', '192.168.1.21',
+                             '--internal-ip-range', '10.9.9.1', '10.9.9.10')
+
+        self.assertEqual(started.exit_code, 0, started.output)
+        self.assertFalse(self.server.vms['mycluster-1']['meta'].get('configured'))
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertTrue(self.server.vms['mycluster-1']['meta'].get('configured'))
+        self.assertTrue(self.server.vms['mycluster-2']['meta'].get('configured'))
+        self.assertEqual(self._portmaps('mycluster-1'), [('192.168.1.20', 22), ('192.168.1.20', 8080)])
+        self.assertEqual(self._portmaps('mycluster-2'), [('192.168.1.21', 22), ('192.168.1.21', 8080)])
+
+    def test_delete_everything_wait(self):
+        """vlab wait - deletes a lab that was powered off with --no-wait"""
+        self.server.add_vm('centos1', component='CentOS')
+        started = self._vlab('--no-wait', 'delete', 'everything', input='y\ny\n')
+
+        self.assertEqual(started.exit_code, 0, started.output)
+        self.assertEqual(self.server.vms['centos1']['state'], 'poweredOff')
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertEqual(self.server.vms, {})
+        self.assertEqual(self.server.vlans, {})
+
+    def test_init_refused(self):
+        """vlab --no-wait - refuses to set up a lab, because vlab init asks questions along the way"""
+        result = self._vlab('--no-wait', 'init')
+
+        self.assertEqual(result.exit_code, 2)
+        self.assertTrue('--no-wait cannot be used with' in result.output)
+        self.assertEqual(self._tasks_issued(), [])
+
+    def test_create_onefs_skip_config(self):
+        """vlab --no-wait - a OneFS cluster that isn't configured is done once its nodes are"""
+        result = self._vlab('--no-wait', 'create', 'onefs', '--name', 'mycluster', '--image', '8.2.0',
+                            '--node-count', '2', '--internal-ip-range', '10.9.9.1', '10.9.9.10',
+                            '--skip-config')
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(len([x for x in result.output.splitlines() if x.startswith('{')]), 2)
+
+    def test_wait(self):
+        """vlab wait - finishes a command started with --no-wait"""
+        self.server.add_vm('centos1', component='CentOS', ips=['192.168.1.11'])
+        self.server.task_duration = 0.3
+        started = self._vlab('--no-wait', 'power', 'off', '--name', 'centos1')
+        waited = self._vlab('wait', '-', input=started.output)
+
+        self.assertEqual(started.exit_code, 0, started.output)
+        self.assertEqual(waited.exit_code, 0, waited.output)
+        self.assertTrue('finished' in waited.output)
+        self.assertEqual(self.server.vms['centos1']['state'], 'poweredOff')
+        self.assertEqual([x['status'] for x in journal.TaskJournal().tasks()], [200])
+
+
+if __name__ == '__main__':
+    unittest.main()
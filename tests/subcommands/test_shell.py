@@ -0,0 +1,137 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.subcommands.shell module
+"""
+import sys
+import unittest
+from mock import MagicMock, patch
+
+import click
+from click.testing import CliRunner
+
+from vlab_cli.subcommands import shell
+from vlab_cli.lib.click_extras import AliasedGroup, GlobalContext
+
+
+@click.group(cls=AliasedGroup)
+def fake_cli():
+    """A fake CLI"""
+    pass
+
+
+@fake_cli.command()
+def create():
+    """Makes a VM"""
+    click.echo('created')
+
+
+@fake_cli.command()
+def delete():
+    """Fails to delete a VM"""
+    raise click.ClickException('no such VM')
+
+
+@fake_cli.command()
+def status():
+    """Exits like some commands do"""
+    sys.exit(1)
+
+
+@fake_cli.command()
+def power():
+    """Has a bug"""
+    raise KeyError('state')
+
+
+fake_cli.add_command(shell.shell)
+
+
+class TestRunCommand(unittest.TestCase):
+    """A suite of tests for the run_command function"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.root_ctx = click.Context(fake_cli, info_name='vlab',
+                                      obj=GlobalContext(vlab_api=MagicMock(), log=MagicMock()))
+
+    def test_resolves_prefix(self):
+        """run_command - returns the name of the command a prefix resolved to"""
+        self.assertEqual(shell.run_command(self.root_ctx, ['cr']), 'create')
+
+    def test_clears_memo(self):
+        """run_command - every command starts without memoized answers"""
+        shell.run_command(self.root_ctx, ['create'])
+
+        self.assertTrue(self.root_ctx.obj.vlab_api.memo.clear.called)
+
+    def test_error(self):
+        """run_command - a failed command doesn't end the shell"""
+        self.assertEqual(shell.run_command(self.root_ctx, ['del']), 'delete')
+
+    def test_sys_exit(self):
+        """run_command - a command calling sys.exit doesn't end the shell"""
+        self.assertEqual(shell.run_command(self.root_ctx, ['status']), 'status')
+
+    def test_unexpected_error(self):
+        """run_command - an unexpected exception is logged and reported, not raised"""
+        with patch.object(shell.click, 'echo') as fake_echo:
+            cmd_name = shell.run_command(self.root_ctx, ['power'])
+
+        self.assertEqual(cmd_name, 'power')
+        self.assertTrue(self.root_ctx.obj.log.debug.called)
+        self.assertEqual(fake_echo.call_args[0][0], "Error: KeyError: 'state'")
+
+    def test_unknown(self):
+        """run_command - an unknown command is reported, not raised"""
+        self.assertTrue(shell.run_command(self.root_ctx, ['nope']) is None)
+
+    def test_nested_shell(self):
+        """run_command - refuses to start a shell inside the shell"""
+        self.assertTrue(shell.run_command(self.root_ctx, ['shell']) is None)
+
+    def test_help(self):
+        """run_command - help is not a command"""
+        self.assertTrue(shell.run_command(self.root_ctx, ['--help']) is None)
+
+
+@patch.object(shell, '_save_history')
+@patch.object(shell, '_setup_readline')
+@patch.object(shell, 'VMNames')
+class TestShell(unittest.TestCase):
+    """A suite of tests for the shell command"""
+
+    def run_shell(self, lines):
+        obj = GlobalContext(vlab_api=MagicMock(), log=MagicMock())
+        return CliRunner().invoke(fake_cli, ['shell'], obj=obj, input=''.join(x + '\n' for x in lines))
+
+    def test_exit(self, fake_VMNames, fake_setup_readline, fake_save_history):
+        """shell - stops at 'exit', and saves the command history"""
+        result = self.run_shell(['exit', 'create'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertFalse('created' in result.output)
+        self.assertTrue(fake_save_history.called)
+
+    def test_eof(self, fake_VMNames, fake_setup_readline, fake_save_history):
+        """shell - stops when stdin runs out"""
+        result = self.run_shell(['create'])
+
+        self.assertEqual(result.exit_code, 0)
+        self.assertTrue('created' in result.output)
+
+    def test_refresh(self, fake_VMNames, fake_setup_readline, fake_save_history):
+        """shell - reloads the VM names after an aliased command that changes them"""
+        self.run_shell(['cr', 'del'])
+
+        # once at startup, then after each command
+        self.assertEqual(fake_VMNames.return_value.refresh.call_count, 3)
+
+    def test_no_refresh(self, fake_VMNames, fake_setup_readline, fake_save_history):
+        """shell - doesn't reload the VM names after commands that can't change them"""
+        self.run_shell(['st', 'nope'])
+
+        self.assertEqual(fake_VMNames.return_value.refresh.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
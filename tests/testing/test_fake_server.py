@@ -0,0 +1,123 @@
+# -*- coding: UTF-8 -*-
+"""
+Unit tests for the vlab_cli.testing.fake_server module
+"""
+import unittest
+from mock import MagicMock, patch
+
+import click
+
+from vlab_cli.lib import api
+from vlab_cli.lib.retry import RetryPolicy
+from vlab_cli.testing import fake_server
+
+
+class TestFakeVLab(unittest.TestCase):
+    """A suite of tests for the FakeVLab object, driven by a real vLabApi"""
+
+    def setUp(self):
+        """Runs before every test case"""
+        self.server = fake_server.FakeVLab(seed=1)
+        self.server.start()
+        retry_policy = RetryPolicy()
+        retry_policy._sleep = MagicMock()
+        self.vlab_api = api.vLabApi(server=self.server.url, token='aa.bb.cc', log=MagicMock(),
+                                    session=api.new_session(self.server.url),
+                                    retry_policy=retry_policy)
+
+    def tearDown(self):
+        """Runs after every test case"""
+        self.vlab_api.close()
+        self.server.stop()
+
+    @patch.object(api, 'Spinner')
+    def test_task_protocol(self, fake_Spinner):
+        """FakeVLab - answers a task with 202, a task-id and a status link, then the result"""
+        self.server.add_vm('myCentOS')
+        self.server.task_duration = 0.3
+        resp = api.consume_task(self.vlab_api, endpoint='/api/1/inf/inventory', message='testing',
+                                method='GET', pause=1)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue('myCentOS' in resp.json()['content'])
+        self.assertTrue(self.server.stats['polls'] > 1)
+
+    @patch.object(api, 'Spinner')
+    def test_long_poll(self, fake_Spinner):
+        """FakeVLab - holds a check open until the task is done, when asked to"""
+        self.server.long_poll = True
+        self.server.task_duration = 0.3
+        resp = api.consume_task(self.vlab_api, endpoint='/api/1/inf/inventory', message='testing',
+                                method='GET', pause=1)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.server.stats['polls'], 1)
+
+    def test_status_link(self):
+        """FakeVLab - the Link header points at the task"""
+        resp = self.vlab_api.post('/api/2/inf/onefs/config', json={'name': 'nope'})
+        task_id = resp.json()['content']['task-id']
+
+        self.assertTrue(resp.links['status']['url'].endswith('/api/2/inf/onefs/config/task/{}'.format(task_id)))
+
+    @patch.object(api, 'Spinner')
+    def test_task_error(self, fake_Spinner):
+        """FakeVLab - a task that fails answers with the error once it's done"""
+        with self.assertRaises(click.ClickException):
+            api.consume_task(self.vlab_api, endpoint='/api/1/inf/snapshot', message='testing',
+                             body={'name': 'noSuchVM', 'shift': False})
+
+    @patch.object(api, 'Spinner')
+    def test_create_then_show(self, fake_Spinner):
+        """FakeVLab - VMs created through the API show up in the lab"""
+        api.consume_task(self.vlab_api, endpoint='/api/2/inf/onefs', message='testing',
+                         body={'name': 'node-1', 'image': '8.0.0.4', 'frontend': 'frontend'})
+        resp = api.consume_task(self.vlab_api, endpoint='/api/2/inf/onefs', message='testing', method='GET')
+
+        self.assertEqual(list(resp.json()['content'].keys()), ['node-1'])
+        self.assertEqual(resp.json()['content']['node-1']['meta']['component'], 'onefs')
+
+    def test_portmap(self):
+        """FakeVLab - port mapping rules can be created, looked up, and deleted"""
+        self.vlab_api.post('/api/1/ipam/portmap', json={'target_addr': '1.2.3.4', 'target_port': 22,
+                                                       'target_name': 'vm1', 'target_component': 'CentOS'})
+        ports = self.vlab_api.get('/api/1/ipam/portmap', params={'name': 'vm1'}).json()['content']['ports']
+        self.vlab_api.delete('/api/1/ipam/portmap', json={'conn_port': int(list(ports.keys())[0])})
+
+        self.assertEqual(len(ports), 1)
+        self.assertEqual(self.server.portmaps, {})
+
+    def test_inject(self):
+        """FakeVLab - injected failures answer with the requested status, then stop"""
+        self.server.inject(503, path='/api/1/quota', times=2, retry_after=0)
+        resp = self.vlab_api.get('/api/1/quota')
+
+        # retried twice, then answered
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(self.server.stats['injected'], 2)
+        self.assertEqual(self.server.calls.count(('GET', '/api/1/quota')), 3)
+
+    def test_inject_method(self):
+        """FakeVLab - injected failures can be limited to one HTTP method"""
+        self.server.inject(500, method='POST')
+        self.vlab_api.get('/api/1/quota')
+
+        with self.assertRaises(click.ClickException):
+            self.vlab_api.post('/api/1/link', json={'url': 'https://foo'})
+
+    def test_error_rate(self):
+        """FakeVLab - error_rate fails a fraction of the calls"""
+        self.server.error_rate = 1
+        resp = self.vlab_api.get('/api/1/quota', auto_check=False)
+
+        self.assertEqual(resp.status_code, 503)
+
+    def test_unknown(self):
+        """FakeVLab - unknown end points answer with 404"""
+        resp = self.vlab_api.get('/api/1/nope', auto_check=False)
+
+        self.assertEqual(resp.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
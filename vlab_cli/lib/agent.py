@@ -0,0 +1,469 @@
+# -*- coding: UTF-8 -*-
+"""
+An optional background process that keeps connections to vLab warm.
+
+Every ``vlab`` command normally builds a new HTTP session, does a TLS handshake
+with the vLab server, and throws all of that away when it exits. When the agent
+is running, the CLI hands its HTTP requests to the agent over a Unix socket
+instead. The agent keeps a pool of keep-alive connections per vLab server, and
+remembers decoded auth tokens, so back-to-back commands skip the connection
+setup and the token decode.
+
+Messages on the socket are a 4 byte (big-endian) length, followed by that many
+bytes of UTF-8 encoded JSON. Every request has an ``op`` key, which is one of
+``ping``, ``call``, ``get_token``, ``put_token`` or ``stop``.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import struct
+import threading
+import socketserver
+
+import requests
+
+from vlab_cli.lib.logger import get_logger
+from vlab_cli.lib.api import new_session, get_session
+from vlab_cli.lib.responses import to_response, from_response
+
+
+AGENT_DIR = os.path.join(os.path.expanduser('~'), '.vlab')
+AGENT_SOCKET = os.path.join(AGENT_DIR, 'agent.sock')
+AGENT_LOG = os.path.join(AGENT_DIR, 'agent.log')
+IDLE_TIMEOUT = 3600 # seconds; the agent exits after this long without any requests
+TOKEN_EXPIRE_BUFFER = 600 # seconds; same as the tokenizer, don't hand out tokens about to expire
+# The only keyword arguments vLabApi ever supplies to a requests.Session method
+CALL_KWARGS = ('headers', 'json', 'params', 'timeout', 'verify')
+# A request that might have reached the server is only sent again if that's harmless
+REPLAY_METHODS = frozenset(['GET', 'HEAD'])
+CALL_TIMEOUT = 120 # seconds; how long a call without a timeout can take before the agent is given up on
+CALL_TIMEOUT_SLACK = 5 # seconds; on top of the call's own timeout, for the agent to relay the answer
+HEADER = struct.Struct('!I')
+
+
+class AgentError(Exception):
+    """Raised when the agent cannot be used"""
+    pass
+
+
+class AgentTimeout(AgentError):
+    """Raised when the agent doesn't answer in time"""
+    pass
+
+
+def supported():
+    """The agent relies on Unix sockets, which not every platform has
+
+    :Returns: Boolean
+    """
+    return hasattr(socket, 'AF_UNIX')
+
+
+def send_message(sock, message):
+    """Write a length-prefixed JSON message to a socket
+
+    :Returns: None
+
+    :param sock: The connected socket
+    :type sock: socket.socket
+
+    :param message: The thing to send
+    :type message: Dictionary
+    """
+    data = json.dumps(message).encode('utf-8')
+    sock.sendall(HEADER.pack(len(data)) + data)
+
+
+def recv_message(sock):
+    """Read a length-prefixed JSON message from a socket
+
+    :Returns: Dictionary
+
+    :Raises: AgentError
+
+    :param sock: The connected socket
+    :type sock: socket.socket
+    """
+    size = HEADER.unpack(_recv_exactly(sock, HEADER.size))[0]
+    return json.loads(_recv_exactly(sock, size).decode('utf-8'))
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = sock.recv(min(remaining, 65536))
+        if not chunk:
+            raise AgentError('Agent connection closed unexpectedly')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+
+def request(message, socket_path=AGENT_SOCKET, timeout=None):
+    """Send one request to the agent, and return its reply
+
+    :Returns: Dictionary
+
+    :Raises: AgentError
+
+    :param message: The request for the agent
+    :type message: Dictionary
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+
+    :param timeout: How long to wait on the agent; None waits forever
+    :type timeout: Float
+    """
+    if not supported():
+        raise AgentError('The vLab agent is not supported on this platform')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(socket_path)
+        send_message(sock, message)
+        reply = recv_message(sock)
+    except socket.timeout as doh:
+        raise AgentTimeout(doh)
+    except (OSError, ValueError, struct.error) as doh:
+        raise AgentError(doh)
+    finally:
+        sock.close()
+    if reply.get('error') and reply.get('type') == 'AgentError':
+        raise AgentError(reply['error'])
+    return reply
+
+
+def ping(socket_path=AGENT_SOCKET):
+    """Find out if the agent is running
+
+    :Returns: Dictionary (agent stats) or None
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    if not (supported() and os.path.exists(socket_path)):
+        return None
+    try:
+        return request({'op': 'ping'}, socket_path=socket_path, timeout=1)
+    except AgentError:
+        return None
+
+
+def connect(socket_path=AGENT_SOCKET):
+    """Obtain a session that uses the agent, if the agent is running
+
+    :Returns: AgentSession or None
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    if ping(socket_path) is None:
+        return None
+    return AgentSession(socket_path)
+
+
+def get_token(vlab_url, socket_path=AGENT_SOCKET):
+    """Obtain a previously decoded token from the agent
+
+    :Returns: Tuple (token, token_contents), or (None, None) if the agent doesn't have one
+
+    :param vlab_url: The vLab server that issued the token
+    :type vlab_url: String
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    try:
+        reply = request({'op': 'get_token', 'vlab_url': vlab_url}, socket_path=socket_path, timeout=1)
+    except AgentError:
+        return None, None
+    return reply.get('token'), reply.get('token_contents')
+
+
+def put_token(vlab_url, token, token_contents, socket_path=AGENT_SOCKET):
+    """Give the agent a decoded token, so later commands don't have to decode it
+
+    :Returns: None
+
+    :param vlab_url: The vLab server that issued the token
+    :type vlab_url: String
+
+    :param token: The encoded JWT
+    :type token: String
+
+    :param token_contents: The decoded JWT
+    :type token_contents: Dictionary
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    message = {'op': 'put_token', 'vlab_url': vlab_url, 'token': token,
+               'token_contents': token_contents}
+    try:
+        request(message, socket_path=socket_path, timeout=1)
+    except AgentError:
+        pass
+
+
+def forget_token(vlab_url, socket_path=AGENT_SOCKET):
+    """Make the agent drop a token, i.e. because it was deleted or replaced
+
+    :Returns: None
+
+    :param vlab_url: The vLab server that issued the token
+    :type vlab_url: String
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    put_token(vlab_url, None, None, socket_path=socket_path)
+
+
+def stop(socket_path=AGENT_SOCKET):
+    """Tell the agent to exit
+
+    :Returns: None
+
+    :Raises: AgentError
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    request({'op': 'stop'}, socket_path=socket_path, timeout=5)
+
+
+class AgentSession(object):
+    """Quacks like a requests.Session, but the agent makes the actual HTTP request.
+
+    This way vLabApi keeps handling auth headers, errors, etc and only the
+    transport changes. If the agent stops answering, every later call is made
+    directly, like there was no agent.
+
+    :param socket_path: The location of the agent's Unix socket
+    :type socket_path: String
+    """
+    def __init__(self, socket_path=AGENT_SOCKET):
+        self._socket_path = socket_path
+        self.use_agent = True
+
+    def mount(self, prefix, adapter):
+        """The agent owns the connection pools, so adapters are ignored"""
+        pass
+
+    def close(self):
+        """The agent keeps the connections open; that's the whole point"""
+        pass
+
+    def request(self, method, url, **kwargs):
+        """Have the agent perform an HTTP request
+
+        :Returns: requests.Response
+
+        :Raises: requests.exceptions.ConnectionError
+
+        :param method: The HTTP method
+        :type method: String
+
+        :param url: The full URL to call
+        :type url: String
+        """
+        unsupported = set(kwargs.keys()) - set(CALL_KWARGS)
+        if unsupported:
+            raise ValueError('Agent does not support arguments: {}'.format(', '.join(unsupported)))
+        if not self.use_agent:
+            return get_session(url).request(method, url, **kwargs)
+        message = {'op': 'call', 'method': method.upper(), 'url': url, 'kwargs': kwargs}
+        try:
+            reply = request(message, socket_path=self._socket_path,
+                            timeout=call_timeout(kwargs.get('timeout')))
+        except AgentTimeout as doh:
+            # i.e. the agent is wedged; don't let it hang every command
+            self.use_agent = False
+            if method.upper() not in REPLAY_METHODS:
+                # the server might have done the work; RetryPolicy decides if it's sent again
+                raise requests.exceptions.ConnectionError('vLab agent did not answer: {}'.format(doh))
+            return get_session(url).request(method, url, **kwargs)
+        except AgentError as doh:
+            raise requests.exceptions.ConnectionError('Unable to reach vLab agent: {}'.format(doh))
+        if reply.get('error'):
+            error_type = getattr(requests.exceptions, reply['type'], requests.exceptions.RequestException)
+            raise error_type(reply['error'])
+        return to_response(reply)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+def call_timeout(timeout):
+    """Figure out how long to wait on the agent to make an HTTP request
+
+    :Returns: Float
+
+    :param timeout: The timeout of the HTTP request, like ``requests`` takes it
+    :type timeout: Float, Tuple (connect, read), or None
+    """
+    if timeout is None:
+        return CALL_TIMEOUT
+    elif isinstance(timeout, (tuple, list)):
+        # a list once it's been through JSON
+        return sum(x if x is not None else CALL_TIMEOUT for x in timeout) + CALL_TIMEOUT_SLACK
+    return timeout + CALL_TIMEOUT_SLACK
+
+
+class AgentServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """The agent process; holds the warm HTTP sessions and decoded tokens
+
+    :param socket_path: Where to create the Unix socket
+    :type socket_path: String
+
+    :param idle_timeout: Exit after this many seconds without a request
+    :type idle_timeout: Integer
+
+    :param log: The logging object to aid in debugging
+    :type log: logging.Logger
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, idle_timeout, log):
+        self.log = log
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.last_used = time.time()
+        self.requests_served = 0
+        self.sessions = {}
+        self.tokens = {}
+        self._lock = threading.Lock()
+        old_umask = os.umask(0o077) # only the owner may use the socket
+        try:
+            socketserver.UnixStreamServer.__init__(self, socket_path, AgentHandler)
+        finally:
+            os.umask(old_umask)
+
+    def session_for(self, url):
+        """Obtain the pooled session for the server in a URL
+
+        :Returns: requests.Session
+
+        :param url: The full URL being called
+        :type url: String
+        """
+        scheme, _, netloc = url.split('/', 3)[:3]
+        base = '{}//{}'.format(scheme, netloc)
+        with self._lock:
+            if base not in self.sessions:
+                self.log.info('Creating new session for {}'.format(base))
+                self.sessions[base] = new_session(base)
+            return self.sessions[base]
+
+    def handle_op(self, message):
+        """Do whatever a client asked
+
+        :Returns: Dictionary
+
+        :param message: The request from the client
+        :type message: Dictionary
+        """
+        self.last_used = time.time()
+        op = message.get('op')
+        if op == 'ping':
+            return {'pid': os.getpid(), 'uptime': time.time() - self.started,
+                    'requests': self.requests_served, 'sessions': sorted(self.sessions.keys())}
+        elif op == 'call':
+            self.requests_served += 1
+            session = self.session_for(message['url'])
+            try:
+                resp = session.request(message['method'], message['url'], **message['kwargs'])
+            except requests.exceptions.RequestException as doh:
+                return {'error': str(doh), 'type': doh.__class__.__name__}
+            return from_response(resp)
+        elif op == 'get_token':
+            token, token_contents = self.tokens.get(message['vlab_url'], (None, None))
+            if token_contents and token_contents['exp'] - time.time() < TOKEN_EXPIRE_BUFFER:
+                self.tokens.pop(message['vlab_url'], None)
+                token, token_contents = None, None
+            return {'token': token, 'token_contents': token_contents}
+        elif op == 'put_token':
+            self.tokens[message['vlab_url']] = (message['token'], message['token_contents'])
+            return {}
+        elif op == 'stop':
+            # shutdown blocks until serve_forever exits, so it can't run on this thread
+            threading.Thread(target=self.shutdown).start()
+            return {}
+        else:
+            return {'error': 'Unknown op: {}'.format(op), 'type': 'AgentError'}
+
+    def service_actions(self):
+        """Called by serve_forever; exits the agent once it's been idle too long"""
+        if time.time() - self.last_used > self.idle_timeout:
+            self.log.info('Idle for {} seconds, exiting'.format(self.idle_timeout))
+            threading.Thread(target=self.shutdown).start()
+
+    def server_close(self):
+        socketserver.UnixStreamServer.server_close(self)
+        for session in self.sessions.values():
+            session.close()
+        try:
+            os.remove(self.server_address)
+        except OSError:
+            pass
+
+
+class AgentHandler(socketserver.BaseRequestHandler):
+    """Services a single client connection"""
+    def handle(self):
+        try:
+            message = recv_message(self.request)
+        except (AgentError, ValueError, struct.error) as doh:
+            self.server.log.debug('Bad message: {}'.format(doh))
+            return
+        try:
+            reply = self.server.handle_op(message)
+        except Exception as doh:
+            self.server.log.exception(doh)
+            reply = {'error': str(doh), 'type': 'AgentError'}
+        send_message(self.request, reply)
+
+
+def run_agent(socket_path=AGENT_SOCKET, idle_timeout=IDLE_TIMEOUT, log=None):
+    """Run the agent in the current process, until it's stopped or idles out
+
+    :Returns: None
+
+    :param socket_path: Where to create the Unix socket
+    :type socket_path: String
+
+    :param idle_timeout: Exit after this many seconds without a request
+    :type idle_timeout: Integer
+
+    :param log: The logging object to aid in debugging
+    :type log: logging.Logger
+    """
+    if log is None:
+        log = get_logger(__name__, verbose=True)
+    os.makedirs(os.path.dirname(socket_path), mode=0o700, exist_ok=True)
+    if os.path.exists(socket_path):
+        # left over from an agent that didn't exit cleanly
+        os.remove(socket_path)
+    server = AgentServer(socket_path, idle_timeout, log)
+    log.info('vLab agent listening on {}'.format(socket_path))
+    try:
+        server.serve_forever(poll_interval=1)
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    run_agent(idle_timeout=int(sys.argv[1]) if len(sys.argv) > 1 else IDLE_TIMEOUT)
@@ -2,32 +2,135 @@
 """
 A small abstraction to reduce boiler plate when working with the vLab RESTful API
 """
+import os
+import json
 import uuid
 import copy
 import time
+import socket
 import urllib3
-import pkg_resources
+import threading
+from collections import namedtuple
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import click
 import requests
-from requests.adapters import HTTPAdapter
+from requests.adapters import HTTPAdapter, DEFAULT_POOLSIZE
 from requests.packages.urllib3.util.ssl_ import create_urllib3_context
+from requests.packages.urllib3.connection import HTTPConnection
 
 from vlab_cli import version
+from vlab_cli.lib.retry import RetryPolicy
+from vlab_cli.lib.journal import task_id_of
+from vlab_cli.lib.polling import Poller, task_key, expected_duration
+from vlab_cli.lib.ratelimit import RateLimiter
+from vlab_cli.lib.tracing import TaskTimer
 from vlab_cli.lib.widgets import Spinner
 
 
 USER_AGENT = 'vLab CLI {}'.format(version.__version__)
+# The most connections kept open to the vLab server; more concurrent calls than
+# this just wait on a free connection (or worse, open one that's thrown away).
+# It's also how many calls vLabApi.bulk and AsyncVLabApi make at once.
+POOL_SIZE = int(os.environ.get('VLAB_CONCURRENCY', DEFAULT_POOLSIZE))
+# Idle pooled connections are probed, so one the network silently dropped gets
+# noticed before a request is sent on it
+KEEPALIVE_IDLE = 30
+KEEPALIVE_INTERVAL = 10
+KEEPALIVE_PROBES = 3
+
+BulkResult = namedtuple('BulkResult', 'response error')
+
+
+class TasksDetached(click.ClickException):
+    """Raised instead of waiting on tasks; prints a handle per task for ``vlab wait``
+
+    :param handles: The tasks that weren't waited on, from ``task_handle``
+    :type handles: List
+    """
+    exit_code = 0
+
+    def __init__(self, handles):
+        task_v_tasks = 'task' if len(handles) == 1 else 'tasks'
+        super(TasksDetached, self).__init__('Not waiting on {} {}'.format(len(handles), task_v_tasks))
+        self.handles = handles
+
+    def show(self, file=None):
+        for handle in self.handles:
+            click.echo(json.dumps(handle, sort_keys=True), file=file)
+
+_ssl_context = None
+_ssl_context_lock = threading.Lock()
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_ssl_context():
+    """Obtain the TLS context every connection to vLab shares
+
+    :Returns: ssl.SSLContext
+    """
+    global _ssl_context
+    with _ssl_context_lock:
+        if _ssl_context is None:
+            context = create_urllib3_context()
+            context.load_default_certs() # this loads the OS defaults on Windows
+            _ssl_context = context
+        return _ssl_context
+
+
+def _socket_options():
+    options = list(HTTPConnection.default_socket_options)
+    options.append((socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1))
+    # Not every platform lets you tune TCP keep-alive
+    for name, value in (('TCP_KEEPIDLE', KEEPALIVE_IDLE),
+                        ('TCP_KEEPINTVL', KEEPALIVE_INTERVAL),
+                        ('TCP_KEEPCNT', KEEPALIVE_PROBES)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return options
 
 
 class SSLContextAdapter(HTTPAdapter):
     def init_poolmanager(self, *args, **kwargs):
-        context = create_urllib3_context()
-        kwargs['ssl_context'] = context
-        context.load_default_certs() # this loads the OS defaults on Windows
+        kwargs['ssl_context'] = get_ssl_context()
+        kwargs.setdefault('socket_options', _socket_options())
         return super(SSLContextAdapter, self).init_poolmanager(*args, **kwargs)
 
 
+def new_session(server, pool_size=POOL_SIZE):
+    """Create an HTTP session that's tuned for talking to vLab
+
+    :Returns: requests.Session
+
+    :param server: The URL of the vLab server
+    :type server: String
+
+    :param pool_size: The most connections to keep open to the server
+    :type pool_size: Integer
+    """
+    session = requests.Session()
+    session.mount(server, SSLContextAdapter(pool_connections=pool_size, pool_maxsize=pool_size))
+    return session
+
+
+def get_session(server):
+    """Obtain the HTTP session every part of the CLI uses to talk to a vLab server
+
+    :Returns: requests.Session
+
+    :param server: The URL of the vLab server
+    :type server: String
+    """
+    parsed = urlparse(server)
+    base = '{}://{}'.format(parsed.scheme, parsed.netloc)
+    with _sessions_lock:
+        if base not in _sessions:
+            _sessions[base] = new_session(base)
+        return _sessions[base]
+
+
 class vLabApi(object):
     """A small wrapper around requests.Session to handle boiler-plate code in API calls.
 
@@ -61,11 +164,56 @@ class vLabApi(object):
 
     :param log: The logging object to aid in debugging
     :type log: logging.Logger
+
+    :param session: Optionally supply the object that performs the HTTP requests
+    :type session: requests.Session
+
+    :param retry_policy: Decides which failed API calls are retried
+    :type retry_policy: vlab_cli.lib.retry.RetryPolicy
+
+    :param cache: Optionally reuse the answers of read-mostly API end points
+    :type cache: vlab_cli.lib.http_cache.HttpCache
+
+    :param tracer: Optionally record the timing of every API call
+    :type tracer: vlab_cli.lib.tracing.Tracer
+
+    :param memo: Optionally reuse identical GETs
+    :type memo: vlab_cli.lib.memo.RequestMemo
+
+    :param rate_limiter: Paces the API calls made
+    :type rate_limiter: vlab_cli.lib.ratelimit.RateLimiter
+
+    :param task_history: Optionally learn how long tasks take
+    :type task_history: vlab_cli.lib.polling.TaskHistory
+
+    :param journal: Optionally record the tasks issued
+    :type journal: vlab_cli.lib.journal.TaskJournal
+
+    :param detach: Raise TasksDetached instead of waiting on tasks that change things
+    :type detach: Boolean
     """
-    def __init__(self, server, token, verify=False, log=None):
+    def __init__(self, server, token, verify=False, log=None, session=None, retry_policy=None,
+                 cache=None, tracer=None, memo=None, rate_limiter=None, task_history=None, journal=None,
+                 detach=False):
         self._server = server
-        self._session = requests.Session()
-        self._session.mount(server, SSLContextAdapter())
+        if session is None:
+            session = get_session(server)
+        self._session = session
+        if retry_policy is None:
+            retry_policy = RetryPolicy()
+        self._retry_policy = retry_policy
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+        self._rate_limiter = rate_limiter
+        self._cache = cache
+        self._tracer = tracer
+        self._memo = memo
+        self._task_history = task_history
+        self._journal = journal
+        # only the tasks this command is waiting on get marked as finished
+        self._tracked_tasks = set()
+        self._tracked_lock = threading.Lock()
+        self._detach = detach
         self._header = {'X-Auth': token,
                         'User-Agent': USER_AGENT,
                         # Creates a random ID
@@ -74,6 +222,9 @@ class vLabApi(object):
                         # are made. This enables us to see how a simple CLI
                         # command might depend on multiple backend services.
                         'X-REQUEST-ID' : uuid.uuid4().hex}
+        if tracer is not None:
+            # so the trace can be lined up with the server logs
+            tracer.request_id = self._header['X-REQUEST-ID']
         self._verify = verify if verify is False else True
         if log is None:
             raise ValueError('Must supply a log object')
@@ -84,7 +235,43 @@ class vLabApi(object):
     def server(self):
         return self._server
 
-    def _call(self, method, endpoint, auto_check=True, **kwargs):
+    @property
+    def verify(self):
+        return self._verify
+
+    @property
+    def retry_policy(self):
+        return self._retry_policy
+
+    @property
+    def rate_limiter(self):
+        return self._rate_limiter
+
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def tracer(self):
+        return self._tracer
+
+    @property
+    def memo(self):
+        return self._memo
+
+    @property
+    def task_history(self):
+        return self._task_history
+
+    @property
+    def journal(self):
+        return self._journal
+
+    @property
+    def detach(self):
+        return self._detach
+
+    def _call(self, method, endpoint, auto_check=True, memoize=True, **kwargs):
         """Does the actual HTTP API calling
 
         :Returns: requests.Response
@@ -100,6 +287,9 @@ class vLabApi(object):
         :param auto_check: Check the response code, and if needed raise an exception
         :type auto_check: Boolean
 
+        :param memoize: Set to False to always ask the server, even if the same GET was already made
+        :type memoize: Boolean
+
         :param **kwargs: Additional key-word arguments to send
         :type **kwargs: Dictionary
         """
@@ -110,13 +300,34 @@ class vLabApi(object):
         else:
             url = build_url(self._server, endpoint)
         self._log.debug('Calling {} on {}'.format(method.upper(), url))
-        headers = kwargs.get('headers', {})
+        headers = kwargs.pop('headers', {})
         headers.update(self._header)
         caller = getattr(self._session, method)
-        resp = caller(url, headers=headers, verify=self._verify, **kwargs)
-        if resp.status_code == 503:
-            self._log.debug("Retrying API call")
-            resp = self._exponential_backoff(self, caller, url, headers, **kwargs)
+
+        def do_request(extra_headers):
+            all_headers = dict(headers, **extra_headers)
+            # every attempt, including retries, is paced
+            attempt = lambda: caller(url, headers=all_headers, verify=self._verify, **kwargs)
+            return self._retry_policy.send(method, url,
+                                           lambda: self._rate_limiter.send(method, attempt),
+                                           self._log)
+
+        def send():
+            if self._cache is None:
+                return do_request({})
+            return self._cache.send(method, url, kwargs.get('params'), do_request, self._log)
+
+        started = None if self._tracer is None else self._tracer.now()
+        try:
+            if self._memo is None or not memoize:
+                resp = send()
+            else:
+                resp = self._memo.send(method, url, kwargs.get('params'), send, self._log)
+        except requests.exceptions.RequestException as doh:
+            self._trace(method, url, started, kwargs, error=doh)
+            raise
+        self._trace(method, url, started, kwargs, resp=resp)
+        self._record_task(method, url, resp)
         if not resp.ok and auto_check:
             self._log.debug("Call Failed: HTTP {}".format(resp.status_code))
             self._log.debug("Request ID: {}".format(self._header['X-REQUEST-ID']))
@@ -131,25 +342,92 @@ class vLabApi(object):
             raise click.ClickException(error)
         return resp
 
-    def _exponential_backoff(self, caller, url, headers, **kwargs):
-        """Retries the API call a several times until the response is not HTTP 503.
-        The delay between retrying grows exponentially.
-
-        :Returns: requests.Response
+    def _trace(self, method, url, started, kwargs, resp=None, error=None):
+        """Save the timing of an API call, if the calls are being traced"""
+        if self._tracer is None:
+            return
+        cached = getattr(resp, 'from_cache', False) is True
+        body = kwargs.get('json')
+        self._tracer.record_request(method, url, started,
+                                    status=None if resp is None else resp.status_code,
+                                    sent=0 if body is None else len(json.dumps(body).encode()),
+                                    received=0 if resp is None else len(resp.content),
+                                    retries=0 if cached else self._retry_policy.last_retries,
+                                    cached=cached,
+                                    error=None if error is None else str(error))
+
+    def track_task(self, task_id):
+        """Record in the journal when a task issued by an earlier command finishes
+
+        :Returns: None
+
+        :param task_id: The ID of the task
+        :type task_id: String
         """
-        total_retries = 5
-        some_time = 1
-        for _ in range(total_retries):
-            time.sleep(some_time)
-            resp = caller(url, headers=headers, verify=self._verify, **kwargs)
-            if resp.status_code != 503:
-                break
-            some_time = some_time *  2
-        return resp, some_time
-
+        with self._tracked_lock:
+            self._tracked_tasks.add(task_id)
+
+    def _record_task(self, method, url, resp):
+        """Keep the journal up to date with the tasks that change things"""
+        if self._journal is None or getattr(resp, 'from_cache', False):
+            return
+        if method.lower() == 'get':
+            task_id = task_id_of(url)
+            if task_id is None or resp.status_code == 202:
+                return
+            with self._tracked_lock:
+                if task_id not in self._tracked_tasks:
+                    return
+                self._tracked_tasks.discard(task_id)
+            self._journal.finished(task_id, resp.status_code)
+            return
+        if resp.status_code != 202:
+            return
+        try:
+            task_id = resp.json()['content']['task-id']
+        except (ValueError, KeyError, TypeError):
+            return
+        status_url = resp.links.get('status', {}).get('url', '{}/task/{}'.format(url, task_id))
+        self.track_task(task_id)
+        self._journal.issued(self._server, method, urlparse(url).path, task_id, status_url,
+                             self._header['X-REQUEST-ID'])
+
+    def bulk(self, calls, max_workers=POOL_SIZE):
+        """Make a batch of independent API calls at once
+
+        :Returns: List (a BulkResult per call, in the same order as ``calls``)
+
+        :param calls: The ``(method, endpoint)`` or ``(method, endpoint, kwargs)`` of each API call
+        :type calls: List
+
+        :param max_workers: The most API calls to have in flight at once
+        :type max_workers: Integer
+        """
+        calls = [tuple(x) + ({},) if len(x) == 2 else tuple(x) for x in calls]
+        if not calls:
+            return []
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as executor:
+            futures = [executor.submit(self._call, method=m, endpoint=e, **kw) for m, e, kw in calls]
+        results = []
+        for future in futures:
+            try:
+                results.append(BulkResult(future.result(), None))
+            except (click.ClickException, requests.exceptions.RequestException) as doh:
+                results.append(BulkResult(None, doh))
+        return results
 
     def close(self):
         """Terminate the TCP connection with the vLab server"""
+        if self._retry_policy.stats['retries']:
+            self._log.info('API retry stats: {}'.format(dict(self._retry_policy.stats)))
+        if self._rate_limiter.stats['throttled']:
+            self._log.info('API rate limit stats: {}'.format(dict(self._rate_limiter.stats)))
+        if self._cache is not None and self._cache.stats:
+            self._log.info('API cache stats: {}'.format(dict(self._cache.stats)))
+        if self._memo is not None and self._memo.stats:
+            self._log.info('API memo stats: {}'.format(dict(self._memo.stats)))
+        if self._task_history is not None:
+            self._task_history.save()
         self._session.close()
 
     def get(self, endpoint, auto_check=True, **kwargs):
@@ -239,8 +517,74 @@ def build_url(base, *args):
     return '/'.join(tmp)
 
 
+def task_handle(server, status_url, name=None, follow_up=None):
+    """Describe a task well enough for a later command to wait on it
+
+    :Returns: Dictionary
+
+    :param server: The URL of the vLab server
+    :type server: String
+
+    :param status_url: The URL, or just the path, to check on the task with
+    :type status_url: String
+
+    :param name: A human friendly name for the task
+    :type name: String
+
+    :param follow_up: What to do once the task is done
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
+    """
+    if not status_url.startswith('http'):
+        status_url = build_url(server, status_url)
+    handle = {'task_id': task_id_of(status_url), 'status_url': status_url}
+    if name is not None:
+        handle['name'] = name
+    if follow_up is not None:
+        handle['follow_up'] = follow_up.to_dict()
+    return handle
+
+
+def detach(vlab_api, handles, follow_up=None):
+    """Stop waiting on tasks, and leave them (and what comes after them) to ``vlab wait``
+
+    :Raises: TasksDetached
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param handles: The tasks, from ``task_handle``
+    :type handles: List
+
+    :param follow_up: What to do once the tasks are done
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
+    """
+    if follow_up is not None and vlab_api.journal is not None:
+        # so "vlab tasks resume" can finish the job too
+        for handle in handles:
+            vlab_api.journal.follow_up(handle['task_id'], follow_up.to_dict())
+    raise TasksDetached(handles)
+
+
+def raise_on_errors(results):
+    """Raise one exception for all the calls in a ``vLabApi.bulk`` batch that failed
+
+    :Returns: None
+
+    :Raises: click.ClickException
+
+    :param results: The output of ``vLabApi.bulk``
+    :type results: List
+    """
+    errors = [str(x.error) for x in results if x.error is not None]
+    if errors:
+        if len(errors) == 1:
+            raise click.ClickException(errors[0])
+        msg = '{} of {} API calls failed:\n\t{}'.format(len(errors), len(results), '\n\t'.join(errors))
+        raise click.ClickException(msg)
+
+
 def consume_task(vlab_api, endpoint, message, method='POST', body=None, params=None,
-                 timeout=60, pause=1, auto_check=True, base_endpoint=True):
+                 timeout=60, pause=1, auto_check=True, base_endpoint=True, follow_up=None):
     """Automates processing tasks issued by the vLab API
 
     :Returns: requests.Response
@@ -251,13 +595,14 @@ def consume_task(vlab_api, endpoint, message, method='POST', body=None, params=N
     :param endpoint: The URL that issued the task
     :type endpoint: String
 
-    :param message: What to tell the end user while waiting on the task
+    :param message: What to tell the end user while waiting on the task. Set to
+                    None when running many at once, so spinners don't clobber each other.
     :type message: String
 
     :param timeout: How long to wait for the task to complete. Default 60 seconds
     :type timeout: Integer
 
-    :param pause: How long to wait in between checking on the status of the task.
+    :param pause: The longest to wait in between checking on the status of the task.
     :type pause: Integer
 
     :param auto_check: Check the response code, and if needed raise an exception
@@ -265,27 +610,60 @@ def consume_task(vlab_api, endpoint, message, method='POST', body=None, params=N
 
     :param base_endpoint: Set to False if the end point is for <base>/image
     :type base_endpoint: Boolean
+
+    :param follow_up: What the caller does once the task is done. It's only used
+                      when not waiting on the task (i.e. ``vlab --no-wait``), so
+                      ``vlab wait`` can do it instead.
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
     """
+    if message is None:
+        return _consume_task(vlab_api, endpoint, method, body, params, timeout, pause,
+                             auto_check, base_endpoint, follow_up)
     with Spinner(message):
-        resp = vlab_api._call(method=method.lower(), endpoint=endpoint, auto_check=auto_check,
-                              json=body, params=params)
-        task = resp.json()['content']['task-id']
-        if base_endpoint:
-            url = '{}/task/{}'.format(endpoint, task)
-        else:
-            url = resp.links['status']['url']
-        for _ in range(0, timeout, pause):
-            resp = vlab_api.get(url, auto_check=auto_check)
-            if resp.status_code == 202:
-                time.sleep(pause)
-            else:
-                break
-        else:
+        return _consume_task(vlab_api, endpoint, method, body, params, timeout, pause,
+                             auto_check, base_endpoint, follow_up)
+
+
+def _consume_task(vlab_api, endpoint, method, body, params, timeout, pause, auto_check, base_endpoint,
+                  follow_up):
+    timer = TaskTimer(vlab_api.tracer, endpoint)
+    resp = vlab_api._call(method=method.lower(), endpoint=endpoint, auto_check=auto_check,
+                          json=body, params=params)
+    if getattr(resp, 'from_cache', False):
+        # the result of the last time this task ran is still good
+        return resp
+    task = resp.json()['content']['task-id']
+    timer.issued(task)
+    if base_endpoint:
+        url = '{}/task/{}'.format(endpoint, task)
+    else:
+        url = resp.links['status']['url']
+    if vlab_api.detach and method.lower() != 'get':
+        timer.done()
+        detach(vlab_api, [task_handle(vlab_api.server, url, follow_up=follow_up)], follow_up)
+    history = vlab_api.task_history
+    key = task_key(endpoint, method)
+    poller = Poller(timeout, pause, expected=expected_duration(history, [key]))
+    while True:
+        with timer.poll():
+            resp = vlab_api.get(url, auto_check=auto_check, headers=poller.headers())
+        if resp.status_code != 202:
+            break
+        poller.checked(resp)
+        if poller.timed_out:
+            timer.done(timed_out=True)
             error = 'Timed out on task {}'.format(task)
+            if vlab_api.journal is not None:
+                error += '; run "vlab tasks wait {}" to keep waiting'.format(task)
             raise click.ClickException(error)
-        return resp
+        time.sleep(poller.next_delay())
+    timer.done()
+    if history is not None:
+        history.record(key, poller.elapsed)
+    return resp
+
 
-def block_on_tasks(vlab_api, tasks, timeout=900, pause=5, auto_check=True):
+def block_on_tasks(vlab_api, tasks, timeout=900, pause=5, auto_check=True, method=None, follow_up=None):
     """Wait for a group of tasks to complete
 
     The point of this function is to reduce boilerplate code when waiting on a
@@ -294,7 +672,39 @@ def block_on_tasks(vlab_api, tasks, timeout=900, pause=5, auto_check=True):
     the task a human friendly name, like "linuxVM" if the task is for creating/deleting
     a Linux VM.
 
-    :Returns: None
+    :Returns: Dictionary
+
+    :Raises: click.ClickException (upon timeout)
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param tasks: The group of task items to API end points to wait on.
+    :type tasks: Dictionary
+
+    :param timeout: How long to wait for all tasks to complete
+    :type timeout: Integer
+
+    :param pause: The longest to wait in between checking on the status of the tasks.
+    :type pause: Integer
+
+    :param auto_check: Check the response code, and if needed raise an exception
+    :type auto_check: Boolean
+
+    :param method: The HTTP method that issued the tasks, so how long they take can be learned
+    :type method: String
+
+    :param follow_up: What the caller does once the tasks are done; see ``consume_task``
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
+    """
+    return dict(iter_tasks(vlab_api, tasks, timeout=timeout, pause=pause, auto_check=auto_check,
+                           method=method, follow_up=follow_up))
+
+
+def iter_tasks(vlab_api, tasks, timeout=900, pause=5, auto_check=True, method=None, follow_up=None):
+    """Wait for a group of tasks, yielding each one as soon as it's done
+
+    :Returns: Generator of (task item, task result) pairs
 
     :Raises: click.ClickException (upon timeout)
 
@@ -307,26 +717,57 @@ def block_on_tasks(vlab_api, tasks, timeout=900, pause=5, auto_check=True):
     :param timeout: How long to wait for all tasks to complete
     :type timeout: Integer
 
-    :param pause: How long to wait in between checking on the status of the task.
+    :param pause: The longest to wait in between checking on the status of the tasks.
     :type pause: Integer
 
     :param auto_check: Check the response code, and if needed raise an exception
     :type auto_check: Boolean
+
+    :param method: The HTTP method that issued the tasks, so how long they take can be learned
+    :type method: String
+
+    :param follow_up: What the caller does once the tasks are done; see ``consume_task``
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
     """
-    info = {}
     local_tasks = copy.deepcopy(tasks) # this way there's no side-effect
-    for _ in range(0, timeout, pause):
-        time.sleep(pause)
-        if not local_tasks:
-            break
-        for component, url in list(local_tasks.items()):
-            resp = vlab_api.get(url, auto_check=auto_check)
-            if resp.status_code == 202:
-                continue
-            else:
-                info[component] = resp.json()
+    if not local_tasks:
+        return
+    elif vlab_api.detach:
+        detach(vlab_api, [task_handle(vlab_api.server, y, name=x, follow_up=follow_up)
+                          for x, y in local_tasks.items()], follow_up)
+    timers = {x: TaskTimer(vlab_api.tracer, y, task_id=y.rsplit('/', 1)[-1]) for x, y in local_tasks.items()}
+    # creating and deleting the same thing can take very different amounts of time
+    history = vlab_api.task_history if method else None
+    keys = {x: task_key(y, method) for x, y in local_tasks.items()}
+    # don't hold more checks open than there are connections
+    poller = Poller(timeout, pause, expected=expected_duration(history, keys.values()),
+                    long_poll=len(local_tasks) <= POOL_SIZE)
+
+    def check(component, url):
+        with timers[component].poll():
+            return vlab_api.get(url, auto_check=auto_check, headers=poller.headers())
+
+    with ThreadPoolExecutor(max_workers=min(POOL_SIZE, len(local_tasks))) as executor:
+        while local_tasks:
+            futures = {executor.submit(check, x, y): x for x, y in local_tasks.items()}
+            for future in as_completed(futures):
+                component = futures[future]
+                resp = future.result()
+                if resp.status_code == 202:
+                    poller.checked(resp)
+                    continue
                 local_tasks.pop(component)
-    else:
-        msg = 'Timed out waiting on componet(s): {}'.format(' '.join(local_tasks.keys()))
-        raise click.ClickException(msg)
-    return info
+                timers[component].done()
+                if history is not None:
+                    history.record(keys[component], poller.elapsed)
+                yield component, resp.json()
+            if not local_tasks:
+                break
+            elif poller.timed_out:
+                for component in local_tasks.keys():
+                    timers[component].done(timed_out=True)
+                msg = 'Timed out waiting on componet(s): {}'.format(' '.join(local_tasks.keys()))
+                if vlab_api.journal is not None:
+                    msg += '; run "vlab tasks resume" to keep waiting'
+                raise click.ClickException(msg)
+            time.sleep(poller.next_delay())
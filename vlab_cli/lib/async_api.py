@@ -0,0 +1,197 @@
+# -*- coding: UTF-8 -*-
+"""
+An asyncio counterpart to ``vlab_cli.lib.api``, for commands that fan out.
+
+Calls are made by the same ``vLabApi`` object every other command uses (so the
+headers, X-REQUEST-ID, retries, and error handling are identical) on a bounded
+pool of threads. That lets a command issue hundreds of API calls at once
+without opening hundreds of connections to the vLab server:
+
+.. code-block:: python
+
+   from vlab_cli.lib import async_api
+
+   async def delete_nodes(vlab_api, nodes):
+       with async_api.AsyncVLabApi(vlab_api) as api:
+           resps = await asyncio.gather(*[api.delete('/api/2/inf/onefs', json={'name': x}) for x in nodes])
+
+   async_api.run(delete_nodes(ctx.obj.vlab_api, ['node-1', 'node-2']))
+
+Waiting on tasks is done by ``consume_task`` and ``block_on_tasks`` from
+``vlab_cli.lib.api`` on one of those threads, so there's only one polling loop.
+"""
+import asyncio
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+
+from vlab_cli.lib import api
+
+DEFAULT_CONCURRENCY = api.POOL_SIZE
+
+
+class AsyncVLabApi(object):
+    """Make API calls to vLab from a coroutine
+
+    :param vlab_api: The connection to the vLab server to make the API calls with
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param concurrency: The most API calls to have in flight at once
+    :type concurrency: Integer
+    """
+    def __init__(self, vlab_api, concurrency=DEFAULT_CONCURRENCY):
+        self._vlab_api = vlab_api
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, the_traceback):
+        self.close()
+
+    @property
+    def server(self):
+        return self._vlab_api.server
+
+    @property
+    def vlab_api(self):
+        return self._vlab_api
+
+    def close(self):
+        """Stop the threads that make the API calls; does not close the vLabApi connection"""
+        self._executor.shutdown(wait=True)
+
+    async def _call(self, method, endpoint, auto_check=True, **kwargs):
+        """Make an API call without blocking the event loop
+
+        :Returns: requests.Response
+
+        :Raises: click.ClickException
+
+        :param method: The HTTP method to invoke
+        :type method: String
+
+        :param endpoint: The API resource to call
+        :type endpoint: String
+
+        :param auto_check: Check the response code, and if needed raise an exception
+        :type auto_check: Boolean
+
+        :param **kwargs: Additional key-word arguments to send
+        :type **kwargs: Dictionary
+        """
+        return await self.run_in_executor(self._vlab_api._call, method=method, endpoint=endpoint,
+                                          auto_check=auto_check, **kwargs)
+
+    async def run_in_executor(self, func, *args, **kwargs):
+        """Call a blocking function on the threads that make the API calls
+
+        :Returns: Whatever the function returns
+
+        :param func: The function to call
+        :type func: Callable
+        """
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get(self, endpoint, auto_check=True, **kwargs):
+        """Perform an HTTP GET on an API end point"""
+        return await self._call(method='get', endpoint=endpoint, auto_check=auto_check, **kwargs)
+
+    async def post(self, endpoint, auto_check=True, **kwargs):
+        """Perform an HTTP POST on an API end point"""
+        return await self._call(method='post', endpoint=endpoint, auto_check=auto_check, **kwargs)
+
+    async def put(self, endpoint, auto_check=True, **kwargs):
+        """Perform an HTTP PUT on an API end point"""
+        return await self._call(method='put', endpoint=endpoint, auto_check=auto_check, **kwargs)
+
+    async def delete(self, endpoint, auto_check=True, **kwargs):
+        """Perform an HTTP DELETE on an API end point"""
+        return await self._call(method='delete', endpoint=endpoint, auto_check=auto_check, **kwargs)
+
+
+def run(coroutine):
+    """Run a coroutine to completion from regular (i.e. click command) code
+
+    :Returns: Whatever the coroutine returns
+
+    :param coroutine: The work to do
+    :type coroutine: Coroutine
+    """
+    # asyncio.run() needs Python 3.7
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def consume_task(async_api, endpoint, message, method='POST', body=None, params=None,
+                       timeout=60, pause=1, auto_check=True, base_endpoint=True, follow_up=None):
+    """Automates processing tasks issued by the vLab API; see ``vlab_cli.lib.api.consume_task``
+
+    :Returns: requests.Response
+
+    :param async_api: A valid API connection to vLab
+    :type async_api: AsyncVLabApi
+
+    :param endpoint: The URL that issued the task
+    :type endpoint: String
+
+    :param message: What to tell the end user while waiting on the task. Set to
+                    None when running many at once, so spinners don't clobber each other.
+    :type message: String
+
+    :param timeout: How long to wait for the task to complete. Default 60 seconds
+    :type timeout: Integer
+
+    :param pause: The longest to wait in between checking on the status of the task.
+    :type pause: Integer
+
+    :param auto_check: Check the response code, and if needed raise an exception
+    :type auto_check: Boolean
+
+    :param base_endpoint: Set to False if the end point is for <base>/image
+    :type base_endpoint: Boolean
+
+    :param follow_up: What the caller does once the task is done
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
+    """
+    return await async_api.run_in_executor(api.consume_task, async_api.vlab_api, endpoint, message,
+                                           method=method, body=body, params=params, timeout=timeout,
+                                           pause=pause, auto_check=auto_check, base_endpoint=base_endpoint,
+                                           follow_up=follow_up)
+
+
+async def block_on_tasks(async_api, tasks, timeout=900, pause=5, auto_check=True, method=None,
+                         follow_up=None):
+    """Wait for a group of tasks to complete; see ``vlab_cli.lib.api.block_on_tasks``
+
+    :Returns: Dictionary
+
+    :Raises: click.ClickException (upon timeout)
+
+    :param async_api: A valid API connection to vLab
+    :type async_api: AsyncVLabApi
+
+    :param tasks: The group of task items to API end points to wait on.
+    :type tasks: Dictionary
+
+    :param timeout: How long to wait for all tasks to complete
+    :type timeout: Integer
+
+    :param pause: The longest to wait in between checking on the status of the tasks.
+    :type pause: Integer
+
+    :param auto_check: Check the response code, and if needed raise an exception
+    :type auto_check: Boolean
+
+    :param method: The HTTP method that issued the tasks, so how long they take can be learned
+    :type method: String
+
+    :param follow_up: What the caller does once the tasks are done
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
+    """
+    return await async_api.run_in_executor(api.block_on_tasks, async_api.vlab_api, tasks, timeout=timeout,
+                                           pause=pause, auto_check=auto_check, method=method,
+                                           follow_up=follow_up)
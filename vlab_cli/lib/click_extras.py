@@ -2,7 +2,12 @@
 """
 This module provides additional functionality for the click library
 """
-from click import command, option, Option, UsageError, Group
+import importlib
+
+from click import command, option, Option, UsageError, Group, Command
+
+# The key in ``click.Context.meta`` of the full command being run
+COMMAND_PATH = 'vlab.command_path'
 
 
 class MutuallyExclusiveOption(Option):
@@ -58,11 +63,49 @@ class HiddenOption(Option):
 
 
 class GlobalContext(object):
-    """Enables sharing of arbitrary data across the CLI app"""
-    def __init__(self, **kwargs):
+    """Enables sharing of arbitrary data across the CLI app
+
+    Values that are expensive to create (like the auth token) can be supplied
+    via ``lazy``, a mapping of attribute name to a function that takes no
+    arguments. The function is only called the first time the attribute is
+    accessed, and the value it returns is saved for later lookups.
+    """
+    def __init__(self, lazy=None, **kwargs):
+        object.__setattr__(self, '_lazy', dict(lazy or {}))
         for k,v in kwargs.items():
             object.__setattr__(self, str(k), v)
 
+    def __getattr__(self, name):
+        # Only called when the attribute hasn't been set yet
+        lazy = object.__getattribute__(self, '_lazy')
+        if name not in lazy:
+            raise AttributeError("'GlobalContext' object has no attribute '{}'".format(name))
+        value = lazy[name]()
+        object.__setattr__(self, name, value)
+        lazy.pop(name)
+        return value
+
+
+def refuse_no_wait(ctx, follow_up):
+    """Stop ``vlab --no-wait`` from skipping what a command does once its tasks are done
+
+    Most commands hand that work to ``vlab wait`` as a ``FollowUp``, but one
+    that has to ask the user things along the way has to be run without ``--no-wait``.
+
+    :Returns: None
+
+    :Raises: click.UsageError
+
+    :param ctx: The context of the command being run
+    :type ctx: click.Context
+
+    :param follow_up: What the command does once its tasks are done, like ``create port mapping rules``
+    :type follow_up: String
+    """
+    if getattr(ctx.obj, 'no_wait', False):
+        msg = '--no-wait cannot be used with "{}"; it has to {} once its tasks are done'
+        raise UsageError(msg.format(ctx.command_path, follow_up), ctx=ctx)
+
 
 class MultiValue(Option):
     """Pass one or more values to an option. (i.e. nargs=*)"""
@@ -107,17 +150,87 @@ class MultiValue(Option):
                 break
         return retval
 
+    def type_cast_value(self, ctx, value):
+        # Newer versions of click would turn the whole tuple into one string
+        if isinstance(value, tuple):
+            return tuple(self.type(x, self, ctx) for x in value)
+        return super(MultiValue, self).type_cast_value(ctx, value)
+
 
 class AliasedGroup(Group):
-    """Enables users to partially type the name of a command"""
+    """Enables users to partially type the name of a command
+
+    Adding a command can make a prefix that people already type ambiguous, so
+    ``aliases`` maps those prefixes to the command they've always meant.
+
+    :param aliases: The mapping of prefixes to command names
+    :type aliases: Dictionary
+    """
+    def __init__(self, *args, **kwargs):
+        self.aliases = kwargs.pop('aliases', {})
+        super(AliasedGroup, self).__init__(*args, **kwargs)
+
+    def resolve_command(self, ctx, args):
+        cmd_name, cmd, args = super(AliasedGroup, self).resolve_command(ctx, args)
+        # Remember the full command being run (i.e. "vlab create onefs"), for
+        # things like tracing. Commands run from ``vlab shell`` don't replace it.
+        path = '{} {}'.format(ctx.command_path, cmd_name)
+        current = ctx.meta.get(COMMAND_PATH)
+        if cmd_name is not None and (current is None or path.startswith(current + ' ')):
+            ctx.meta[COMMAND_PATH] = path
+        return cmd_name, cmd, args
+
     def get_command(self, ctx, cmd_name):
         rv = Group.get_command(self, ctx, cmd_name)
         if rv is not None:
             return rv
+        elif cmd_name in self.aliases:
+            return self.get_command(ctx, self.aliases[cmd_name])
         matches = [x for x in self.list_commands(ctx)
                    if x.startswith(cmd_name)]
         if not matches:
             return None
         elif len(matches) == 1:
-            return Group.get_command(self, ctx, matches[0])
+            return self.get_command(ctx, matches[0])
         ctx.fail('Too many matches: %s' % ', '.join(sorted(matches)))
+
+
+class LazyAliasedGroup(AliasedGroup):
+    """An AliasedGroup that only imports a subcommand once it's been resolved.
+
+    Importing every subcommand module just to run ``vlab power on`` is slow, so
+    this group keeps a mapping of command name to the dotted path of the object
+    that implements it, like ``{'esxi': 'vlab_cli.subcommands.create.esxi.esxi'}``.
+    When the object isn't a click command, it's treated as a factory, and is
+    called with the command name to build the command.
+
+    :param lazy_subcommands: The mapping of command names to import paths
+    :type lazy_subcommands: Dictionary
+    """
+    def __init__(self, *args, **kwargs):
+        self.lazy_subcommands = kwargs.pop('lazy_subcommands', {})
+        super(LazyAliasedGroup, self).__init__(*args, **kwargs)
+
+    def list_commands(self, ctx):
+        base = super(LazyAliasedGroup, self).list_commands(ctx)
+        return sorted(set(base) | set(self.lazy_subcommands.keys()))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands and cmd_name not in self.commands:
+            self.add_command(self._lazy_load(cmd_name), name=cmd_name)
+        return super(LazyAliasedGroup, self).get_command(ctx, cmd_name)
+
+    def _lazy_load(self, cmd_name):
+        """Import the module that defines a subcommand
+
+        :Returns: click.Command
+
+        :param cmd_name: The name of the subcommand to load
+        :type cmd_name: String
+        """
+        module_path, attr_name = self.lazy_subcommands[cmd_name].rsplit('.', 1)
+        module = importlib.import_module(module_path)
+        cmd = getattr(module, attr_name)
+        if not isinstance(cmd, Command):
+            cmd = cmd(cmd_name)
+        return cmd
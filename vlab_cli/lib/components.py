@@ -0,0 +1,299 @@
+# -*- coding: UTF-8 -*-
+"""
+The registry of every kind of component you can deploy in your lab.
+
+Most of the ``show``, ``delete`` and ``connect`` subcommands only differ by the
+API end point they call, and the words they use, so those commands are built
+from the data in here (see the ``component`` module of each subcommand group).
+Adding a new component that behaves like the rest is a matter of adding an entry
+to ``COMPONENTS``, and naming it in the ``GENERATED`` tuple of each group.
+
+The ``create`` commands are deliberately not built from here. Each one has its
+own options, prompts and follow-up steps (static IPs, which port mapping rules
+to make, cluster config), so they keep their own modules and only look up ports
+through ``portmap_helpers``.
+
+An entry is keyed by the CLI name of the component, and supports:
+
+  - ``kind``: The component type the server reports, lowercased (i.e. the ``meta.component`` of a VM)
+  - ``endpoint``: The API end point that manages the component
+  - ``product``: The name of the product, i.e. what the images are versions of
+  - ``noun``: What one of the component is called
+  - ``plural``: What many of the component are called
+  - ``article``: Either ``a`` or ``an``, to go before ``noun``
+  - ``protocols``: The protocols a port mapping rule can be created for
+  - ``https_port``: The port the component runs HTTPS on
+  - ``mgmt_port``: The port of an HTTPS based management interface
+  - ``images``: How ``show --images`` formats the table; the ``header``, how to
+    ``sort`` (``None``, ``'version'`` or ``'number'``) and if it's in ``reverse`` order
+  - ``portmaps``: Set to False if the component never has port mapping rules
+  - ``connect``: The ``protocols`` supported by ``vlab connect``, the ``default``
+    protocol, the default ``user``, an optional ``https_endpoint``, and optional
+    ``warnings`` or ``errors`` (keyed by protocol) to show when connecting
+"""
+
+COMPONENTS = {
+    'ana' : {
+        'kind' : 'avamarndmp',
+        'endpoint' : '/api/2/inf/avamar/ndmp-accelerator',
+        'product' : 'Avamar NDMP Accelerators',
+        'noun' : 'Avamar NDMP Accelerator',
+        'plural' : 'Avamar NDMP Accelerators',
+        'article' : 'an',
+        'protocols' : ['ssh', 'mgmt'],
+        'mgmt_port' : 7543,
+        'images' : {'header' : 'Avamar NDMP Accelerators', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'console', 'mgmt'], 'default' : 'mgmt', 'user' : 'root'},
+    },
+    'avamar' : {
+        'kind' : 'avamar',
+        'endpoint' : '/api/2/inf/avamar/server',
+        'product' : 'Avamar',
+        'noun' : 'Avamar server',
+        'plural' : 'Avamar servers',
+        'article' : 'an',
+        'protocols' : ['ssh', 'https', 'mgmt'],
+        'https_port' : 443,
+        'mgmt_port' : 7543,
+        'images' : {'header' : 'Avamar', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console', 'mgmt'], 'default' : 'https', 'user' : 'root',
+                     'https_endpoint' : '/dtlt/home.html',
+                     'warnings' : {'https' : 'WARNING: Some parts of the Avamar WebUI only work from inside your lab.'}},
+    },
+    'cee' : {
+        'kind' : 'cee',
+        'endpoint' : '/api/2/inf/cee',
+        'product' : 'CEE',
+        'noun' : 'CEE instance',
+        'plural' : 'CEE instances',
+        'article' : 'a',
+        'protocols' : ['rdp'],
+        'images' : {'header' : 'CEE (Windows)', 'sort' : 'version', 'reverse' : False},
+        'connect' : {'protocols' : ['rdp', 'console'], 'default' : 'rdp', 'user' : 'administrator'},
+    },
+    'centos' : {
+        'kind' : 'centos',
+        'endpoint' : '/api/2/inf/centos',
+        'product' : 'CentOS',
+        'noun' : 'CentOS instance',
+        'plural' : 'CentOS instances',
+        'article' : 'a',
+        'protocols' : ['ssh', 'rdp'],
+        'images' : {'header' : 'CentOS', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'console', 'rdp'], 'default' : 'ssh', 'user' : 'root'},
+    },
+    'claritynow' : {
+        'kind' : 'claritynow',
+        'endpoint' : '/api/2/inf/claritynow',
+        'product' : 'ClarityNow',
+        'noun' : 'ClarityNow instance',
+        'plural' : 'ClarityNow instances',
+        'article' : 'a',
+        'protocols' : ['ssh', 'https', 'rdp'],
+        'https_port' : 443,
+        'images' : {'header' : 'ClarityNow', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'rdp', 'console'], 'default' : 'rdp', 'user' : 'root'},
+    },
+    'dataiq' : {
+        'kind' : 'dataiq',
+        'endpoint' : '/api/2/inf/dataiq',
+        'product' : 'DataIQ',
+        'noun' : 'DataIQ instance',
+        'plural' : 'DataIQ instances',
+        'article' : 'a',
+        'protocols' : ['ssh', 'https', 'rdp'],
+        'https_port' : 443,
+        'images' : {'header' : '1.0 (Mauna Kea)', 'sort' : 'version', 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'rdp', 'console'], 'default' : 'rdp', 'user' : 'administrator'},
+    },
+    'dd' : {
+        'kind' : 'datadomain',
+        'endpoint' : '/api/2/inf/data-domain',
+        'product' : 'Data Domain',
+        'noun' : 'Data Domain server',
+        'plural' : 'Data Domain servers',
+        'article' : 'a',
+        'protocols' : ['ssh', 'https'],
+        'https_port' : 443,
+        'images' : {'header' : 'Data Domain', 'sort' : None, 'reverse' : True},
+        'connect' : {'protocols' : ['ssh', 'https', 'console'], 'default' : 'https', 'user' : 'sysadmin'},
+    },
+    'dns' : {
+        'kind' : 'dns',
+        'endpoint' : '/api/2/inf/dns',
+        'product' : 'DNS servers',
+        'noun' : 'DNS server',
+        'plural' : 'DNS servers',
+        'article' : 'a',
+        'protocols' : ['ssh', 'rdp'],
+        'images' : {'header' : 'DNS Servers', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'rdp', 'console'], 'default' : 'rdp', 'user' : 'root'},
+    },
+    'ecs' : {
+        'kind' : 'ecs',
+        'endpoint' : '/api/2/inf/ecs',
+        'product' : 'ECS',
+        'noun' : 'ECS instance',
+        'plural' : 'ECS instances',
+        'article' : 'an',
+        'protocols' : ['ssh', 'https'],
+        'https_port' : 443,
+        'images' : {'header' : 'ECS', 'sort' : None, 'reverse' : True},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console'], 'default' : 'https', 'user' : 'admin'},
+    },
+    'esrs' : {
+        'kind' : 'esrs',
+        'endpoint' : '/api/2/inf/esrs',
+        'product' : 'ESRS',
+        'noun' : 'ESRS instance',
+        'plural' : 'ESRS instances',
+        'article' : 'an',
+        'protocols' : ['ssh', 'https'],
+        'https_port' : 9443,
+        'images' : {'header' : 'ESRS (Virtual Edition)', 'sort' : 'version', 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console'], 'default' : 'https', 'user' : 'root'},
+    },
+    'esxi' : {
+        'kind' : 'esxi',
+        'endpoint' : '/api/2/inf/esxi',
+        'product' : 'ESXi',
+        'noun' : 'ESXi instance',
+        'plural' : 'ESXi instances',
+        'article' : 'an',
+        'protocols' : ['ssh', 'https'],
+        'https_port' : 443,
+        'images' : {'header' : 'ESXi', 'sort' : None, 'reverse' : True},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console'], 'default' : 'https', 'user' : 'root'},
+    },
+    'icap' : {
+        'kind' : 'icap',
+        'endpoint' : '/api/2/inf/icap',
+        'product' : 'ICAP servers',
+        'noun' : 'ICAP server',
+        'plural' : 'ICAP servers',
+        'article' : 'an',
+        'protocols' : ['rdp'],
+        'images' : {'header' : 'McAfee', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['rdp', 'console'], 'default' : 'rdp', 'user' : 'administrator'},
+    },
+    'insightiq' : {
+        'kind' : 'insightiq',
+        'endpoint' : '/api/2/inf/insightiq',
+        'product' : 'InsightIQ',
+        'noun' : 'InsightIQ instance',
+        'plural' : 'InsightIQ instances',
+        'article' : 'an',
+        'protocols' : ['ssh', 'https'],
+        'https_port' : 443,
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console'], 'default' : 'https', 'user' : 'administrator'},
+    },
+    'kemp' : {
+        'kind' : 'kemp',
+        'endpoint' : '/api/2/inf/kemp',
+        'product' : 'Kemp ECS Connection Management load balancers',
+        'noun' : 'Kemp ECS Connection Management load balancer',
+        'plural' : 'Kemp ECS Connection Management load balancers',
+        'article' : 'a',
+        'https_port' : 443,
+        'images' : {'header' : 'Kemp ECS Connection Management', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console'], 'default' : 'https', 'user' : 'administrator'},
+    },
+    'onefs' : {
+        'kind' : 'onefs',
+        'endpoint' : '/api/2/inf/onefs',
+        'product' : 'OneFS',
+        'noun' : 'OneFS node',
+        'plural' : 'OneFS nodes',
+        'article' : 'a',
+        'protocols' : ['ssh', 'https'],
+        'https_port' : 8080,
+        'connect' : {'protocols' : ['ssh', 'scp', 'https', 'console'], 'default' : 'https', 'user' : 'root'},
+    },
+    'router' : {
+        'kind' : 'router',
+        'endpoint' : '/api/2/inf/router',
+        'product' : 'network routers',
+        'noun' : 'network router',
+        'plural' : 'network routers',
+        'article' : 'a',
+        'protocols' : ['ssh'],
+        'portmaps' : False,
+        'images' : {'header' : 'VyOS Router', 'sort' : 'version', 'reverse' : False},
+    },
+    'superna' : {
+        'kind' : 'superna',
+        'endpoint' : '/api/2/inf/superna',
+        'product' : 'Superna Eyeglass servers',
+        'noun' : 'Superna Eyeglass server',
+        'plural' : 'Superna Eyeglass servers',
+        'article' : 'a',
+        'images' : {'header' : 'Superna Eyeglass', 'sort' : None, 'reverse' : False},
+        'connect' : {'protocols' : ['ssh', 'https', 'console'], 'default' : 'https', 'user' : 'sysadmin',
+                     'errors' : {'https' : 'Superna web interface only accessible from a machine *inside* your lab.'}},
+    },
+    'windows' : {
+        'kind' : 'windows',
+        'endpoint' : '/api/2/inf/windows',
+        'product' : 'Windows Desktop',
+        'noun' : 'Windows Desktop client',
+        'plural' : 'Windows Desktop clients',
+        'article' : 'a',
+        'protocols' : ['rdp'],
+        'images' : {'header' : 'Windows Desktop Clients', 'sort' : 'number', 'reverse' : True},
+        'connect' : {'protocols' : ['rdp', 'console'], 'default' : 'rdp', 'user' : 'administrator'},
+    },
+    'winserver' : {
+        'kind' : 'winserver',
+        'endpoint' : '/api/2/inf/winserver',
+        'product' : 'Microsoft Server',
+        'noun' : 'Microsoft Server instance',
+        'plural' : 'Microsoft Server instances',
+        'article' : 'a',
+        'protocols' : ['rdp'],
+        'images' : {'header' : 'Microsoft Server', 'sort' : None, 'reverse' : True},
+        'connect' : {'protocols' : ['rdp', 'console'], 'default' : 'rdp', 'user' : 'administrator'},
+    },
+}
+# The port every component runs HTTPS on, unless it says otherwise
+DEFAULT_HTTPS_PORT = 443
+_BY_KIND = {v['kind'] : v for v in COMPONENTS.values()}
+
+
+def get_component(vm_type):
+    """Lookup a component by the type the vLab server reports for it
+
+    :Returns: Dictionary
+
+    :Raises: KeyError
+
+    :param vm_type: The category of component (i.e. OneFS, InsightIQ, etc)
+    :type vm_type: String
+    """
+    return _BY_KIND[vm_type.lower()]
+
+
+def https_ports():
+    """Every port a component serves HTTPS, or an HTTPS management interface, on
+
+    :Returns: Set
+    """
+    ports = {DEFAULT_HTTPS_PORT}
+    for component in COMPONENTS.values():
+        ports.add(component.get('https_port', DEFAULT_HTTPS_PORT))
+        ports.add(component.get('mgmt_port', DEFAULT_HTTPS_PORT))
+    return ports
+
+
+def lazy_subcommands(group, names):
+    """Map command names to the factory that builds them, for ``LazyAliasedGroup``
+
+    :Returns: Dictionary
+
+    :param group: The name of the subcommand group, like ``show``
+    :type group: String
+
+    :param names: The components to build commands for
+    :type names: Iterable
+    """
+    factory = 'vlab_cli.subcommands.{}.component.build'.format(group)
+    return {name : factory for name in names}
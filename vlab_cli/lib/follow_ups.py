@@ -0,0 +1,206 @@
+# -*- coding: UTF-8 -*-
+"""
+The work a command does once its tasks are done, so ``vlab wait`` can do it too.
+
+Creating a VM is a task on the vLab server, but the port mapping rules for it
+can only be made once the task says what IPs the VM got. When a command runs
+with ``vlab --no-wait`` it exits as soon as its tasks are issued, so that work
+is described by a ``FollowUp``, which goes into the task handles (and the task
+journal). Once the tasks are done, ``vlab wait`` and ``vlab tasks resume`` run
+the follow-up with the results of the tasks, exactly like the command would have.
+
+A follow-up has to survive being written as JSON, so it's the name of an action
+in ``FOLLOW_UPS``, plus the arguments for it. Commands that wait on their tasks
+run the same ``FollowUp`` themselves, so both ways end the same.
+"""
+import uuid
+
+
+def create_portmaps(vlab_api, info, name, protocols=None, addrs=None, first_only=False):
+    """Create the port mapping rules for a new VM
+
+    :Returns: Dictionary (IP -> target port -> connection port)
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param info: The VMs the tasks made, by name
+    :type info: Dictionary
+
+    :param name: The name of the new VM
+    :type name: String
+
+    :param protocols: The protocols to map, like ``ssh``. Defaults to every protocol the component supports.
+    :type protocols: List
+
+    :param addrs: The IPs to map. Defaults to every IPv4 address of the VM.
+    :type addrs: List
+
+    :param first_only: Only map the first IPv4 address of the VM
+    :type first_only: Boolean
+    """
+    from vlab_cli.lib import portmap_helpers
+
+    data = info[name]
+    vm_type = data['meta']['component']
+    if addrs is None:
+        addrs = portmap_helpers.get_ipv4_addrs(data['ips'])
+        if first_only:
+            addrs = addrs[:1]
+    if protocols is None:
+        protocols = portmap_helpers.get_component_protocols(vm_type.lower())
+    ports = [portmap_helpers.get_protocol_port(vm_type.lower(), x) for x in protocols]
+    conn_ports = {}
+    for ipv4 in addrs:
+        for port in ports:
+            portmap_payload = {'target_addr' : ipv4, 'target_port' : port,
+                               'target_name' : name, 'target_component' : vm_type}
+            resp = vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+            conn_ports.setdefault(ipv4, {})[port] = resp.json()['content']['conn_port']
+    return conn_ports
+
+
+def delete_portmaps(vlab_api, info, names):
+    """Delete the port mapping rules of VMs that were deleted
+
+    :Returns: None
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param info: The results of the tasks (unused)
+    :type info: Dictionary
+
+    :param names: The names of the deleted VMs
+    :type names: List
+    """
+    from vlab_cli.lib import portmap_helpers
+
+    portmap_helpers.delete_portmaps(vlab_api, names)
+
+
+def setup_ecs(vlab_api, info, name, skip_config):
+    """Create the port mapping rules of a new ECS instance, and configure it
+
+    :Returns: None
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param info: The VMs the tasks made, by name
+    :type info: Dictionary
+
+    :param name: The name of the new ECS instance
+    :type name: String
+
+    :param skip_config: Only create the port mapping rules
+    :type skip_config: Boolean
+    """
+    from vlab_cli.subcommands.create import ecs
+
+    ecs.setup_ecs(vlab_api, info[name], name, skip_config)
+
+
+def configure_onefs(vlab_api, info, **config):
+    """Turn new OneFS nodes into a cluster, and create their port mapping rules
+
+    :Returns: None
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param info: The new nodes, by name
+    :type info: Dictionary
+
+    :param config: The settings of the cluster; see ``create.onefs.configure_cluster``
+    :type config: Dictionary
+    """
+    from vlab_cli.subcommands.create import onefs
+
+    onefs.configure_cluster(vlab_api, nodes=list(info.keys()), **config)
+
+
+def destroy_lab(vlab_api, info):
+    """Delete everything in a lab that's been powered off
+
+    :Returns: None
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param info: The results of the tasks (unused)
+    :type info: Dictionary
+    """
+    from vlab_cli.subcommands.delete import everything
+
+    everything.destroy_lab(vlab_api)
+
+
+# Name -> (what does it, what to tell the user)
+FOLLOW_UPS = {
+    'create_portmaps': (create_portmaps, 'Create port mapping rules'),
+    'delete_portmaps': (delete_portmaps, 'Delete port mapping rules'),
+    'setup_ecs': (setup_ecs, 'Set up ECS'),
+    'configure_onefs': (configure_onefs, 'Configure OneFS cluster'),
+    'destroy_lab': (destroy_lab, 'Delete your lab'),
+}
+
+
+class FollowUp(object):
+    """Work to do with the results of some tasks, once they're all done
+
+    :param action: What to do; one of ``FOLLOW_UPS``
+    :type action: String
+
+    :param **args: The arguments for the action; they must survive being JSON encoded
+    :type **args: Dictionary
+    """
+    def __init__(self, action, **args):
+        if action not in FOLLOW_UPS:
+            raise ValueError('Unknown follow-up: {}'.format(action))
+        self.action = action
+        self.args = args
+        # every task that ends in the same follow-up has the same ID, so it runs once
+        self.id = uuid.uuid4().hex
+
+    @property
+    def description(self):
+        return FOLLOW_UPS[self.action][1]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a follow-up from a task handle, or the task journal
+
+        :Returns: FollowUp
+
+        :Raises: ValueError
+
+        :param data: The output of ``FollowUp.to_dict``
+        :type data: Dictionary
+        """
+        try:
+            follow_up = cls(data['action'], **data['args'])
+            follow_up.id = data['id']
+        except (KeyError, TypeError):
+            raise ValueError('Not a follow-up: {}'.format(data))
+        return follow_up
+
+    def to_dict(self):
+        """Describe the follow-up for a task handle, or the task journal
+
+        :Returns: Dictionary
+        """
+        return {'id': self.id, 'action': self.action, 'args': self.args}
+
+    def run(self, vlab_api, info):
+        """Do the work
+
+        :Returns: Whatever the action returns
+
+        :param vlab_api: A valid API connection to vLab
+        :type vlab_api: vlab_cli.lib.api.vLabApi
+
+        :param info: What the tasks made, by name; the ``content`` of their results, merged together
+        :type info: Dictionary
+        """
+        return FOLLOW_UPS[self.action][0](vlab_api, info, **self.args)
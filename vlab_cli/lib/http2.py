@@ -0,0 +1,198 @@
+# -*- coding: UTF-8 -*-
+"""
+An optional HTTP/2 transport for vLabApi.
+
+Commands that fan out (i.e. polling many tasks, or creating many port mapping
+rules) normally open a pool of HTTP/1.1 connections, and every new connection
+costs a TCP and TLS handshake. Over HTTP/2 every concurrent call shares one
+multiplexed connection, which matters most when the vLab server is far away.
+
+HTTP/2 support needs ``httpx`` with the ``h2`` package, which aren't installed
+by default (``pip install vlab-cli[http2]``). Without them, or when the server
+only speaks HTTP/1.1, the CLI quietly uses the regular ``requests`` session.
+"""
+import datetime
+import threading
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from vlab_cli.lib.api import POOL_SIZE, get_ssl_context, get_session
+
+
+# The only keyword arguments vLabApi ever supplies to a requests.Session method
+CALL_KWARGS = ('headers', 'json', 'params', 'timeout', 'verify')
+# A request that might have reached the server is only sent again if that's harmless
+REPLAY_METHODS = frozenset(['GET', 'HEAD'])
+
+
+def available():
+    """Find out if the packages needed for HTTP/2 are installed
+
+    :Returns: Boolean
+    """
+    try:
+        import httpx
+        import h2
+    except ImportError:
+        return False
+    return True
+
+
+def connect(server, log):
+    """Obtain a session that uses HTTP/2, if it's available
+
+    :Returns: Http2Session or None
+
+    :param server: The URL of the vLab server
+    :type server: String
+
+    :param log: A logging object to aid in debugging
+    :type log: logging.Logger
+    """
+    if not available():
+        log.info('Unable to use HTTP/2; install the httpx and h2 packages')
+        return None
+    return Http2Session(server, log)
+
+
+class Http2Session(object):
+    """Quacks like a requests.Session, but sends the requests over HTTP/2
+
+    The first response tells if the server negotiated HTTP/2. If it didn't, or
+    the HTTP/2 connection breaks, every later call goes through the regular
+    (HTTP/1.1) session instead.
+
+    :param server: The URL of the vLab server
+    :type server: String
+
+    :param log: A logging object to aid in debugging
+    :type log: logging.Logger
+
+    :param fallback: The session to use when HTTP/2 doesn't work. Defaults to ``get_session(server)``.
+    :type fallback: requests.Session
+    """
+    def __init__(self, server, log, fallback=None):
+        self._server = server
+        self._log = log
+        self._fallback = fallback if fallback is not None else get_session(server)
+        self._clients = {}
+        self._lock = threading.Lock()
+        self.use_http2 = True
+
+    def mount(self, prefix, adapter):
+        """httpx owns the connections, so adapters only apply to the fallback session"""
+        self._fallback.mount(prefix, adapter)
+
+    def close(self):
+        """Close the HTTP/2 connection, and the fallback session"""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+        self._fallback.close()
+
+    def request(self, method, url, **kwargs):
+        """Perform an HTTP request
+
+        :Returns: requests.Response
+
+        :Raises: requests.exceptions.RequestException
+
+        :param method: The HTTP method
+        :type method: String
+
+        :param url: The full URL to call
+        :type url: String
+        """
+        unsupported = set(kwargs.keys()) - set(CALL_KWARGS)
+        if unsupported:
+            raise ValueError('HTTP/2 session does not support arguments: {}'.format(', '.join(unsupported)))
+        if not self.use_http2:
+            return self._fallback.request(method, url, **kwargs)
+        import httpx
+
+        verify = kwargs.pop('verify', True)
+        timeout = kwargs.pop('timeout', None)
+        try:
+            resp = self._client(verify).request(method.upper(), url, timeout=to_timeout(timeout), **kwargs)
+        except (httpx.RemoteProtocolError, httpx.LocalProtocolError) as doh:
+            # i.e. a proxy in the way that mangles HTTP/2
+            self._log.info('HTTP/2 failed, falling back to HTTP/1.1: {}'.format(doh))
+            self.use_http2 = False
+            if method.upper() not in REPLAY_METHODS:
+                # the server might have done the work; RetryPolicy decides if it's sent again
+                raise requests.exceptions.ConnectionError(str(doh))
+            return self._fallback.request(method, url, verify=verify, timeout=timeout, **kwargs)
+        except httpx.ConnectTimeout as doh:
+            raise requests.exceptions.ConnectTimeout(str(doh))
+        except httpx.TimeoutException as doh:
+            raise requests.exceptions.ReadTimeout(str(doh))
+        except httpx.TransportError as doh:
+            raise requests.exceptions.ConnectionError(str(doh))
+        if resp.http_version != 'HTTP/2':
+            self._log.info('vLab server does not support HTTP/2; using HTTP/1.1')
+            self.use_http2 = False
+        return to_response(resp)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def _client(self, verify):
+        """Obtain the client that holds the HTTP/2 connection; one per TLS verify setting"""
+        import httpx
+
+        verify = bool(verify)
+        with self._lock:
+            if verify not in self._clients:
+                # Same OS certificates as SSLContextAdapter
+                context = get_ssl_context() if verify else False
+                limits = httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE)
+                # no timeout unless the call has one, like requests
+                self._clients[verify] = httpx.Client(http2=True, verify=context, limits=limits, timeout=None)
+            return self._clients[verify]
+
+
+def to_timeout(timeout):
+    """Convert the ``timeout`` of a requests call into one httpx understands
+
+    :Returns: httpx.Timeout or None
+
+    :param timeout: Seconds, a (connect, read) tuple, or None to wait forever
+    :type timeout: Float or Tuple
+    """
+    import httpx
+
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+        return httpx.Timeout(read, connect=connect)
+    return httpx.Timeout(timeout)
+
+
+def to_response(http2_resp):
+    """Convert an httpx response into a requests.Response, which the rest of the CLI expects
+
+    :Returns: requests.Response
+
+    :param http2_resp: The response from the vLab server
+    :type http2_resp: httpx.Response
+    """
+    resp = requests.Response()
+    resp.status_code = http2_resp.status_code
+    resp.reason = http2_resp.reason_phrase
+    resp.url = str(http2_resp.url)
+    resp.headers = CaseInsensitiveDict(http2_resp.headers)
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp.elapsed = getattr(http2_resp, 'elapsed', datetime.timedelta(0))
+    resp._content = http2_resp.content
+    return resp
@@ -0,0 +1,302 @@
+# -*- coding: UTF-8 -*-
+"""
+An on-disk cache of API responses that rarely change, like the images a
+component can be deployed from.
+
+Looking up images means the vLab server runs a task every time, even though the
+answer only changes when a new image is released. The cache saves the final
+answer of GETs to a handful of read-mostly end points under ``~/.vlab/cache``:
+
+- A fresh entry (younger than the end point's TTL) is used without calling the server.
+- A stale entry is revalidated with ``If-None-Match``/``If-Modified-Since``; an
+  HTTP 304 means the saved answer is still good.
+- Changing something (i.e. POST, PUT, DELETE) throws away the entries it could affect.
+
+Entries are keyed by user, so people who share a computer never see each
+others' answers, and the least recently used entries are deleted once the cache
+is bigger than ``MAX_CACHE_BYTES``.
+"""
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import Counter
+from urllib.parse import urlparse
+
+from vlab_cli.lib.responses import to_response, from_response
+
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.vlab', 'cache')
+MAX_CACHE_BYTES = 10 * 1024 * 1024
+# End point path -> how many seconds a saved answer is fresh for
+CACHE_TTLS = (
+    # templates are created by users, so that list changes much more often than images
+    (re.compile(r'^/api/2/inf/deployment/image$'), 3600),
+    (re.compile(r'^/api/2/inf/[^/]+/image$'), 86400),
+    (re.compile(r'^/api/1/quota$'), 300),
+    (re.compile(r'^/api/2/inf/gateway$'), 60),
+)
+# Changing an end point matching the 1st pattern invalidates saved answers matching the 2nd
+INVALIDATIONS = (
+    (re.compile(r'^/api/2/inf/template'), re.compile(r'^/api/2/inf/deployment/image$')),
+    (re.compile(r'^/api/2/inf/gateway'), re.compile(r'^/api/2/inf/gateway$')),
+    (re.compile(r'^/api/1/inf/power'), re.compile(r'^/api/2/inf/gateway$')),
+    # creating or deleting any VM can push you over (or under) your quota
+    (re.compile(r'^/api/(1|2)/inf/'), re.compile(r'^/api/1/quota$')),
+)
+VALIDATORS = (('ETag', 'If-None-Match'), ('Last-Modified', 'If-Modified-Since'))
+
+
+class HttpCache(object):
+    """Saves and reuses the answers of GETs to read-mostly API end points
+
+    :param user: Who the answers belong to
+    :type user: String
+
+    :param cache_dir: Where to save the answers
+    :type cache_dir: String
+
+    :param max_bytes: Delete the least recently used answers once the cache is bigger than this
+    :type max_bytes: Integer
+
+    :param ttls: The end point path patterns to cache, and for how many seconds
+    :type ttls: Tuple
+
+    :param invalidations: Which saved answers to throw away when an end point is changed
+    :type invalidations: Tuple
+    """
+    def __init__(self, user, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, ttls=CACHE_TTLS,
+                 invalidations=INVALIDATIONS):
+        self._user = user
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._ttls = ttls
+        self._invalidations = invalidations
+        # task URL -> the entry the result of that task should be saved as
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.stats = Counter()
+        # replaceable for testing
+        self._clock = time.time
+
+    def ttl_for(self, url):
+        """Obtain how long the answer of an end point is fresh for
+
+        :Returns: Integer or None (when the end point isn't cached)
+
+        :param url: The URL, or just the path, of the API end point
+        :type url: String
+        """
+        path = urlparse(url).path or url
+        for pattern, ttl in self._ttls:
+            if pattern.search(path):
+                return ttl
+        return None
+
+    def send(self, method, url, params, do_request, log):
+        """Answer an API call from the cache, or make the call and save the answer
+
+        :Returns: requests.Response
+
+        :param method: The HTTP method of the call, like ``get``
+        :type method: String
+
+        :param url: The URL being called
+        :type url: String
+
+        :param params: The query parameters of the call
+        :type params: Dictionary
+
+        :param do_request: Makes the call; takes a dictionary of extra headers to send
+        :type do_request: Function
+
+        :param log: A logging object to aid in debugging
+        :type log: logging.Logger
+        """
+        if method.lower() != 'get':
+            resp = do_request({})
+            if resp.ok:
+                self.invalidate(url)
+            return resp
+        with self._lock:
+            pending = self._pending.get(url)
+        if pending is not None:
+            return self._finish_task(url, pending, do_request)
+        ttl = self.ttl_for(url)
+        if ttl is None:
+            return do_request({})
+        key = self._key(url, params)
+        entry = self._load(key)
+        if entry is not None and self._clock() - entry['stored'] < ttl:
+            log.debug('Answering GET %s from the cache', url)
+            self.stats['hits'] += 1
+            self._touch(key)
+            return self._to_response(entry)
+        conditional = {}
+        if entry is not None:
+            for header, conditional_header in VALIDATORS:
+                if entry['validators'].get(header):
+                    conditional[conditional_header] = entry['validators'][header]
+        resp = do_request(conditional)
+        if resp.status_code == 304 and entry is not None:
+            log.debug('Cached answer of GET %s is still valid', url)
+            self.stats['revalidated'] += 1
+            entry['stored'] = self._clock()
+            self._save(key, entry)
+            return self._to_response(entry)
+        self.stats['misses'] += 1
+        validators = {x: resp.headers[x] for x, _ in VALIDATORS if resp.headers.get(x)}
+        if resp.status_code == 202:
+            # The answer is the result of a task; save it once the task is done
+            with self._lock:
+                for task_url in task_urls(url, resp):
+                    self._pending[task_url] = (key, url, validators)
+        elif resp.status_code == 200:
+            self._save(key, self._new_entry(url, resp, validators))
+        return resp
+
+    def invalidate(self, url):
+        """Throw away every saved answer that changing an end point could affect
+
+        :Returns: None
+
+        :param url: The URL, or just the path, of the end point that was changed
+        :type url: String
+        """
+        path = urlparse(url).path or url
+        stale = [cached for changed, cached in self._invalidations if changed.search(path)]
+        if not stale:
+            return
+        for entry_file, entry in self._entries():
+            if any(x.search(entry['path']) for x in stale):
+                self.stats['invalidated'] += 1
+                _remove(entry_file)
+
+    def clear(self):
+        """Delete every saved answer
+
+        :Returns: None
+        """
+        for entry_file, _ in self._entries():
+            _remove(entry_file)
+
+    def _finish_task(self, url, pending, do_request):
+        resp = do_request({})
+        if resp.status_code != 202:
+            with self._lock:
+                self._pending = {k: v for k, v in self._pending.items() if v is not pending}
+            if resp.status_code == 200:
+                key, issued_by, validators = pending
+                self._save(key, self._new_entry(issued_by, resp, validators))
+        return resp
+
+    def _key(self, url, params):
+        raw = json.dumps([self._user, url, sorted((params or {}).items())], default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def _new_entry(self, url, resp, validators):
+        return {'path': urlparse(url).path,
+                'stored': self._clock(),
+                'validators': validators,
+                'response': from_response(resp)}
+
+    def _to_response(self, entry):
+        resp = to_response(entry['response'])
+        resp.from_cache = True
+        return resp
+
+    def _entry_file(self, key):
+        return os.path.join(self._cache_dir, '{}.json'.format(key))
+
+    def _load(self, key):
+        try:
+            with open(self._entry_file(key)) as the_file:
+                return json.load(the_file)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, key, entry):
+        entry_file = self._entry_file(key)
+        tmp_file = '{}.{}.tmp'.format(entry_file, threading.get_ident())
+        try:
+            # the answers are only for the user who asked
+            os.makedirs(self._cache_dir, mode=0o700, exist_ok=True)
+            with open(tmp_file, 'w') as the_file:
+                json.dump(entry, the_file)
+            os.replace(tmp_file, entry_file)
+        except OSError:
+            # A cache that cannot be written is just a slower CLI
+            _remove(tmp_file)
+            return
+        self._evict()
+
+    def _touch(self, key):
+        try:
+            os.utime(self._entry_file(key))
+        except OSError:
+            pass
+
+    def _entries(self):
+        """Every saved answer, and the file it's saved in"""
+        try:
+            names = os.listdir(self._cache_dir)
+        except OSError:
+            return
+        for name in names:
+            if not name.endswith('.json'):
+                continue
+            entry_file = os.path.join(self._cache_dir, name)
+            try:
+                with open(entry_file) as the_file:
+                    yield entry_file, json.load(the_file)
+            except (OSError, ValueError):
+                continue
+
+    def _evict(self):
+        """Delete the least recently used answers until the cache is small enough"""
+        files = []
+        for name in os.listdir(self._cache_dir):
+            entry_file = os.path.join(self._cache_dir, name)
+            try:
+                info = os.stat(entry_file)
+            except OSError:
+                continue
+            files.append((info.st_mtime, info.st_size, entry_file))
+        total = sum(x[1] for x in files)
+        for _, size, entry_file in sorted(files):
+            if total <= self._max_bytes:
+                break
+            self.stats['evicted'] += 1
+            _remove(entry_file)
+            total -= size
+
+
+def task_urls(url, resp):
+    """The URLs a client might poll for the result of a task
+
+    :Returns: List
+
+    :param url: The URL that issued the task
+    :type url: String
+
+    :param resp: The response that issued the task
+    :type resp: requests.Response
+    """
+    urls = []
+    try:
+        urls.append('{}/task/{}'.format(url, resp.json()['content']['task-id']))
+    except (ValueError, KeyError, TypeError):
+        pass
+    status_url = resp.links.get('status', {}).get('url')
+    if status_url:
+        urls.append(status_url)
+    return urls
+
+
+def _remove(a_file):
+    try:
+        os.remove(a_file)
+    except OSError:
+        pass
@@ -0,0 +1,220 @@
+# -*- coding: UTF-8 -*-
+"""
+A journal of the tasks issued to vLab, so they can be waited on again later.
+
+Creating a deployment can take an hour. If the command that issued the task is
+stopped (i.e. Ctrl-C, or the laptop goes to sleep) or times out, the task keeps
+running on the vLab server, but the CLI forgets about it. Every task issued by
+an API call that changes something is written to ``~/.vlab/tasks.jsonl``, along
+with when it finished, so ``vlab tasks wait`` and ``vlab tasks resume`` can pick
+up where the command left off. Tasks left to ``vlab --no-wait`` also record the
+work their command does once they're done (see ``vlab_cli.lib.follow_ups``), and
+when that work is done.
+
+The journal is a file of JSON lines that's only ever appended to (so concurrent
+commands don't clobber each other), and it's rewritten with only the newest
+``KEEP_TASKS`` tasks once it's bigger than ``MAX_JOURNAL_BYTES``.
+"""
+import os
+import json
+import time
+import threading
+
+
+JOURNAL_FILE = os.path.join(os.path.expanduser('~'), '.vlab', 'tasks.jsonl')
+MAX_JOURNAL_BYTES = 512 * 1024
+KEEP_TASKS = 200
+
+
+class TaskJournal(object):
+    """Records the tasks issued to vLab, and when they finish
+
+    :param journal_file: Where the tasks are recorded
+    :type journal_file: String
+
+    :param max_bytes: Throw away old tasks once the journal is bigger than this
+    :type max_bytes: Integer
+
+    :param keep: How many of the newest tasks to keep, when old ones are thrown away
+    :type keep: Integer
+    """
+    def __init__(self, journal_file=JOURNAL_FILE, max_bytes=MAX_JOURNAL_BYTES, keep=KEEP_TASKS):
+        self._journal_file = journal_file
+        self._max_bytes = max_bytes
+        self._keep = keep
+        self._lock = threading.Lock()
+        # replaceable for testing
+        self._clock = time.time
+
+    def issued(self, server, method, endpoint, task_id, status_url, request_id):
+        """Record a task the vLab server just started
+
+        :Returns: None
+
+        :param server: The URL of the vLab server
+        :type server: String
+
+        :param method: The HTTP method that issued the task, like ``post``
+        :type method: String
+
+        :param endpoint: The path of the API end point that issued the task
+        :type endpoint: String
+
+        :param task_id: The ID of the task
+        :type task_id: String
+
+        :param status_url: The URL to check on the task with
+        :type status_url: String
+
+        :param request_id: The X-REQUEST-ID of the command that issued the task
+        :type request_id: String
+        """
+        self._append({'event': 'issued', 'task_id': task_id, 'server': server, 'method': method.upper(),
+                      'endpoint': endpoint, 'status_url': status_url, 'request_id': request_id,
+                      'started': self._clock()})
+
+    def finished(self, task_id, status):
+        """Record that a task is done
+
+        :Returns: None
+
+        :param task_id: The ID of the task
+        :type task_id: String
+
+        :param status: The HTTP status code the task finished with
+        :type status: Integer
+        """
+        self._append({'event': 'finished', 'task_id': task_id, 'status': status,
+                      'finished': self._clock()})
+
+    def follow_up(self, task_id, follow_up):
+        """Record what to do once a task is done
+
+        :Returns: None
+
+        :param task_id: The ID of the task
+        :type task_id: String
+
+        :param follow_up: The output of ``FollowUp.to_dict``
+        :type follow_up: Dictionary
+        """
+        self._append({'event': 'follow_up', 'task_id': task_id, 'follow_up': follow_up})
+
+    def followed_up(self, follow_up_id, error=None):
+        """Record that the follow-up of some tasks is done, or never will be
+
+        :Returns: None
+
+        :param follow_up_id: The ID of the follow-up
+        :type follow_up_id: String
+
+        :param error: Why the follow-up was given up on
+        :type error: String
+        """
+        self._append({'event': 'followed_up', 'follow_up_id': follow_up_id, 'error': error})
+
+    def tasks(self, server=None):
+        """Obtain every recorded task, newest first
+
+        A task that hasn't finished has a ``status`` of None. A task with work
+        left for after it's done has a ``follow_up``, and a ``followed_up`` of
+        False until that work is done.
+
+        :Returns: List
+
+        :param server: Only the tasks issued to this vLab server
+        :type server: String
+        """
+        with self._lock:
+            tasks = self._read()
+        found = [x for x in tasks.values() if server is None or x['server'] == server]
+        return sorted(found, key=lambda x: x['started'], reverse=True)
+
+    def find(self, task_id, server=None):
+        """Look up a task by its ID, or the start of its ID
+
+        :Returns: Dictionary
+
+        :Raises: KeyError (if no task, or more than one task, matches)
+
+        :param task_id: The ID of the task, or enough of the start of it to be unique
+        :type task_id: String
+
+        :param server: Only the tasks issued to this vLab server
+        :type server: String
+        """
+        found = [x for x in self.tasks(server) if x['task_id'].startswith(task_id)]
+        if len(found) != 1:
+            problem = 'No task' if not found else 'More than one task'
+            raise KeyError('{} matches {}'.format(problem, task_id))
+        return found[0]
+
+    def _append(self, record):
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self._journal_file), exist_ok=True)
+                with open(self._journal_file, 'a') as the_file:
+                    the_file.write(json.dumps(record) + '\n')
+                if os.path.getsize(self._journal_file) > self._max_bytes:
+                    self._compact()
+            except OSError:
+                # Not being able to resume a task shouldn't break the command that issued it
+                pass
+
+    def _read(self):
+        """Fold the journal into the latest state of each task"""
+        tasks = {}
+        try:
+            with open(self._journal_file) as the_file:
+                lines = the_file.readlines()
+        except OSError:
+            return tasks
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # i.e. a line that was only partly written
+                continue
+            if record.get('event') == 'issued':
+                task = {k: v for k, v in record.items() if k != 'event'}
+                task.update({'status': None, 'finished': None})
+                # a compacted journal keeps the follow-up in the issued record
+                task.setdefault('follow_up', None)
+                task.setdefault('followed_up', False)
+                tasks[record['task_id']] = task
+            elif record.get('event') == 'finished' and record.get('task_id') in tasks:
+                tasks[record['task_id']].update(status=record['status'], finished=record['finished'])
+            elif record.get('event') == 'follow_up' and record.get('task_id') in tasks:
+                tasks[record['task_id']].update(follow_up=record['follow_up'], followed_up=False)
+            elif record.get('event') == 'followed_up':
+                for task in tasks.values():
+                    if (task['follow_up'] or {}).get('id') == record.get('follow_up_id'):
+                        task['followed_up'] = True
+        return tasks
+
+    def _compact(self):
+        """Rewrite the journal with only the newest tasks"""
+        newest = sorted(self._read().values(), key=lambda x: x['started'], reverse=True)[:self._keep]
+        tmp_file = '{}.{}.tmp'.format(self._journal_file, os.getpid())
+        with open(tmp_file, 'w') as the_file:
+            for task in reversed(newest):
+                issued = {k: v for k, v in task.items() if k not in ('status', 'finished')}
+                the_file.write(json.dumps(dict(issued, event='issued')) + '\n')
+                if task['status'] is not None:
+                    the_file.write(json.dumps({'event': 'finished', 'task_id': task['task_id'],
+                                               'status': task['status'],
+                                               'finished': task['finished']}) + '\n')
+        os.replace(tmp_file, self._journal_file)
+
+
+def task_id_of(url):
+    """Obtain the ID of a task from the URL used to check on it
+
+    :Returns: String or None (when the URL isn't for checking on a task)
+
+    :param url: The URL of an API call
+    :type url: String
+    """
+    if '/task/' not in url:
+        return None
+    return url.rsplit('/task/', 1)[1].split('?', 1)[0].strip('/') or None
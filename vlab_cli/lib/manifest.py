@@ -0,0 +1,414 @@
+# -*- coding: UTF-8 -*-
+"""
+A static description of every vLab CLI command, for instant help and tab-completion.
+
+Rendering a help page, or figuring out what can be tab-completed, requires
+importing every subcommand module (and click_completion). That's way more work
+than either should take, so at build time the whole command tree is written to
+a JSON manifest. The manifest looks like::
+
+  {"version" : "2020.5.21",
+   "command" : {
+    "help" : "Usage: vlab [OPTIONS] COMMAND [ARGS]...",
+    "short_help" : "CLI tool for interacting with your virtual lab",
+    "hidden" : false,
+    "options" : [
+     {"opts" : ["--vlab-url"],
+      "secondary_opts" : [],
+      "is_flag" : false,
+      "hidden" : false,
+      "help" : "The URL of the vLab server",
+      "choices" : null}
+    ],
+    "commands" : {"create" : {"help" : "...", "commands" : {...}}}
+   }
+  }
+
+The functions that read the manifest only use the standard library; importing
+this module must stay cheap. Build the manifest with::
+
+  python -m vlab_cli.lib.manifest
+"""
+import os
+import re
+import sys
+import json
+import shlex
+from getpass import getuser
+
+from vlab_cli import version
+
+
+MANIFEST_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'manifest.json')
+PROG_NAME = 'vlab'
+COMPLETE_VAR = '_VLAB_COMPLETE'
+# Set to anything to always import the commands, i.e. to benchmark doing so
+NO_MANIFEST_VAR = 'VLAB_NO_MANIFEST'
+HELP_OPTS = ('-h', '--help')
+HELP_WIDTH = 80
+# The default username is whoever runs the CLI, not whoever built it
+USER_MARKER = '@@VLAB_USER@@'
+UNSAFE_CHARS = re.compile(r'[^\w@%+=:,./-]').search
+
+
+def build_manifest(cli):
+    """Describe an entire click command tree
+
+    :Returns: Dictionary
+
+    :param cli: The root ``vlab`` command
+    :type cli: click.Group
+    """
+    import click
+
+    username = [x for x in cli.params if x.name == 'vlab_username']
+    for param in username:
+        original_default = param.default
+        param.default = USER_MARKER
+    try:
+        settings = dict(cli.context_settings, terminal_width=HELP_WIDTH, max_content_width=HELP_WIDTH)
+        root_ctx = click.Context(cli, info_name=PROG_NAME, **settings)
+        command = _describe(cli, root_ctx)
+    finally:
+        for param in username:
+            param.default = original_default
+    return {'version': version.__version__, 'command': command}
+
+
+def _describe(cmd, ctx):
+    """Recursively describe a click command, and any subcommands it has
+
+    :Returns: Dictionary
+
+    :param cmd: The command to describe
+    :type cmd: click.Command
+
+    :param ctx: The context the command would be invoked with
+    :type ctx: click.Context
+    """
+    import click
+
+    info = {'help': cmd.get_help(ctx),
+            'short_help': cmd.get_short_help_str(limit=HELP_WIDTH),
+            'hidden': getattr(cmd, 'hidden', False),
+            'options': [],
+           }
+    for param in cmd.get_params(ctx):
+        if not isinstance(param, click.Option):
+            continue
+        if isinstance(param.type, click.Choice):
+            choices = list(param.type.choices)
+        else:
+            choices = None
+        info['options'].append({'opts': list(param.opts),
+                                'secondary_opts': list(param.secondary_opts),
+                                'is_flag': param.is_flag,
+                                # i.e. MultiValue; can't know how many args it'll eat
+                                'nargs': -1 if hasattr(param, 'save_other_options') else param.nargs,
+                                # HiddenOption works by not having a help record
+                                'hidden': param.get_help_record(ctx) is None,
+                                'help': param.help,
+                                'choices': choices})
+    if isinstance(cmd, click.Group):
+        info['aliases'] = dict(getattr(cmd, 'aliases', {}))
+        info['commands'] = {}
+        for name in cmd.list_commands(ctx):
+            sub_cmd = cmd.get_command(ctx, name)
+            sub_ctx = click.Context(sub_cmd, info_name=name, parent=ctx, **sub_cmd.context_settings)
+            info['commands'][name] = _describe(sub_cmd, sub_ctx)
+    return info
+
+
+def write_manifest(cli, manifest_file=MANIFEST_FILE):
+    """Save the manifest of a command tree to disk
+
+    :Returns: None
+
+    :param cli: The root ``vlab`` command
+    :type cli: click.Group
+
+    :param manifest_file: Where to save the manifest
+    :type manifest_file: String
+    """
+    manifest = build_manifest(cli)
+    with open(manifest_file, 'w') as the_file:
+        json.dump(manifest, the_file, indent=1, sort_keys=True)
+
+
+def load_manifest(manifest_file=MANIFEST_FILE):
+    """Read the manifest, if it exists and matches this version of the CLI
+
+    :Returns: Dictionary or None
+
+    :param manifest_file: The location of the manifest
+    :type manifest_file: String
+    """
+    try:
+        with open(manifest_file) as the_file:
+            manifest = json.load(the_file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get('version') != version.__version__:
+        # left over from an older install; it could be lying about the commands
+        return None
+    return manifest
+
+
+def serve_from_manifest(args, environ=os.environ, manifest_file=MANIFEST_FILE):
+    """Handle a help page, or a tab-completion request, without importing any commands
+
+    :Returns: Boolean - True if the request was handled, False if the CLI needs to handle it
+
+    :param args: The command line arguments supplied, minus the program name
+    :type args: List
+
+    :param environ: The environment variables of the process
+    :type environ: Dictionary
+
+    :param manifest_file: The location of the manifest
+    :type manifest_file: String
+    """
+    if environ.get(NO_MANIFEST_VAR):
+        return False
+    complete_instr = environ.get(COMPLETE_VAR, '')
+    if complete_instr:
+        if not complete_instr.startswith('complete'):
+            # i.e. installing, or sourcing the completion code
+            return False
+    elif not any(x in HELP_OPTS for x in args):
+        return False
+    manifest = load_manifest(manifest_file)
+    if manifest is None:
+        return False
+    if complete_instr:
+        return _serve_completion(manifest['command'], complete_instr, environ)
+    return _serve_help(manifest['command'], args)
+
+
+def _serve_help(root, args):
+    """Print the help page of the command the arguments refer to
+
+    :Returns: Boolean
+
+    :param root: The description of the root ``vlab`` command
+    :type root: Dictionary
+
+    :param args: The command line arguments supplied, minus the program name
+    :type args: List
+    """
+    node, remaining = resolve(root, args, stop_at_help=True)
+    if node is None or not remaining or remaining[0] not in HELP_OPTS:
+        return False
+    sys.stdout.write(node['help'].replace(USER_MARKER, getuser()) + '\n')
+    return True
+
+
+def resolve(root, args, stop_at_help=False):
+    """Walk the arguments to find which command they invoke
+
+    Mirrors how click parses the command line; options (and their values) are
+    skipped, and partially typed command names are matched like ``AliasedGroup``.
+
+    :Returns: Tuple (command description or None, remaining arguments)
+
+    :param root: The description of the root ``vlab`` command
+    :type root: Dictionary
+
+    :param args: The command line arguments supplied, minus the program name
+    :type args: List
+
+    :param stop_at_help: Return as soon as a help flag is found
+    :type stop_at_help: Boolean
+    """
+    node = root
+    args = list(args)
+    while args:
+        arg = args[0]
+        if arg == '--':
+            return None, args
+        if stop_at_help and arg in HELP_OPTS:
+            return node, args
+        if arg.startswith('-') and len(arg) > 1:
+            option = _find_option(node, arg.split('=', 1)[0])
+            if option is None or option['nargs'] < 0:
+                return None, args
+            args.pop(0)
+            if not option['is_flag'] and '=' not in arg:
+                if len(args) < option['nargs']:
+                    return node, [arg]
+                del args[:option['nargs']]
+            continue
+        if 'commands' not in node:
+            # an argument to the command itself
+            args.pop(0)
+            continue
+        name = _match_command(node, arg)
+        if name is None:
+            return None, args
+        node = node['commands'][name]
+        args.pop(0)
+    return node, args
+
+
+def _find_option(node, opt):
+    """Lookup the description of an option by any of its flags
+
+    :Returns: Dictionary or None
+
+    :param node: The command the option belongs to
+    :type node: Dictionary
+
+    :param opt: The flag, like ``--name`` or ``-n``
+    :type opt: String
+    """
+    for option in node['options']:
+        if opt in option['opts'] or opt in option['secondary_opts']:
+            return option
+    if opt in HELP_OPTS:
+        return {'opts': [opt], 'secondary_opts': [], 'is_flag': True, 'nargs': 1,
+                'hidden': False, 'help': None, 'choices': None}
+    return None
+
+
+def _match_command(node, name):
+    """Find a subcommand by name, or by a unique prefix of its name
+
+    :Returns: String or None
+
+    :param node: The group the subcommand belongs to
+    :type node: Dictionary
+
+    :param name: What the user typed
+    :type name: String
+    """
+    if name in node['commands']:
+        return name
+    elif name in node.get('aliases', {}):
+        return node['aliases'][name]
+    matches = [x for x in node['commands'] if x.startswith(name)]
+    if len(matches) == 1:
+        return matches[0]
+    return None
+
+
+def get_choices(root, args, incomplete):
+    """Figure out what can be tab-completed
+
+    Follows the same rules as ``click_completion.core.get_choices``.
+
+    :Returns: List of tuples (choice, help)
+
+    :param root: The description of the root ``vlab`` command
+    :type root: Dictionary
+
+    :param args: The arguments already typed, minus the program name
+    :type args: List
+
+    :param incomplete: The partially typed argument
+    :type incomplete: String
+    """
+    node, remaining = resolve(root, args)
+    if node is None:
+        return []
+    if remaining:
+        # the last argument is an option that needs a value
+        option = _find_option(node, remaining[-1])
+        choices = option['choices'] or []
+        return [(x, None) for x in choices if x.startswith(incomplete)]
+    choices = []
+    if incomplete and not incomplete[:1].isalnum():
+        for option in node['options']:
+            if option['hidden']:
+                continue
+            choices += [(x, option['help']) for x in option['opts'] if x.startswith(incomplete)]
+            choices += [(x, None) for x in option['secondary_opts'] if x.startswith(incomplete)]
+    for name, sub_node in sorted(node.get('commands', {}).items()):
+        if name.startswith(incomplete) and not sub_node['hidden']:
+            choices.append((name, sub_node['short_help']))
+    return choices
+
+
+def _serve_completion(root, complete_instr, environ):
+    """Print the tab-completion results in the format the shell expects
+
+    :Returns: Boolean
+
+    :param root: The description of the root ``vlab`` command
+    :type root: Dictionary
+
+    :param complete_instr: The value of the ``_VLAB_COMPLETE`` environment variable
+    :type complete_instr: String
+
+    :param environ: The environment variables of the process
+    :type environ: Dictionary
+    """
+    shell = complete_instr.split('-', 1)[1] if '-' in complete_instr else 'bash'
+    if shell == 'bash':
+        cwords = _split_args(environ.get('COMP_WORDS', ''))
+        cword = int(environ.get('COMP_CWORD', len(cwords)))
+        args = cwords[1:cword]
+        incomplete = cwords[cword] if cword < len(cwords) else ''
+    else:
+        commandline = environ.get('COMMANDLINE', '')
+        args = _split_args(commandline)[1:]
+        incomplete = ''
+        if args and not commandline.endswith(' '):
+            incomplete = args.pop()
+    choices = get_choices(root, args, incomplete)
+    if shell == 'bash':
+        output = '\t'.join(re.sub(r"""([\s\\"'()])""", r'\\\1', x) for x, _ in choices)
+    elif shell == 'fish':
+        output = ''.join('{}\t{}\n'.format(x, re.sub(r'\s', ' ', h)) if h else '{}\n'.format(x) for x, h in choices)
+    elif shell == 'zsh':
+        escape = lambda s: s.replace('"', '""').replace("'", "''").replace('$', '\\$').replace('`', '\\`')
+        res = ['"{}"\\:"{}"'.format(escape(x), escape(h)) if h else '"{}"'.format(escape(x)) for x, h in choices]
+        output = "_arguments '*: :(({}))'\n".format('\n'.join(res)) if res else '_files\n'
+    elif shell == 'powershell':
+        output = ''.join('{}\n'.format(_single_quote(x)) for x, _ in choices)
+    else:
+        return False
+    sys.stdout.write(output)
+    return True
+
+
+def _split_args(line):
+    """Like shlex.split, but tolerates the unfinished quotes of a partially typed line
+
+    :Returns: List
+
+    :param line: The command line typed so far
+    :type line: String
+    """
+    lex = shlex.shlex(line, posix=True)
+    lex.whitespace_split = True
+    lex.commenters = ''
+    res = []
+    try:
+        for token in lex:
+            res.append(token)
+    except ValueError:
+        # No closing quotation
+        if lex.token:
+            res.append(lex.token)
+    return res
+
+
+def _single_quote(value):
+    """Quote a value so PowerShell treats it as a single argument
+
+    :Returns: String
+
+    :param value: The thing to quote
+    :type value: String
+    """
+    if not value:
+        return "''"
+    if UNSAFE_CHARS(value) is None:
+        return value
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+if __name__ == '__main__':
+    from vlab_cli.vlab import cli
+    write_manifest(cli)
+    print('Wrote {}'.format(MANIFEST_FILE))
@@ -0,0 +1,185 @@
+# -*- coding: UTF-8 -*-
+"""
+Remembers the answers of GETs for as long as a single vlab command runs.
+
+Different parts of a command often look up the same thing (like the gateway,
+or a VM's port mapping rules). The memo makes sure the vLab server is only
+asked once:
+
+- Identical GETs that are in flight at the same time (i.e. from
+  ``vLabApi.bulk``) are coalesced into one HTTP request.
+- The answer of a GET, or the result of the task a GET issued, is reused by
+  later identical GETs.
+- Changing a resource (i.e. POST, PUT, DELETE) forgets every answer from the
+  same family of end points, like ``/api/2/inf/onefs``.
+
+Every caller gets its own ``requests.Response``, so one caller modifying the
+decoded JSON can't change what another caller sees. Decoding the JSON body is
+only done once per response, no matter how many times ``.json()`` is called.
+"""
+import threading
+from collections import Counter
+from concurrent.futures import Future
+from urllib.parse import urlparse
+
+import requests
+
+from vlab_cli.lib.http_cache import task_urls
+
+
+# How many parts of the path make up a family, i.e. /api/2/inf/onefs
+FAMILY_DEPTH = 4
+# Changing these can change the state of every VM
+CLEARS_ALL = frozenset(['/api/1/inf/power', '/api/1/inf/inventory'])
+
+
+class RequestMemo(object):
+    """Coalesces and remembers GETs for the life of a command"""
+    def __init__(self):
+        self._lock = threading.Lock()
+        # key -> response
+        self._answers = {}
+        # key -> Future of the response
+        self._in_flight = {}
+        # task URL -> key the result of that task is the answer for
+        self._pending = {}
+        self.stats = Counter()
+
+    def send(self, method, url, params, do_request, log):
+        """Answer a GET from memory, or make the API call and remember the answer
+
+        :Returns: requests.Response
+
+        :param method: The HTTP method of the call, like ``get``
+        :type method: String
+
+        :param url: The URL being called
+        :type url: String
+
+        :param params: The query parameters of the call
+        :type params: Dictionary
+
+        :param do_request: Makes the call; takes no arguments
+        :type do_request: Function
+
+        :param log: A logging object to aid in debugging
+        :type log: logging.Logger
+        """
+        if method.lower() != 'get':
+            resp = do_request()
+            self.invalidate(url)
+            return resp
+        key = (url, tuple(sorted((params or {}).items())))
+        with self._lock:
+            if key in self._answers:
+                self.stats['hits'] += 1
+                log.debug('Answering GET %s from memory', url)
+                return copy_response(self._answers[key], from_cache=True)
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+        if not leader:
+            self.stats['coalesced'] += 1
+            log.debug('Waiting on identical GET %s that is already in flight', url)
+            return copy_response(future.result())
+        try:
+            resp = do_request()
+        except BaseException as doh:
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(doh)
+            raise
+        self._remember(key, url, resp)
+        future.set_result(resp)
+        return copy_response(resp)
+
+    def _remember(self, key, url, resp):
+        with self._lock:
+            self._in_flight.pop(key, None)
+            issued_by = self._pending.pop(url, None)
+            if resp.status_code == 202:
+                # The answer is the result of the task
+                for task_url in task_urls(url, resp):
+                    self._pending[task_url] = key
+            elif resp.status_code == 200:
+                self._answers[key] = resp
+                if issued_by is not None:
+                    self._answers[issued_by] = resp
+
+    def invalidate(self, url):
+        """Forget every answer from the same family of end points as a URL
+
+        :Returns: None
+
+        :param url: The URL, or just the path, of the end point that was changed
+        :type url: String
+        """
+        changed = family(url)
+        with self._lock:
+            if changed in CLEARS_ALL:
+                forget = list(self._answers.keys())
+            else:
+                forget = [x for x in self._answers.keys() if family(x[0]) == changed]
+            for key in forget:
+                self._answers.pop(key)
+            self._pending = {k: v for k, v in self._pending.items() if family(v[0]) != changed}
+            self.stats['invalidated'] += len(forget)
+
+    def clear(self):
+        """Forget everything; i.e. when ``vlab shell`` starts a new command
+
+        :Returns: None
+        """
+        with self._lock:
+            self._answers.clear()
+            self._pending.clear()
+
+
+class MemoResponse(requests.Response):
+    """A response that only decodes its JSON body once"""
+    _json = None
+
+    def json(self, **kwargs):
+        if kwargs:
+            return super(MemoResponse, self).json(**kwargs)
+        if self._json is None:
+            self._json = super(MemoResponse, self).json()
+        return self._json
+
+
+def copy_response(resp, from_cache=False):
+    """Create a new response with the same status, headers and body as another
+
+    :Returns: MemoResponse
+
+    :param resp: The response to copy
+    :type resp: requests.Response
+
+    :param from_cache: Set to True when the server wasn't called to get the response
+    :type from_cache: Boolean
+    """
+    new_resp = MemoResponse()
+    new_resp.status_code = resp.status_code
+    new_resp.reason = resp.reason
+    new_resp.url = resp.url
+    new_resp.headers = resp.headers.copy()
+    new_resp.encoding = resp.encoding
+    new_resp.request = resp.request
+    new_resp.elapsed = resp.elapsed
+    new_resp._content = resp.content
+    new_resp.from_cache = from_cache or getattr(resp, 'from_cache', False) is True
+    return new_resp
+
+
+def family(url):
+    """Obtain the family of end points a URL belongs to, like ``/api/2/inf/onefs``
+
+    :Returns: String
+
+    :param url: The URL, or just the path, of an end point
+    :type url: String
+    """
+    path = urlparse(url).path or url
+    return '/'.join(path.split('/')[:FAMILY_DEPTH + 1])
@@ -1,17 +1,31 @@
 # -*- coding: UTF-8 -*-
-"""Handles checking for new versions of the CLI"""
-import os.path
+"""Handles checking for new versions of the CLI
+
+Looking up the latest version means downloading and parsing a web page, so the
+answer is saved to a stamp file in ``~/.vlab/``. Every command uses the saved
+answer, and once the stamp is older than ``UPDATE_CHECK_TTL`` a background
+thread refreshes it for the next invocation.
+"""
+import os
+import json
+import time
+import threading
 import subprocess
 import urllib.request
-from bs4 import BeautifulSoup
 
 from vlab_cli import version
-from vlab_cli.lib.api import build_url
+from vlab_cli.lib.api import USER_AGENT, build_url, get_session
 from vlab_cli.lib.widgets import prompt
 from vlab_cli.lib.connectorizer import Connectorizer
 from vlab_cli.lib.widgets import typewriter
 
 
+UPDATE_CHECK_URL = 'https://vlab.emc.com/getting_started.html'
+UPDATE_CHECK_FILE = os.path.join(os.path.expanduser('~'), '.vlab', 'update_check.json')
+UPDATE_CHECK_TTL = 86400 # seconds; new versions are released way less often than daily
+UPDATE_CHECK_TIMEOUT = 5 # seconds; the CLI waits on the refresh before exiting, so it's never retried
+
+
 def handle_updates(vlab_api, vlab_config, skip_update_check):
     """Check for an updated CLI, and prompt the user to download if available.
 
@@ -28,17 +42,15 @@ def handle_updates(vlab_api, vlab_config, skip_update_check):
     """
     if skip_update_check:
         return
-    page = vlab_api.get('https://vlab.emc.com/getting_started.html').content
-    soup = BeautifulSoup(page, features="html.parser")
-    site_version = ''
-    for a in soup.find_all('a', href=True):
-        url = a['href']
-        package = os.path.basename(url)
-        if package.startswith('vlab-cli'):
-            # example package name: vlab-cli-2020.5.21-amd64.msi
-            site_version = package.split('-')[2]
-            break
+    stamp = read_stamp()
+    if time.time() - stamp.get('checked', 0) > UPDATE_CHECK_TTL:
+        # Not a daemon thread, so the new stamp gets written even if the
+        # subcommand finishes first.
+        refresh = threading.Thread(target=refresh_stamp, args=(vlab_api,), name='vlab-update-check')
+        refresh.start()
 
+    site_version = stamp.get('version', '')
+    url = stamp.get('url', '')
     current_version = version.__version__
     if site_version and site_version != current_version:
         question = "A new version of vLab CLI is available. Would you like to install it now? [Y/n]"
@@ -50,3 +62,82 @@ def handle_updates(vlab_api, vlab_config, skip_update_check):
             typewriter("Installing latest version. Please follow any prompts on the installer.")
             # This will launch the install in a non-interactive mode.
             subprocess.call(r"msiexec.exe /i C:\Windows\Temp\vlab-cli.msi /qn /passive")
+
+
+def read_stamp():
+    """Load the result of the last update check
+
+    :Returns: Dictionary
+    """
+    try:
+        with open(UPDATE_CHECK_FILE) as the_file:
+            stamp = json.load(the_file)
+    except (OSError, ValueError):
+        # never checked, or somebody hand-edited the file; either way, check again
+        stamp = {}
+    if not isinstance(stamp, dict):
+        stamp = {}
+    return stamp
+
+
+def refresh_stamp(vlab_api):
+    """Look up the latest version of the CLI, and save it to the stamp file
+
+    Any failure is ignored; not being able to check for an update should never
+    break a command, and the next invocation will simply try again. For the
+    same reason, it's one plain request instead of a ``vlab_api`` call, which
+    would retry for up to the deadline of the RetryPolicy.
+
+    :Returns: None
+
+    :param vlab_api: An established HTTP/S connect to the vLab server
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+    """
+    try:
+        resp = get_session(UPDATE_CHECK_URL).get(UPDATE_CHECK_URL,
+                                                 headers={'User-Agent': USER_AGENT},
+                                                 verify=vlab_api.verify,
+                                                 timeout=UPDATE_CHECK_TIMEOUT)
+        resp.raise_for_status()
+        page = resp.content
+        site_version, url = find_latest_version(page)
+        write_stamp({'checked': time.time(), 'version': site_version, 'url': url})
+    except Exception:
+        pass
+
+
+def find_latest_version(page):
+    """Parse the "getting started" page for the newest CLI package
+
+    :Returns: Tuple (version, URL of the package)
+
+    :param page: The HTML of the "getting started" page
+    :type page: Bytes
+    """
+    # BeautifulSoup is slow to import, and only needed when refreshing the stamp
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(page, features="html.parser")
+    for a in soup.find_all('a', href=True):
+        url = a['href']
+        package = os.path.basename(url)
+        if package.startswith('vlab-cli'):
+            # example package name: vlab-cli-2020.5.21-amd64.msi
+            return package.split('-')[2], url
+    return '', ''
+
+
+def write_stamp(stamp):
+    """Save the result of an update check
+
+    :Returns: None
+
+    :param stamp: The time of the check, the latest version, and its download URL
+    :type stamp: Dictionary
+    """
+    os.makedirs(os.path.dirname(UPDATE_CHECK_FILE), mode=0o700, exist_ok=True)
+    tmp_file = '{}.{}'.format(UPDATE_CHECK_FILE, os.getpid())
+    with open(tmp_file, 'w') as the_file:
+        json.dump(stamp, the_file, indent=4, sort_keys=True)
+    # so a concurrent vlab command never reads a half-written file
+    os.replace(tmp_file, UPDATE_CHECK_FILE)
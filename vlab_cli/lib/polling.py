@@ -0,0 +1,244 @@
+# -*- coding: UTF-8 -*-
+"""
+Decides when to check on the tasks issued by the vLab API.
+
+A task is checked right away, then with growing pauses (with jitter) up to a
+cap. When the tasks of an end point typically take a while, the CLI checks less
+until they're almost done. Every check also asks the server to hold the call
+open until the task is done (``Prefer: wait=<seconds>``, from RFC 7240).
+"""
+import os
+import json
+import time
+import random
+import threading
+
+from vlab_cli.lib.tracing import template_endpoint
+
+
+HISTORY_FILE = os.path.join(os.path.expanduser('~'), '.vlab', 'task_history.json')
+# The pause after the first check, in seconds
+FIRST_DELAY = 0.25
+# How much longer each pause is than the last one
+BACKOFF = 1.6
+# Pauses are shortened by up to this much, at random
+JITTER = 0.2
+# Start checking often once this much of a task's typical duration has passed
+EARLY = 0.8
+# Until then, still check at least once every this many pauses
+EARLY_PAUSES = 6
+# How much the latest duration counts toward the typical duration
+WEIGHT = 0.3
+# The longest the server is asked to hold a check open, in seconds
+LONG_POLL_WAIT = 20
+
+
+class Poller(object):
+    """Works out how long to wait before checking on a task (or group of tasks) again
+
+    :param timeout: Give up once the task has taken this many seconds
+    :type timeout: Integer
+
+    :param pause: The longest pause between checks, in seconds
+    :type pause: Float
+
+    :param expected: How many seconds the task typically takes; None if that's not known
+    :type expected: Float
+
+    :param clock: Returns the current time, in seconds
+    :type clock: Function
+
+    :param uniform: Returns a random number between two values
+    :type uniform: Function
+
+    :param long_poll: Ask the server to hold every check open until the task is done
+    :type long_poll: Boolean
+    """
+    def __init__(self, timeout, pause, expected=None, clock=time.monotonic, uniform=random.uniform,
+                 long_poll=True):
+        self.timeout = timeout
+        self.pause = pause
+        self.expected = expected
+        self.long_poll = long_poll
+        self.long_polled = False
+        self._clock = clock
+        self._uniform = uniform
+        self._started = clock()
+        self._slept = 0.0
+        self._step = 0
+
+    @property
+    def elapsed(self):
+        """How many seconds the task has been waited on"""
+        # counts the sleeps too, so a replaced sleep (i.e. in tests) still times out
+        return max(self._clock() - self._started, self._slept)
+
+    @property
+    def timed_out(self):
+        """True once the task has been waited on for ``timeout`` seconds"""
+        return self.elapsed >= self.timeout
+
+    def headers(self):
+        """Obtain the HTTP headers to check on the task with
+
+        :Returns: Dictionary
+        """
+        if not self.long_poll:
+            return {}
+        wait = int(min(LONG_POLL_WAIT, max(1, self.timeout - self.elapsed)))
+        return {'Prefer': 'wait={}'.format(wait)}
+
+    def checked(self, resp):
+        """Note if the server held a check of an unfinished task open
+
+        :Returns: None
+
+        :param resp: The answer to checking on the task
+        :type resp: requests.Response
+        """
+        applied = resp.headers.get('Preference-Applied', '')
+        self.long_polled = self.long_poll and 'wait=' in applied.replace(' ', '')
+
+    def next_delay(self):
+        """Obtain how long to wait before checking on the task again
+
+        :Returns: Float
+        """
+        elapsed = self.elapsed
+        if self.long_polled:
+            # the server already waited on the task; check again right away
+            self._slept = elapsed
+            return 0.0
+        window = self.expected * EARLY if self.expected else 0
+        if elapsed < window:
+            # check less until the task is almost done; it might be quicker this time
+            delay = min(window - elapsed, self.pause * EARLY_PAUSES)
+            self._step = 0
+        else:
+            delay = min(self.pause, FIRST_DELAY * BACKOFF ** self._step)
+            delay *= self._uniform(1 - JITTER, 1)
+            self._step += 1
+        delay = max(0, min(delay, self.timeout - elapsed))
+        self._slept = elapsed + delay
+        return delay
+
+
+class TaskHistory(object):
+    """Remembers how long the tasks of each API end point typically take
+
+    :param history_file: Where the typical durations are saved
+    :type history_file: String
+
+    :param weight: How much the latest duration counts toward the typical duration
+    :type weight: Float
+    """
+    def __init__(self, history_file=HISTORY_FILE, weight=WEIGHT):
+        self._history_file = history_file
+        self._weight = weight
+        self._durations = None
+        self._changed = False
+        self._lock = threading.Lock()
+
+    def expected(self, key):
+        """Obtain how many seconds a kind of task typically takes
+
+        :Returns: Float or None (when the task has never been seen)
+
+        :param key: The kind of task, from ``task_key``
+        :type key: String
+        """
+        with self._lock:
+            entry = self._load().get(key)
+        if entry is None:
+            return None
+        return entry['seconds']
+
+    def record(self, key, seconds):
+        """Remember how long a task took
+
+        :Returns: None
+
+        :param key: The kind of task, from ``task_key``
+        :type key: String
+
+        :param seconds: How long the task took
+        :type seconds: Float
+        """
+        with self._lock:
+            durations = self._load()
+            entry = durations.get(key)
+            if entry is None:
+                entry = {'seconds': seconds, 'count': 0}
+            else:
+                entry['seconds'] += self._weight * (seconds - entry['seconds'])
+            entry['count'] += 1
+            durations[key] = entry
+            self._changed = True
+
+    def save(self):
+        """Write the typical durations to disk, if they changed
+
+        :Returns: None
+        """
+        with self._lock:
+            if not self._changed:
+                return
+            tmp_file = '{}.{}.tmp'.format(self._history_file, os.getpid())
+            try:
+                os.makedirs(os.path.dirname(self._history_file), exist_ok=True)
+                with open(tmp_file, 'w') as the_file:
+                    json.dump(self._durations, the_file)
+                os.replace(tmp_file, self._history_file)
+            except OSError:
+                # Without a history the CLI just polls like it's never seen the task
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+                return
+            self._changed = False
+
+    def _load(self):
+        if self._durations is None:
+            try:
+                with open(self._history_file) as the_file:
+                    self._durations = json.load(the_file)
+            except (OSError, ValueError):
+                self._durations = {}
+        return self._durations
+
+
+def task_key(url, method=None):
+    """Group tasks by the end point (and HTTP method) that issued them
+
+    :Returns: String
+
+    :param url: The end point that issued the task, or the URL of the task itself
+    :type url: String
+
+    :param method: The HTTP method that issued the task, if it's known
+    :type method: String
+    """
+    path = template_endpoint(url).split('/task/', 1)[0]
+    if method:
+        return '{} {}'.format(method.upper(), path)
+    return path
+
+
+def expected_duration(history, keys):
+    """Obtain the shortest typical duration of a group of tasks
+
+    :Returns: Float or None
+
+    :param history: The typical task durations; None if they aren't being learned
+    :type history: TaskHistory
+
+    :param keys: The kinds of tasks, from ``task_key``
+    :type keys: Iterable
+    """
+    if history is None:
+        return None
+    durations = [x for x in (history.expected(k) for k in keys) if x is not None]
+    if not durations:
+        return None
+    return min(durations)
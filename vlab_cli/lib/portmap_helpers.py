@@ -4,6 +4,9 @@ import ipaddress
 
 import click
 
+from vlab_cli.lib.api import raise_on_errors
+from vlab_cli.lib.components import get_component, https_ports
+
 
 def validate_ip(vm_name, vm_type, vm_ips, requested_ip, vm_power_state, action='create'):
     """Ensure that there is a valid IP to create a port mapping rule for.
@@ -84,26 +87,7 @@ def get_component_protocols(vm_type):
     :param vm_type: The category of component (i.e. OneFS, InsightIQ, etc)
     :type vm_type: String
     """
-    proto_map = {
-        'cee' : ['rdp'],
-        'centos': ['ssh', 'rdp'],
-        'claritynow': ['ssh', 'https', 'rdp'],
-        'ecs' : ['ssh', 'https'],
-        'esrs' : ['ssh', 'https'],
-        'icap': ['rdp'],
-        'insightiq': ['ssh', 'https'],
-        'onefs': ['ssh', 'https'],
-        'router': ['ssh'],
-        'windows': ['rdp'],
-        'winserver': ['rdp'],
-        'esxi': ['ssh', 'https'],
-        'dataiq': ['ssh', 'https', 'rdp'],
-        'dns': ['ssh', 'rdp'],
-        'avamar': ['ssh', 'https', 'mgmt'],
-        'avamarndmp' : ['ssh', 'mgmt'],
-        'datadomain' : ['ssh', 'https']
-    }
-    return proto_map[vm_type.lower()]
+    return get_component(vm_type)['protocols']
 
 
 def get_protocol_port(vm_type, protocol):
@@ -126,16 +110,16 @@ def get_protocol_port(vm_type, protocol):
     elif protocol == 'mgmt':
         port = get_mgmt_port(vm_type)
     else:
-        raise RuntimeError("Unknown port for {} {}".format(vm_type, protocols))
+        raise RuntimeError("Unknown port for {} {}".format(vm_type, protocol))
     return port
 
 def get_mgmt_port(vm_type):
     """Because some systems have an HTTPS based management interface."""
-    mgmt_port_map = {
-        'avamar' : 7543,
-        'avamarndmp' : 7543,
-    }
-    return mgmt_port_map.get(vm_type.lower(), None)
+    try:
+        answer = get_component(vm_type).get('mgmt_port', None)
+    except KeyError:
+        answer = None
+    return answer
 
 
 def port_to_protocol(vm_type, port_number):
@@ -173,26 +157,76 @@ def https_to_port(vm_type):
     :param vm_type: The category of component (i.e. OneFS, InsightIQ, etc)
     :type vm_type: String
     """
-    port_map = {
-        'claritynow' : 443,
-        'ecs' : 443,
-        'esrs' : 9443,
-        'insightiq' : 443,
-        'onefs' : 8080,
-        'esxi' : 443,
-        'dataiq' : 443,
-        'avamar' : 443,
-        'datadomain' : 443,
-        'kemp' : 443,
-    }
     try:
-        answer =  port_map[vm_type.lower()]
+        answer = get_component(vm_type).get('https_port', None)
     except KeyError:
         answer = None
     return answer
 
 def is_https(port):
-    return port in [443, 9443, 8080, 7543]
+    return port in https_ports()
+
+
+def query_portmaps(vlab_api, names, target_port=None):
+    """Obtain the answer of the port mapping API for many VMs at once
+
+    :Returns: List (the ``content`` of each answer, in the same order as ``names``)
+
+    :Raises: click.ClickException
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param names: The names of the VMs
+    :type names: List
+
+    :param target_port: Only the rules that map to this port on the VM
+    :type target_port: Integer
+    """
+    params = [{'name': x} for x in names]
+    if target_port is not None:
+        for param in params:
+            param['target_port'] = target_port
+    results = vlab_api.bulk([('get', '/api/1/ipam/portmap', {'params': x}) for x in params])
+    raise_on_errors(results)
+    return [x.response.json()['content'] for x in results]
+
+
+def lookup_portmaps(vlab_api, names, target_port=None):
+    """Obtain the port mapping rules of many VMs at once
+
+    :Returns: List (the rules of each VM, in the same order as ``names``)
+
+    :Raises: click.ClickException
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param names: The names of the VMs
+    :type names: List
+
+    :param target_port: Only the rules that map to this port on the VM
+    :type target_port: Integer
+    """
+    return [x['ports'] for x in query_portmaps(vlab_api, names, target_port)]
+
+
+def delete_portmaps(vlab_api, names):
+    """Delete every port mapping rule of many VMs at once
+
+    :Returns: None
+
+    :Raises: click.ClickException
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param names: The names of the VMs
+    :type names: List
+    """
+    all_ports = [port for ports in lookup_portmaps(vlab_api, names) for port in ports.keys()]
+    results = vlab_api.bulk([('delete', '/api/1/ipam/portmap', {'json': {'conn_port': int(x)}}) for x in all_ports])
+    raise_on_errors(results)
 
 
 def get_ipv4_addrs(ips):
@@ -0,0 +1,157 @@
+# -*- coding: UTF-8 -*-
+"""
+Paces the API calls made to vLab, so big batches don't overload the server.
+
+Reads and writes have separate budgets, in calls per second, set by the
+``VLAB_READ_RATE`` and ``VLAB_WRITE_RATE`` environment variables; zero turns
+pacing off.
+"""
+import os
+import time
+import threading
+from collections import Counter
+
+
+READ_METHODS = frozenset(['get', 'head', 'options'])
+# The server sends these when it's overloaded
+OVERLOADED_STATUSES = frozenset([429, 503])
+READ_RATE = float(os.environ.get('VLAB_READ_RATE', 50))
+WRITE_RATE = float(os.environ.get('VLAB_WRITE_RATE', 10))
+
+
+class TokenBucket(object):
+    """Allows an average of ``rate`` events per second, with bursts of up to ``burst`` events
+
+    :param rate: How many events per second, on average
+    :type rate: Float
+
+    :param burst: The most events that can happen at once
+    :type burst: Integer
+
+    :param clock: Returns the current time, in seconds
+    :type clock: Function
+    """
+    def __init__(self, rate, burst, clock=time.monotonic):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, and find out how long to wait before it can be used
+
+        :Returns: Float
+        """
+        # Tokens can go negative; that's how callers queue up without holding the lock
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def set_rate(self, rate):
+        """Change how many events per second are allowed
+
+        :Returns: None
+
+        :param rate: How many events per second, on average
+        :type rate: Float
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self.rate = rate
+
+
+class RateLimiter(object):
+    """Paces API calls, with separate budgets for reads and writes
+
+    :param read_rate: How many reads per second, on average. Zero means unlimited.
+    :type read_rate: Float
+
+    :param write_rate: How many writes per second, on average. Zero means unlimited.
+    :type write_rate: Float
+
+    :param burst: How many seconds worth of calls can be made at once
+    :type burst: Float
+
+    :param adaptive: Slow down when the server says it's overloaded, and speed back up on success
+    :type adaptive: Boolean
+
+    :param min_rate: The slowest adaptive mode will go, in calls per second
+    :type min_rate: Float
+
+    :param increase: How many calls per second a success adds back, in adaptive mode
+    :type increase: Float
+    """
+    def __init__(self, read_rate=READ_RATE, write_rate=WRITE_RATE, burst=2, adaptive=True,
+                 min_rate=0.5, increase=0.25):
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.increase = increase
+        self.stats = Counter()
+        self._stats_lock = threading.Lock()
+        self._max_rates = {'read': read_rate, 'write': write_rate}
+        self._buckets = {}
+        for kind, rate in self._max_rates.items():
+            if rate > 0:
+                self._buckets[kind] = TokenBucket(rate, max(1, int(rate * burst)))
+        # replaceable for testing
+        self._sleep = time.sleep
+
+    def bucket_for(self, method):
+        """Obtain the budget an HTTP method draws from
+
+        :Returns: TokenBucket or None (when that kind of call isn't paced)
+
+        :param method: The HTTP method of the call, like ``get``
+        :type method: String
+        """
+        return self._buckets.get(_kind(method))
+
+    def send(self, method, do_request):
+        """Wait for the budget to allow the call, then make it
+
+        :Returns: requests.Response
+
+        :param method: The HTTP method of the call, like ``get``
+        :type method: String
+
+        :param do_request: Makes the call; takes no arguments, and returns a requests.Response
+        :type do_request: Function
+        """
+        bucket = self.bucket_for(method)
+        if bucket is None:
+            return do_request()
+        wait_for = bucket.reserve()
+        if wait_for > 0:
+            self._count({'throttled': 1, 'seconds_waiting': wait_for})
+            self._sleep(wait_for)
+        resp = do_request()
+        if self.adaptive:
+            self._adapt(method, bucket, resp.status_code)
+        return resp
+
+    def _count(self, counts):
+        """Add to the stats; calls are made from many threads at once"""
+        with self._stats_lock:
+            self.stats.update(counts)
+
+    def _adapt(self, method, bucket, status_code):
+        """Additive increase, multiplicative decrease; like TCP congestion control"""
+        max_rate = self._max_rates[_kind(method)]
+        if status_code in OVERLOADED_STATUSES:
+            self._count({'slowdowns': 1})
+            bucket.set_rate(max(self.min_rate, bucket.rate / 2))
+        elif bucket.rate < max_rate:
+            bucket.set_rate(min(max_rate, bucket.rate + self.increase))
+
+
+def _kind(method):
+    return 'read' if method.lower() in READ_METHODS else 'write'
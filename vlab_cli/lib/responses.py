@@ -0,0 +1,43 @@
+# -*- coding: UTF-8 -*-
+"""
+Converts HTTP responses to and from plain dictionaries, so they can be sent over
+the agent socket, or saved to disk by the cache.
+"""
+import base64
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+def to_response(reply):
+    """Convert a serialized HTTP response back into a requests.Response
+
+    :Returns: requests.Response
+
+    :param reply: The output of ``from_response``
+    :type reply: Dictionary
+    """
+    resp = requests.Response()
+    resp.status_code = reply['status_code']
+    resp.reason = reply['reason']
+    resp.url = reply['url']
+    resp.headers = CaseInsensitiveDict(reply['headers'])
+    resp.encoding = get_encoding_from_headers(resp.headers)
+    resp._content = base64.b64decode(reply['content'])
+    return resp
+
+
+def from_response(resp):
+    """Serialize a requests.Response into something JSON can encode
+
+    :Returns: Dictionary
+
+    :param resp: The HTTP response from the vLab server
+    :type resp: requests.Response
+    """
+    return {'status_code': resp.status_code,
+            'reason': resp.reason,
+            'url': resp.url,
+            'headers': dict(resp.headers),
+            'content': base64.b64encode(resp.content).decode('ascii')}
@@ -0,0 +1,183 @@
+# -*- coding: UTF-8 -*-
+"""
+Decides when, and how long to wait before, an API call to vLab is retried.
+
+When the vLab server is overloaded it sheds load by responding with HTTP 503
+(or 429), and the proxies in front of it respond with 502 or 504.
+Retrying is only safe when repeating the request cannot do something twice, so
+non-idempotent requests (i.e. POST) are only retried when the server is known
+to have not processed the request.
+"""
+import time
+import random
+import threading
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+
+IDEMPOTENT_METHODS = frozenset(['get', 'head', 'options', 'put', 'delete'])
+RETRY_STATUSES = frozenset([429, 502, 503, 504])
+# The server only sends these when it refused to process the request
+REFUSED_STATUSES = frozenset([429, 503])
+
+
+class RetryPolicy(object):
+    """Retries failed API calls, with decorrelated jitter, until a deadline.
+
+    :param retries: The most times to retry a single API call
+    :type retries: Integer
+
+    :param base_delay: The shortest time to wait before a retry, in seconds
+    :type base_delay: Float
+
+    :param max_delay: The longest time to wait before a retry, in seconds
+    :type max_delay: Float
+
+    :param deadline: Give up if retrying would take longer than this many seconds in total
+    :type deadline: Float
+
+    :param statuses: The HTTP status codes that can be retried
+    :type statuses: Set
+
+    :param overrides: End point prefixes mapped to the settings they change; the longest match wins
+    :type overrides: Dictionary
+    """
+    def __init__(self, retries=5, base_delay=0.5, max_delay=30, deadline=120,
+                 statuses=RETRY_STATUSES, overrides=None):
+        self.settings = {'retries': retries,
+                         'base_delay': base_delay,
+                         'max_delay': max_delay,
+                         'deadline': deadline,
+                         'statuses': frozenset(statuses)}
+        self.overrides = dict(overrides or {})
+        self.stats = Counter()
+        # per-thread, because vLabApi.bulk makes calls from many threads
+        self._local = threading.local()
+        self._stats_lock = threading.Lock()
+        # replaceable for testing
+        self._sleep = time.sleep
+        self._clock = time.monotonic
+        self._uniform = random.uniform
+
+    def settings_for(self, url):
+        """Obtain the retry settings of a specific API end point
+
+        :Returns: Dictionary
+
+        :param url: The URL, or just the path, of the API end point
+        :type url: String
+        """
+        path = urlparse(url).path or url
+        settings = dict(self.settings)
+        matches = [x for x in self.overrides if path.startswith(x)]
+        if matches:
+            settings.update(self.overrides[max(matches, key=len)])
+        return settings
+
+    @property
+    def last_retries(self):
+        """How many times the last call made by this thread was retried"""
+        return getattr(self._local, 'retries', 0)
+
+    def send(self, method, url, do_request, log):
+        """Make the API call, and retry it as needed
+
+        :Returns: requests.Response
+
+        :Raises: requests.exceptions.RequestException
+
+        :param method: The HTTP method of the call, like ``get``
+        :type method: String
+
+        :param url: The URL being called
+        :type url: String
+
+        :param do_request: Makes the call; takes no arguments, and returns a requests.Response
+        :type do_request: Function
+
+        :param log: A logging object to aid in debugging
+        :type log: logging.Logger
+        """
+        settings = self.settings_for(url)
+        idempotent = method.lower() in IDEMPOTENT_METHODS
+        give_up_at = self._clock() + settings['deadline']
+        delay = settings['base_delay']
+        self._count({'calls': 1})
+        self._local.retries = 0
+        for attempt in range(settings['retries'] + 1):
+            try:
+                resp = do_request()
+            except requests.exceptions.RequestException as doh:
+                if not self._retryable_error(doh, idempotent) or attempt == settings['retries']:
+                    self._count({'failures': 1})
+                    raise
+                error = doh
+                reason = type(doh).__name__
+                wait_for = None
+            else:
+                if not self._retryable_status(resp.status_code, idempotent, settings):
+                    return resp
+                if attempt == settings['retries']:
+                    break
+                error = None
+                reason = 'HTTP {}'.format(resp.status_code)
+                wait_for = retry_after(resp)
+            delay = min(settings['max_delay'], self._uniform(settings['base_delay'], delay * 3))
+            if wait_for is not None:
+                delay = max(delay, wait_for)
+            if self._clock() + delay > give_up_at:
+                log.debug('Not retrying %s %s; the retry deadline would be exceeded', method.upper(), url)
+                self._count({'deadline_exceeded': 1})
+                if error is not None:
+                    raise error
+                return resp
+            log.debug('Retrying %s %s in %.2f seconds because of %s', method.upper(), url, delay, reason)
+            self._local.retries += 1
+            self._count({'retries': 1, 'retries[{}]'.format(reason): 1, 'seconds_waiting': delay})
+            self._sleep(delay)
+        self._count({'exhausted': 1})
+        return resp
+
+    def _count(self, counts):
+        """Add to the stats; calls are made from many threads at once"""
+        with self._stats_lock:
+            self.stats.update(counts)
+
+    def _retryable_status(self, status_code, idempotent, settings):
+        if status_code not in settings['statuses']:
+            return False
+        return idempotent or status_code in REFUSED_STATUSES
+
+    def _retryable_error(self, error, idempotent):
+        if isinstance(error, requests.exceptions.ConnectTimeout):
+            # never connected, so the server never saw the request
+            return True
+        if isinstance(error, requests.exceptions.ConnectionError):
+            # i.e. connection reset; the server might have processed the request
+            return idempotent
+        return False
+
+
+def retry_after(resp):
+    """Obtain how long the server asked us to wait via the ``Retry-After`` header
+
+    :Returns: Float or None
+
+    :param resp: The response from the server
+    :type resp: requests.Response
+    """
+    value = resp.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
@@ -27,9 +27,8 @@ import urllib3
 from getpass import getpass
 
 import jwt
-import requests
 
-from vlab_cli.lib.api import USER_AGENT, SSLContextAdapter
+from vlab_cli.lib.api import USER_AGENT, get_session
 
 # Creates path like /home/alice/.vlab/; must work with windows
 TOKEN_DIR = os.path.join(os.path.expanduser('~'), '.vlab')
@@ -204,26 +203,26 @@ def create(username, vlab_url, verify):
 
     # Now obtain a token
     password = getpass('Please enter your CORP domain password: ')
-    with requests.Session() as conn:
-        conn.mount(vlab_url,  SSLContextAdapter())
-        resp = conn.post(vlab_url + '/api/2/auth/token',
-                         json={'username': username, 'password': password},
-                         headers={'User-Agent': USER_AGENT},
-                         verify=verify)
-        if resp.status_code == 401:
-            error = 'Invalid password supplied for user {}'.format(username)
-            raise ValueError(error)
-        elif not resp.ok:
-            resp.raise_for_status()
-        else:
-            new_token = resp.json()['content']['token']
-            resp = conn.get(vlab_url + '/api/1/auth/key',
-                                headers={'User-Agent': USER_AGENT},
-                                verify=verify)
-            data = resp.json()
-            decryption_key = data['content']['key']
-            algorithm = data['content']['algorithm']
-            return new_token, decryption_key, algorithm
+    # Not closed; vLabApi reuses the connection for the API calls
+    conn = get_session(vlab_url)
+    resp = conn.post(vlab_url + '/api/2/auth/token',
+                     json={'username': username, 'password': password},
+                     headers={'User-Agent': USER_AGENT},
+                     verify=verify)
+    if resp.status_code == 401:
+        error = 'Invalid password supplied for user {}'.format(username)
+        raise ValueError(error)
+    elif not resp.ok:
+        resp.raise_for_status()
+    else:
+        new_token = resp.json()['content']['token']
+        resp = conn.get(vlab_url + '/api/1/auth/key',
+                            headers={'User-Agent': USER_AGENT},
+                            verify=verify)
+        data = resp.json()
+        decryption_key = data['content']['key']
+        algorithm = data['content']['algorithm']
+        return new_token, decryption_key, algorithm
 
 
 def destroy():
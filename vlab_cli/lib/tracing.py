@@ -0,0 +1,520 @@
+# -*- coding: UTF-8 -*-
+"""
+Records how long every API call (and task) made by a vlab command took.
+
+When a command is slow, the trace shows where the time went:
+
+- ``Client`` is the time spent in the CLI between API calls.
+- ``Network`` is the time spent on HTTP requests, including retries.
+- ``Server`` is the time the vLab server spent running tasks while the CLI waited.
+
+Run any command with ``vlab --trace`` to print a per end point summary when
+the command exits, and add ``--trace-json <file>`` to save every record for
+later analysis.
+
+Traced commands also save their spans (one for the command, one per task, and
+one per API call) as OTLP JSON under ``~/.vlab/traces``. The trace ID is the
+``X-REQUEST-ID`` the CLI sends with every API call, so a trace can be lined up
+with the server logs of the same command.
+"""
+import os
+import re
+import json
+import math
+import time
+import threading
+from contextlib import contextmanager
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+from vlab_cli import version
+
+
+# Things like task IDs and UUIDs; if it has a digit and is long, it's an ID
+ID_SEGMENT = re.compile(r'^(?=.*[0-9])[0-9a-zA-Z_-]{16,}$')
+# Tasks are grouped by the end point that issued them, not the URL that was polled
+TASK_SUFFIX = re.compile(r'/task/\{task-id\}$')
+TRACE_DIR = os.path.join(os.path.expanduser('~'), '.vlab', 'traces')
+MAX_TRACE_FILES = 100
+# https://opentelemetry.io/docs/specs/otlp/ enum values
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_CODE_UNSET = 0
+STATUS_CODE_ERROR = 2
+
+
+class Tracer(object):
+    """Collects the timing of API calls and tasks
+
+    :param clock: Measures durations, in seconds
+    :type clock: Function
+
+    :param wall_clock: Tells when something happened, in seconds since the epoch
+    :type wall_clock: Function
+    """
+    def __init__(self, clock=time.monotonic, wall_clock=time.time):
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self._lock = threading.Lock()
+        self.started = wall_clock()
+        self._started = clock()
+        self.requests = []
+        self.tasks = []
+        # set by vLabApi; it's the X-REQUEST-ID sent with every API call
+        self.request_id = None
+
+    def now(self):
+        """Obtain the current time, for measuring durations
+
+        :Returns: Float
+        """
+        return self._clock()
+
+    def record_request(self, method, url, started, status=None, sent=0, received=0,
+                       retries=0, cached=False, error=None):
+        """Save the timing of a single API call
+
+        :Returns: None
+
+        :param method: The HTTP method, like ``get``
+        :type method: String
+
+        :param url: The URL that was called
+        :type url: String
+
+        :param started: When the call started, from ``Tracer.now()``
+        :type started: Float
+
+        :param status: The HTTP status code of the response; None if there wasn't one
+        :type status: Integer
+
+        :param sent: The number of bytes in the request body
+        :type sent: Integer
+
+        :param received: The number of bytes in the response body
+        :type received: Integer
+
+        :param retries: How many times the call was retried
+        :type retries: Integer
+
+        :param cached: Set to True if the response came from the cache
+        :type cached: Boolean
+
+        :param error: Why the call failed, if it didn't get a response
+        :type error: String
+        """
+        record = {'span_id': _new_span_id(),
+                  'method': method.upper(),
+                  'endpoint': template_endpoint(url),
+                  'url': url,
+                  'status': status,
+                  'sent': sent,
+                  'received': received,
+                  'retries': retries,
+                  'cached': cached,
+                  'error': error}
+        record.update(self._times(started))
+        with self._lock:
+            self.requests.append(record)
+
+    def record_task(self, endpoint, started, issued, polls, poll_seconds, task_id=None, timed_out=False):
+        """Save the timing of a task, from issuing it to seeing it complete
+
+        :Returns: None
+
+        :param endpoint: The URL that issued the task
+        :type endpoint: String
+
+        :param started: When the call to issue the task started, from ``Tracer.now()``
+        :type started: Float
+
+        :param issued: When the server responded with the task ID, from ``Tracer.now()``
+        :type issued: Float
+
+        :param polls: How many times the status of the task was checked
+        :type polls: Integer
+
+        :param poll_seconds: How long the status checks took, in total
+        :type poll_seconds: Float
+
+        :param task_id: The ID of the task
+        :type task_id: String
+
+        :param timed_out: Set to True if the CLI stopped waiting on the task
+        :type timed_out: Boolean
+        """
+        record = {'span_id': _new_span_id(),
+                  'endpoint': TASK_SUFFIX.sub('', template_endpoint(endpoint)),
+                  'task_id': task_id,
+                  'polls': polls,
+                  'issue_seconds': issued - started,
+                  'poll_seconds': poll_seconds,
+                  'timed_out': timed_out}
+        record.update(self._times(started))
+        record['wait_seconds'] = max(0.0, record['duration'] - record['issue_seconds'] - poll_seconds)
+        with self._lock:
+            self.tasks.append(record)
+
+    def _times(self, started):
+        """When something started (as a wall clock time), and how long it took"""
+        ended = self._clock()
+        return {'start': self.started + (started - self._started),
+                'duration': ended - started}
+
+    def totals(self):
+        """Break down where the time went
+
+        :Returns: Dictionary
+        """
+        elapsed = self._clock() - self._started
+        with self._lock:
+            calls = [(x['start'], x['start'] + x['duration']) for x in self.requests]
+            tasks = [(x['start'], x['start'] + x['duration']) for x in self.tasks]
+        network = _busy_time(calls)
+        # i.e. waiting on a task, but not making an API call
+        server = _busy_time(calls + tasks) - network
+        return OrderedDict([('elapsed', elapsed),
+                            ('network', network),
+                            ('server', server),
+                            ('client', max(0.0, elapsed - network - server))])
+
+    def endpoint_stats(self):
+        """Summarize the API calls by method and end point
+
+        :Returns: List
+        """
+        grouped = OrderedDict()
+        with self._lock:
+            for record in self.requests:
+                grouped.setdefault((record['endpoint'], record['method']), []).append(record)
+        stats = []
+        for (endpoint, method), records in grouped.items():
+            durations = sorted(x['duration'] for x in records)
+            stats.append(OrderedDict([('endpoint', endpoint),
+                                      ('method', method),
+                                      ('calls', len(records)),
+                                      ('errors', len([x for x in records if x['error'] or (x['status'] or 0) >= 400])),
+                                      ('retries', sum(x['retries'] for x in records)),
+                                      ('cached', len([x for x in records if x['cached']])),
+                                      ('p50', percentile(durations, 50)),
+                                      ('p95', percentile(durations, 95)),
+                                      ('max', durations[-1]),
+                                      ('total', sum(durations)),
+                                      ('sent', sum(x['sent'] for x in records)),
+                                      ('received', sum(x['received'] for x in records))]))
+        return sorted(stats, key=lambda x: x['total'], reverse=True)
+
+    def task_stats(self):
+        """Summarize the tasks by the end point that issued them
+
+        :Returns: List
+        """
+        grouped = OrderedDict()
+        with self._lock:
+            for record in self.tasks:
+                grouped.setdefault(record['endpoint'], []).append(record)
+        stats = []
+        for endpoint, records in grouped.items():
+            stats.append(OrderedDict([('endpoint', endpoint),
+                                      ('tasks', len(records)),
+                                      ('polls', sum(x['polls'] for x in records)),
+                                      ('issue', sum(x['issue_seconds'] for x in records)),
+                                      ('wait', max(x['wait_seconds'] for x in records)),
+                                      ('total', max(x['duration'] for x in records))]))
+        return stats
+
+    def summary(self):
+        """A human friendly report of where the time went
+
+        :Returns: String
+        """
+        from tabulate import tabulate
+
+        lines = []
+        totals = self.totals()
+        lines.append('Elapsed {elapsed:.3f}s = Client {client:.3f}s + Network {network:.3f}s + Server {server:.3f}s'.format(**totals))
+        rows = [[x['method'], x['endpoint'], x['calls'], x['errors'], x['retries'], x['cached'],
+                 _ms(x['p50']), _ms(x['p95']), _ms(x['max']), '{:.3f}'.format(x['total']),
+                 _kb(x['sent']), _kb(x['received'])]
+                for x in self.endpoint_stats()]
+        if rows:
+            header = ['Method', 'Endpoint', 'Calls', 'Errors', 'Retries', 'Cached',
+                      'p50 ms', 'p95 ms', 'Max ms', 'Total s', 'Sent KB', 'Recv KB']
+            lines.append('')
+            lines.append(tabulate(rows, headers=header, tablefmt='presto', disable_numparse=True))
+        rows = [[x['endpoint'], x['tasks'], x['polls'], '{:.3f}'.format(x['issue']),
+                 '{:.3f}'.format(x['wait']), '{:.3f}'.format(x['total'])]
+                for x in self.task_stats()]
+        if rows:
+            header = ['Task Endpoint', 'Tasks', 'Polls', 'Issue s', 'Server s', 'Total s']
+            lines.append('')
+            lines.append(tabulate(rows, headers=header, tablefmt='presto', disable_numparse=True))
+        return '\n'.join(lines)
+
+    def to_dict(self):
+        """Every record, plus the summaries, for saving as JSON
+
+        :Returns: Dictionary
+        """
+        with self._lock:
+            requests = list(self.requests)
+            tasks = list(self.tasks)
+        return {'started': self.started,
+                'totals': self.totals(),
+                'endpoints': self.endpoint_stats(),
+                'task_endpoints': self.task_stats(),
+                'requests': requests,
+                'tasks': tasks}
+
+    def to_otlp(self, name):
+        """Convert the trace into OTLP JSON; one root span, with a child span per task and API call
+
+        :Returns: Dictionary
+
+        :param name: The name of the root span, like ``vlab create onefs``
+        :type name: String
+        """
+        trace_id = self.request_id or _new_span_id() + _new_span_id()
+        ended = self.started + (self._clock() - self._started)
+        root_id = _new_span_id()
+        with self._lock:
+            requests = list(self.requests)
+            tasks = list(self.tasks)
+        root = _span(trace_id, root_id, None, name, SPAN_KIND_INTERNAL, self.started, ended,
+                     {'vlab.request_id': self.request_id,
+                      'vlab.api_calls': len(requests),
+                      'vlab.tasks': len(tasks)})
+        spans = [root]
+        for task in tasks:
+            attributes = {'vlab.task.id': task['task_id'],
+                          'vlab.task.polls': task['polls'],
+                          'vlab.task.timed_out': task['timed_out']}
+            spans.append(_span(trace_id, task['span_id'], root_id, 'task {}'.format(task['endpoint']),
+                               SPAN_KIND_INTERNAL, task['start'], task['start'] + task['duration'],
+                               attributes, error=task['timed_out']))
+        for request in requests:
+            parent = _parent_task(request, tasks)
+            attributes = {'http.request.method': request['method'],
+                          'url.full': request['url'],
+                          'url.template': request['endpoint'],
+                          'http.response.status_code': request['status'],
+                          'http.request.body.size': request['sent'],
+                          'http.response.body.size': request['received'],
+                          'http.request.resend_count': request['retries'],
+                          'vlab.cached': request['cached'],
+                          'error.type': request['error']}
+            failed = request['error'] is not None or (request['status'] or 0) >= 400
+            spans.append(_span(trace_id, request['span_id'], root_id if parent is None else parent['span_id'],
+                               '{} {}'.format(request['method'], request['endpoint']), SPAN_KIND_CLIENT,
+                               request['start'], request['start'] + request['duration'], attributes,
+                               error=failed))
+        resource = {'attributes': _attributes({'service.name': 'vlab-cli',
+                                               'service.version': version.__version__})}
+        scope = {'name': 'vlab_cli', 'version': version.__version__}
+        return {'resourceSpans': [{'resource': resource,
+                                   'scopeSpans': [{'scope': scope, 'spans': spans}]}]}
+
+    def save_spans(self, name, trace_dir=TRACE_DIR, max_files=MAX_TRACE_FILES):
+        """Save the trace as OTLP JSON, and delete the oldest saved traces
+
+        :Returns: String (the path to the saved file)
+
+        :Raises: OSError
+
+        :param name: The name of the root span, like ``vlab create onefs``
+        :type name: String
+
+        :param trace_dir: Where to save the trace
+        :type trace_dir: String
+
+        :param max_files: The most traces to keep
+        :type max_files: Integer
+        """
+        os.makedirs(trace_dir, exist_ok=True)
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(self.started))
+        trace_file = os.path.join(trace_dir, '{}-{}.json'.format(stamp, self.request_id or 'local'))
+        with open(trace_file, 'w') as the_file:
+            json.dump(self.to_otlp(name), the_file)
+        saved = sorted(x for x in os.listdir(trace_dir) if x.endswith('.json'))
+        for old_file in saved[:-max_files]:
+            try:
+                os.remove(os.path.join(trace_dir, old_file))
+            except OSError:
+                pass
+        return trace_file
+
+    def dump(self, path):
+        """Save the trace to a JSON file
+
+        :Returns: None
+
+        :param path: Where to save the trace
+        :type path: String
+        """
+        with open(path, 'w') as the_file:
+            json.dump(self.to_dict(), the_file, indent=2)
+
+
+class TaskTimer(object):
+    """Times one task for a Tracer; does nothing if there is no Tracer
+
+    :param tracer: Where to save the timing; None if the command isn't being traced
+    :type tracer: Tracer
+
+    :param endpoint: The URL that issued the task
+    :type endpoint: String
+
+    :param task_id: The ID of the task, if it's already been issued
+    :type task_id: String
+    """
+    def __init__(self, tracer, endpoint, task_id=None):
+        self._tracer = tracer
+        self._endpoint = endpoint
+        self._task_id = task_id
+        self._polls = 0
+        self._poll_seconds = 0.0
+        self._started = self._now()
+        self._issued = self._started
+
+    def _now(self):
+        if self._tracer is None:
+            return 0.0
+        return self._tracer.now()
+
+    def issued(self, task_id):
+        """The server responded with the ID of the task"""
+        self._task_id = task_id
+        self._issued = self._now()
+
+    def add_poll(self, seconds):
+        """The status of the task was checked, and that took ``seconds``"""
+        self._polls += 1
+        self._poll_seconds += seconds
+
+    @contextmanager
+    def poll(self):
+        """Time checking the status of the task"""
+        started = self._now()
+        try:
+            yield
+        finally:
+            self.add_poll(self._now() - started)
+
+    def done(self, timed_out=False):
+        """Stop timing the task, and save the timing"""
+        if self._tracer is not None:
+            self._tracer.record_task(self._endpoint, self._started, self._issued, self._polls,
+                                     self._poll_seconds, task_id=self._task_id, timed_out=timed_out)
+
+
+def template_endpoint(url):
+    """Replace the IDs in a URL path with placeholders, so calls can be grouped
+
+    :Returns: String
+
+    :param url: The URL, or just the path, of an API call
+    :type url: String
+    """
+    path = urlparse(url).path or url
+    parts = path.split('/')
+    templated = []
+    for index, part in enumerate(parts):
+        if index and parts[index - 1] == 'task':
+            templated.append('{task-id}')
+        elif ID_SEGMENT.match(part):
+            templated.append('{id}')
+        else:
+            templated.append(part)
+    return '/'.join(templated)
+
+
+def _new_span_id():
+    return os.urandom(8).hex()
+
+
+def _parent_task(request, tasks):
+    """Find the task an API call was made for, if any"""
+    for task in tasks:
+        if task['task_id'] and '/task/{}'.format(task['task_id']) in request['url']:
+            return task
+    for task in tasks:
+        # i.e. the call that issued the task
+        issued = task['start'] + task['issue_seconds']
+        if request['endpoint'] == task['endpoint'] and task['start'] <= request['start'] <= issued:
+            return task
+    return None
+
+
+def _span(trace_id, span_id, parent_id, name, kind, start, end, attributes, error=False):
+    """Build an OTLP JSON span; times are seconds since the epoch"""
+    span = {'traceId': trace_id,
+            'spanId': span_id,
+            'name': name,
+            'kind': kind,
+            'startTimeUnixNano': str(int(start * 1e9)),
+            'endTimeUnixNano': str(int(end * 1e9)),
+            'attributes': _attributes(attributes),
+            'status': {'code': STATUS_CODE_ERROR if error else STATUS_CODE_UNSET}}
+    if parent_id is not None:
+        span['parentSpanId'] = parent_id
+    return span
+
+
+def _attributes(values):
+    """Convert a dictionary into OTLP JSON attributes; None values are left out"""
+    attributes = []
+    for key, value in values.items():
+        if value is None:
+            continue
+        elif isinstance(value, bool):
+            typed = {'boolValue': value}
+        elif isinstance(value, int):
+            # OTLP JSON encodes 64 bit integers as strings
+            typed = {'intValue': str(value)}
+        elif isinstance(value, float):
+            typed = {'doubleValue': value}
+        else:
+            typed = {'stringValue': str(value)}
+        attributes.append({'key': key, 'value': typed})
+    return attributes
+
+
+def percentile(values, percent):
+    """Obtain the nearest-rank percentile of some sorted values
+
+    :Returns: Float
+
+    :param values: The values, sorted from smallest to largest
+    :type values: List
+
+    :param percent: Which percentile, like 95
+    :type percent: Integer
+    """
+    if not values:
+        return 0.0
+    rank = max(1, int(math.ceil(percent / 100.0 * len(values))))
+    return values[min(rank, len(values)) - 1]
+
+
+def _busy_time(spans):
+    """How long at least one of the spans was in progress; overlapping calls aren't counted twice"""
+    busy = 0.0
+    current_start, current_end = None, None
+    for start, end in sorted(spans):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                busy += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        busy += current_end - current_start
+    return busy
+
+
+def _ms(seconds):
+    return '{:.1f}'.format(seconds * 1000)
+
+
+def _kb(num_bytes):
+    return '{:.1f}'.format(num_bytes / 1024.0)
@@ -0,0 +1,79 @@
+# -*- coding: UTF-8 -*-
+"""
+Defines the CLI for managing the background agent that keeps vLab connections warm
+"""
+import os
+import sys
+import time
+import subprocess
+
+import click
+
+from vlab_cli.lib import agent as vlab_agent
+from vlab_cli.lib.click_extras import AliasedGroup, HiddenOption
+
+
+@click.group(cls=AliasedGroup)
+def agent():
+    """Keep a warm connection to vLab between commands"""
+    pass
+
+
+@agent.command()
+@click.option('--idle-timeout', default=vlab_agent.IDLE_TIMEOUT, show_default=True,
+              help='Stop the agent after this many seconds without use')
+@click.option('--foreground', is_flag=True, cls=HiddenOption)
+@click.pass_context
+def start(ctx, idle_timeout, foreground):
+    """Start the vLab agent in the background"""
+    if not vlab_agent.supported():
+        raise click.ClickException('The vLab agent is not supported on this platform')
+    if vlab_agent.ping():
+        click.echo('The vLab agent is already running')
+        return
+    if foreground:
+        vlab_agent.run_agent(idle_timeout=idle_timeout, log=ctx.obj.log)
+        return
+    if getattr(sys, 'frozen', False):
+        # i.e. the MSI install; there's no Python interpreter to run a module with
+        cmd = [sys.executable, 'agent', 'start', '--foreground', '--idle-timeout', str(idle_timeout)]
+    else:
+        cmd = [sys.executable, '-m', 'vlab_cli.lib.agent', str(idle_timeout)]
+    os.makedirs(vlab_agent.AGENT_DIR, mode=0o700, exist_ok=True)
+    with open(vlab_agent.AGENT_LOG, 'a') as log_file:
+        subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=log_file, stderr=log_file,
+                         start_new_session=True, close_fds=True)
+    for _ in range(50):
+        if vlab_agent.ping():
+            break
+        time.sleep(0.1)
+    else:
+        error = 'Timed out waiting on the vLab agent to start. See {}'.format(vlab_agent.AGENT_LOG)
+        raise click.ClickException(error)
+    click.echo('OK!')
+
+
+@agent.command()
+def stop():
+    """Stop the vLab agent"""
+    if not vlab_agent.ping():
+        click.echo('The vLab agent is not running')
+        return
+    try:
+        vlab_agent.stop()
+    except vlab_agent.AgentError as doh:
+        raise click.ClickException(doh)
+    click.echo('OK!')
+
+
+@agent.command()
+def status():
+    """Display information about the vLab agent"""
+    info = vlab_agent.ping()
+    if info is None:
+        click.echo('The vLab agent is not running')
+        return
+    click.echo('PID      : {}'.format(info['pid']))
+    click.echo('Uptime   : {} seconds'.format(int(info['uptime'])))
+    click.echo('Requests : {}'.format(info['requests']))
+    click.echo('Sessions : {}'.format(', '.join(info['sessions']) or 'None'))
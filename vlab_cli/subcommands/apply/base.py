@@ -2,19 +2,18 @@
 """Defines the CLI for applying changes to vLab"""
 import click
 
-from vlab_cli.lib.click_extras import AliasedGroup
-from vlab_cli.subcommands.apply.snapshot import snapshot
-from vlab_cli.subcommands.apply.network import network
-from vlab_cli.subcommands.apply.template import template
+from vlab_cli.lib.click_extras import LazyAliasedGroup
 
 
-@click.group(cls=AliasedGroup)
+SUBCOMMANDS = {
+    'snapshot' : 'vlab_cli.subcommands.apply.snapshot.snapshot',
+    'network' : 'vlab_cli.subcommands.apply.network.network',
+    'template' : 'vlab_cli.subcommands.apply.template.template',
+}
+
+
+@click.group(cls=LazyAliasedGroup, lazy_subcommands=SUBCOMMANDS)
 @click.pass_context
 def apply(ctx):
     """Apply a change to something"""
     pass
-
-
-apply.add_command(snapshot)
-apply.add_command(network)
-apply.add_command(template)
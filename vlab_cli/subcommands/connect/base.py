@@ -2,33 +2,41 @@
 """Defines the CLI for connecting users to components in their lab"""
 import click
 
-from vlab_cli.lib.click_extras import AliasedGroup
+from vlab_cli.lib.components import lazy_subcommands
+from vlab_cli.lib.click_extras import LazyAliasedGroup
 from vlab_cli.lib.configurizer import CONFIG_SECTIONS, set_config, get_config
 from vlab_cli.lib.clippy.connect import invoke_bad_missing_config, invoke_config
 
-from vlab_cli.subcommands.connect.onefs import onefs
-from vlab_cli.subcommands.connect.iiq import insightiq
-from vlab_cli.subcommands.connect.esrs import esrs
-from vlab_cli.subcommands.connect.cee import cee
-from vlab_cli.subcommands.connect.router import router
-from vlab_cli.subcommands.connect.windows import windows
-from vlab_cli.subcommands.connect.winserver import winserver
-from vlab_cli.subcommands.connect.centos import centos
-from vlab_cli.subcommands.connect.icap import icap
-from vlab_cli.subcommands.connect.claritynow import claritynow
-from vlab_cli.subcommands.connect.ecs import ecs
-from vlab_cli.subcommands.connect.esxi import esxi
-from vlab_cli.subcommands.connect.dataiq import dataiq
-from vlab_cli.subcommands.connect.dns import dns
-from vlab_cli.subcommands.connect.deployment import deployment
-from vlab_cli.subcommands.connect.avamar import avamar
-from vlab_cli.subcommands.connect.ana import ana
-from vlab_cli.subcommands.connect.dd import dd
-from vlab_cli.subcommands.connect.superna import superna
-from vlab_cli.subcommands.connect.kemp import kemp
 
+SUBCOMMANDS = {
+    'router' : 'vlab_cli.subcommands.connect.router.router',
+    'deployment' : 'vlab_cli.subcommands.connect.deployment.deployment',
+}
+# These are built from the component registry
+GENERATED = (
+    'ana',
+    'avamar',
+    'cee',
+    'centos',
+    'claritynow',
+    'dataiq',
+    'dd',
+    'dns',
+    'ecs',
+    'esrs',
+    'esxi',
+    'icap',
+    'insightiq',
+    'kemp',
+    'onefs',
+    'superna',
+    'windows',
+    'winserver',
+)
+SUBCOMMANDS.update(lazy_subcommands('connect', GENERATED))
 
-@click.group(cls=AliasedGroup)
+
+@click.group(cls=LazyAliasedGroup, lazy_subcommands=SUBCOMMANDS)
 @click.pass_context
 def connect(ctx):
     """Connect to a component in your lab"""
@@ -54,25 +62,3 @@ def connect(ctx):
             except Exception as doh:
                 ctx.obj.log.debug(doh, exc_info=True)
                 raise click.ClickException(doh)
-
-
-connect.add_command(onefs)
-connect.add_command(insightiq)
-connect.add_command(esrs)
-connect.add_command(cee)
-connect.add_command(router)
-connect.add_command(windows)
-connect.add_command(winserver)
-connect.add_command(centos)
-connect.add_command(icap)
-connect.add_command(claritynow)
-connect.add_command(ecs)
-connect.add_command(esxi)
-connect.add_command(dataiq)
-connect.add_command(dns)
-connect.add_command(deployment)
-connect.add_command(avamar)
-connect.add_command(ana)
-connect.add_command(dd)
-connect.add_command(superna)
-connect.add_command(kemp)
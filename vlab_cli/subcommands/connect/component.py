@@ -0,0 +1,80 @@
+# -*- coding: UTF-8 -*-
+"""Builds the CLI for connecting to the components in the registry"""
+import getpass
+
+import click
+
+from vlab_cli.lib.widgets import Spinner
+from vlab_cli.lib.api import consume_task
+from vlab_cli.lib.components import COMPONENTS
+from vlab_cli.lib.connectorizer import Connectorizer
+from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.portmap_helpers import get_protocol_port, query_portmaps
+
+
+def build(name):
+    """Create the ``vlab connect <name>`` command of a component
+
+    :Returns: click.Command
+
+    :param name: The name of the component, as typed on the CLI
+    :type name: String
+    """
+    component = COMPONENTS[name]
+    settings = component['connect']
+
+    @click.command(name=name, help='Connect to {} {}'.format(component['article'], component['noun']))
+    @click.option('-p', '--protocol', type=click.Choice(settings['protocols'], case_sensitive=False),
+                  default=settings['default'], show_default=True,
+                  help='The protocol to connect with')
+    @click.option('-n', '--name', cls=MandatoryOption,
+                  help='The name of the {} to connect to'.format(component['noun']))
+    @click.option('-u', '--user', default=settings['user'],
+                  help='The name of the user to connect to the {} as.'.format(component['noun']))
+    @click.option('--password', default=False, is_flag=True,
+                  help='If supported, auto-enter the password when connecting.')
+    @click.pass_context
+    def connect_component(ctx, name, protocol, user, password):
+        protocol = protocol.lower()
+        if protocol in settings.get('errors', {}):
+            raise click.ClickException(settings['errors'][protocol])
+        if protocol == 'console':
+            info = consume_task(ctx.obj.vlab_api,
+                                endpoint=component['endpoint'],
+                                message='Looking up connection info for {}'.format(name),
+                                method='GET').json()
+            if not info['content'].get(name, None):
+                error = 'No {} named {} found'.format(component['noun'], name)
+                raise click.ClickException(error)
+            else:
+                vm_moid = info['content'][name].get('moid', 'n/a')
+            conn = Connectorizer(ctx.obj.vlab_config, gateway_ip='n/a')
+            conn.console(vm_moid)
+            return
+        target_port = get_protocol_port(component['kind'], protocol)
+        with Spinner('Looking up connection information for {}'.format(name)):
+            content = query_portmaps(ctx.obj.vlab_api, [name], target_port=target_port)[0]
+        conn_port = next(iter(content['ports']), None)
+        if not conn_port:
+            error = 'No mapping rule for {} to {} exists'.format(protocol, name)
+            raise click.ClickException(error)
+
+        if password:
+            password_value = getpass.getpass('Password for {}: '.format(user))
+            conn = Connectorizer(ctx.obj.vlab_config, content['gateway_ip'], user=user, password=password_value)
+        else:
+            conn = Connectorizer(ctx.obj.vlab_config, content['gateway_ip'], user=user)
+        if protocol in settings.get('warnings', {}):
+            click.secho(settings['warnings'][protocol], bold=True)
+        if protocol == 'ssh':
+            conn.ssh(port=conn_port)
+        elif protocol == 'scp':
+            conn.scp(port=conn_port)
+        elif protocol in ('https', 'mgmt'):
+            conn.https(port=conn_port, endpoint=settings.get('https_endpoint', ''))
+        elif protocol == 'rdp':
+            conn.rdp(port=conn_port)
+        else:
+            error = 'Unexpected protocol requested: {}'.format(protocol)
+            raise RuntimeError(error)
+    return connect_component
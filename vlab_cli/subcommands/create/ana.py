@@ -6,8 +6,8 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.ascii_output import format_machine_info
-from vlab_cli.lib.portmap_helpers import get_protocol_port, get_component_protocols
 
 
 @click.command()
@@ -40,21 +40,17 @@ def ana(ctx, name, image, static_ip, external_netmask, default_gateway, dns_serv
                           'domain': domain
                          }
             }
+    follow_up = FollowUp('create_portmaps', name=name, addrs=[static_ip])
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/avamar/ndmp-accelerator',
                         message='Creating a new Avamar NDMP accelerator running version {}'.format(image),
                         body=body,
                         timeout=1800,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
-    vm_type = data['meta']['component']
     with Spinner('Creating port mapping rules for HTTPS and SSH'):
-        protocols = get_component_protocols(vm_type.lower())
-        for protocol in protocols:
-            port = get_protocol_port(vm_type, protocol)
-            payload = {'target_addr' : static_ip, 'target_port' : port,
-                       'target_name' : name, 'target_component' : vm_type}
-            ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=payload)
+        follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
 
 
     output = format_machine_info(ctx.obj.vlab_api, info=data)
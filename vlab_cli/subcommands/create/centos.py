@@ -6,6 +6,7 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.portmap_helpers import get_ipv4_addrs
 from vlab_cli.lib.ascii_output import format_machine_info
 
@@ -32,27 +33,20 @@ def centos(ctx, name, image, external_network, desktop, cpu_count, ram):
             'desktop': desktop,
             'ram': int(ram),
             'cpu-count': int(cpu_count)}
+    follow_up = FollowUp('create_portmaps', name=name, protocols=['ssh', 'rdp'] if desktop else ['ssh'])
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/centos',
                         message='Creating a new instance of CentOS {}'.format(image),
                         body=body,
                         timeout=900,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
     ipv4_addrs = get_ipv4_addrs(data['ips'])
     if ipv4_addrs:
-        vm_type = data['meta']['component']
-        with Spinner('Creating an SSH port mapping rule'):
-            for ipv4 in ipv4_addrs:
-                portmap_payload = {'target_addr' : ipv4, 'target_port' : 22,
-                                   'target_name' : name, 'target_component' : vm_type}
-                ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
-        if desktop:
-            with Spinner('Creating an RDP port mapping rule'):
-                for ipv4 in ipv4_addrs:
-                    portmap_payload = {'target_addr' : ipv4, 'target_port' : 3389,
-                                       'target_name' : name, 'target_component' : vm_type}
-                    ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+        message = 'Creating SSH and RDP port mapping rules' if desktop else 'Creating an SSH port mapping rule'
+        with Spinner(message):
+            follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
 
     output = format_machine_info(ctx.obj.vlab_api, info=data)
     click.echo(output)
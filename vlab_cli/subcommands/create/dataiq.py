@@ -6,7 +6,8 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
-from vlab_cli.lib.portmap_helpers import get_component_protocols, network_config_ok, get_protocol_port
+from vlab_cli.lib.follow_ups import FollowUp
+from vlab_cli.lib.portmap_helpers import network_config_ok
 from vlab_cli.lib.ascii_output import format_machine_info
 
 
@@ -48,22 +49,18 @@ def dataiq(ctx, name, image, external_network, external_netmask, default_gateway
             'disk-size': int(disk_size),
             'cpu-count': int(cpu_count),
             'ram': int(ram)}
+    follow_up = FollowUp('create_portmaps', name=name, addrs=[static_ip])
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/dataiq',
                         message='Creating a new instance of DataIQ {}'.format(image),
                         body=body,
                         timeout=1800,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
     data['ips'] = [static_ip]
-    vm_type = data['meta']['component']
-    protocols = get_component_protocols(vm_type.lower())
     with Spinner('Creating port mapping rules for SSH, HTTPS, and RDP'):
-        for protocol in protocols:
-            target_port = get_protocol_port(vm_type.lower(), protocol)
-            portmap_payload = {'target_addr' : static_ip, 'target_port' : target_port,
-                               'target_name' : name, 'target_component' : vm_type}
-            ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+        follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
 
     output = format_machine_info(ctx.obj.vlab_api, info=data)
     click.echo(output)
@@ -6,7 +6,8 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
-from vlab_cli.lib.portmap_helpers import get_component_protocols, network_config_ok, get_protocol_port
+from vlab_cli.lib.follow_ups import FollowUp
+from vlab_cli.lib.portmap_helpers import network_config_ok
 from vlab_cli.lib.ascii_output import format_machine_info
 
 
@@ -39,25 +40,22 @@ def dns(ctx, name, image, external_network, external_netmask, default_gateway,
             'default-gateway': default_gateway,
             'external-netmask': external_netmask,
             'dns-servers': dns_servers}
+    if image.lower().startswith('windows'):
+        protocols = ['rdp']
+    else:
+        protocols = ['ssh']
+    follow_up = FollowUp('create_portmaps', name=name, protocols=protocols, addrs=[static_ip])
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/dns',
                         message='Creating a new DNS server running {}'.format(image),
                         body=body,
                         timeout=1800,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
     data['ips'] = [static_ip]
-    vm_type = data['meta']['component']
-    if image.lower().startswith('windows'):
-        protocols = ['rdp']
-    else:
-        protocols = ['ssh']
     with Spinner('Creating a port mapping rule for {}'.format(protocols[0].upper())):
-        for protocol in protocols:
-            target_port = get_protocol_port(vm_type.lower(), protocol)
-            portmap_payload = {'target_addr' : static_ip, 'target_port' : target_port,
-                               'target_name' : name, 'target_component' : vm_type}
-            ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+        follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
 
     output = format_machine_info(ctx.obj.vlab_api, info=data)
     click.echo(output)
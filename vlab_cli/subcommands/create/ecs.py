@@ -8,6 +8,7 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.ascii_output import format_machine_info
 from vlab_cli.lib.portmap_helpers import https_to_port, get_ipv4_addrs
 
@@ -27,13 +28,41 @@ def ecs(ctx, name, image, external_network, skip_config):
     body = {'network': external_network,
             'name': name,
             'image': image}
+    follow_up = FollowUp('setup_ecs', name=name, skip_config=skip_config)
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/ecs',
                         message='Creating a new instance of ECS running {}'.format(image),
                         body=body,
                         timeout=1200,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
+    follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
+    output = format_machine_info(ctx.obj.vlab_api, info=data)
+    click.echo(output)
+    if get_ipv4_addrs(data['ips']):
+        typewriter("\nUse 'vlab connect ecs --name {}' to access your new ECS instance".format(name))
+
+
+def setup_ecs(vlab_api, data, name, skip_config):
+    """Create the port mapping rules for a new ECS instance, then configure it
+
+    :Returns: None
+
+    :Raises: click.ClickException
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param data: The new ECS instance, as the task to create it returned it
+    :type data: Dictionary
+
+    :param name: The name of the new ECS instance
+    :type name: String
+
+    :param skip_config: Only create the port mapping rules
+    :type skip_config: Boolean
+    """
     ipv4_addrs = get_ipv4_addrs(data['ips'])
     port_mapping = {}
     if ipv4_addrs:
@@ -43,13 +72,13 @@ def ecs(ctx, name, image, external_network, skip_config):
             for ipv4 in ipv4_addrs:
                 portmap_payload = {'target_addr' : ipv4, 'target_port' : 22,
                                    'target_name' : name, 'target_component' : vm_type}
-                new_port = ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload).json()['content']['conn_port']
+                new_port = vlab_api.post('/api/1/ipam/portmap', json=portmap_payload).json()['content']['conn_port']
                 port_mapping[ipv4] = new_port
                 portmap_payload['target_port'] = https_port
-                ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+                vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
 
     if not skip_config:
-        resp = consume_task(ctx.obj.vlab_api,
+        resp = consume_task(vlab_api,
                             endpoint='/api/2/inf/gateway',
                             message='Looking gateway information',
                             method='GET').json()['content']
@@ -62,7 +91,7 @@ def ecs(ctx, name, image, external_network, skip_config):
         ecs_ip = _determine_ip(port_mapping.keys())
         config_payload = {'name' : name, 'ssh_port': port_mapping[ecs_ip],
                           'gateway_ip' : gateway_ip, 'ecs_ip': ecs_ip}
-        consume_task(ctx.obj.vlab_api,
+        consume_task(vlab_api,
                      endpoint='/api/2/inf/ecs/config',
                      message='Configuring your ECS instance',
                      method='POST',
@@ -70,11 +99,6 @@ def ecs(ctx, name, image, external_network, skip_config):
                      base_endpoint=False,
                      timeout=1800,
                      pause=5)
-    output = format_machine_info(ctx.obj.vlab_api, info=data)
-    click.echo(output)
-    if ipv4_addrs:
-        typewriter("\nUse 'vlab connect ecs --name {}' to access your new ECS instance".format(name))
-
 
 
 def _determine_ip(ip_addrs):
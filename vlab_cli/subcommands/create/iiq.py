@@ -6,8 +6,9 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.ascii_output import format_machine_info
-from vlab_cli.lib.portmap_helpers import https_to_port, get_ipv4_addrs
+from vlab_cli.lib.portmap_helpers import get_ipv4_addrs
 
 
 @click.command()
@@ -23,25 +24,19 @@ def insightiq(ctx, name, image, external_network):
     body = {'network': external_network,
             'name': name,
             'image': image}
+    follow_up = FollowUp('create_portmaps', name=name, protocols=['https', 'ssh'], first_only=True)
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/insightiq',
                         message='Creating a new instance of InsightIQ running {}'.format(image),
                         body=body,
                         timeout=900,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
     ipv4_addrs = get_ipv4_addrs(data['ips'])
     if ipv4_addrs:
         with Spinner("Creating port mapping rules for HTTPS and SSH"):
-            vm_type = data['meta']['component']
-            https_port = https_to_port(vm_type.lower())
-            portmap_payload = {'target_addr': ipv4_addrs[0],
-                               'target_port': https_port,
-                               'target_name': name,
-                               'target_component' : 'InsightIQ'}
-            ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
-            portmap_payload['target_port'] = 22
-            ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+            follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
 
     output = format_machine_info(ctx.obj.vlab_api, info=data)
     click.echo(output)
@@ -2,6 +2,7 @@
 """Defines the CLI for creating OneFS nodes"""
 import re
 import random
+import asyncio
 import ipaddress
 from collections import OrderedDict
 
@@ -13,8 +14,10 @@ from vlab_cli.lib.validators import ext_network_ok
 from vlab_cli.lib.clippy import invoke_onefs_clippy, invoke_onefs_network_clippy
 from vlab_cli.lib.ascii_output import vm_table_view
 from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.portmap_helpers import https_to_port
-from vlab_cli.lib.api import block_on_tasks, consume_task
+from vlab_cli.lib import async_api
+from vlab_cli.lib.api import consume_task, raise_on_errors
 from vlab_cli.lib.widgets import Spinner, prompt, typewriter
 
 
@@ -90,6 +93,23 @@ def onefs(ctx, name, image, node_count, external, internal, external_ip_range,
         if not ips_ok:
             external_ip_range = invoke_onefs_network_clippy(ctx.obj.username, default_gateway, external_netmask, external_ip_range)
     name_ok(name)
+    if skip_config:
+        follow_up = None
+    else:
+        # lists, not tuples, so the follow-up is the same once it's been through JSON
+        follow_up = FollowUp('configure_onefs',
+                             cluster_name=name,
+                             image=image,
+                             external_ip_range=list(external_ip_range),
+                             internal_ip_range=list(internal_ip_range),
+                             default_gateway=default_gateway,
+                             smartconnect_ip=smartconnect_ip,
+                             sc_zonename=sc_zonename,
+                             dns_servers=list(dns_servers),
+                             encoding=encoding,
+                             external_netmask=external_netmask,
+                             internal_netmask=internal_netmask,
+                             compliance=compliance)
     info = create_nodes(username=ctx.obj.username,
                         name=name,
                         image=image,
@@ -98,23 +118,10 @@ def onefs(ctx, name, image, node_count, external, internal, external_ip_range,
                         internal=internal,
                         ram=ram,
                         cpu_count=cpu_count,
-                        vlab_api=ctx.obj.vlab_api)
-    if not skip_config:
-        config_nodes(cluster_name=name,
-                     nodes=info.keys(),
-                     image=image,
-                     external_ip_range=external_ip_range,
-                     internal_ip_range=internal_ip_range,
-                     default_gateway=default_gateway,
-                     smartconnect_ip=smartconnect_ip,
-                     sc_zonename=sc_zonename,
-                     dns_servers=dns_servers,
-                     encoding=encoding,
-                     external_netmask=external_netmask,
-                     internal_netmask=internal_netmask,
-                     compliance=compliance,
-                     vlab_api=ctx.obj.vlab_api)
-        map_ips(vlab_api=ctx.obj.vlab_api, nodes=_sort_node_names(info.keys()), ip_range=external_ip_range)
+                        vlab_api=ctx.obj.vlab_api,
+                        follow_up=follow_up)
+    if follow_up:
+        follow_up.run(ctx.obj.vlab_api, {x: info[x]['content'][x] for x in info.keys()})
     table = generate_table(vlab_api=ctx.obj.vlab_api, info=info)
     click.echo('\n{}\n'.format(table))
     if not skip_config:
@@ -142,21 +149,54 @@ def _sort_node_names(nodes):
     return sorted(nodes, key=f)
 
 
+def configure_cluster(vlab_api, nodes, cluster_name, image, external_ip_range, internal_ip_range,
+                      default_gateway, smartconnect_ip, sc_zonename, dns_servers, encoding,
+                      external_netmask, internal_netmask, compliance):
+    """Turn new nodes into a OneFS cluster, then create the port mapping rules for each node
+
+    :Returns: None
+
+    :param vlab_api: An instantiated connection to the vLab server
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param nodes: The names of the new nodes
+    :type nodes: List
+
+    The rest of the params are the settings of the cluster; see ``config_nodes``.
+    """
+    config_nodes(cluster_name=cluster_name,
+                 nodes=nodes,
+                 image=image,
+                 external_ip_range=external_ip_range,
+                 internal_ip_range=internal_ip_range,
+                 default_gateway=default_gateway,
+                 smartconnect_ip=smartconnect_ip,
+                 sc_zonename=sc_zonename,
+                 dns_servers=dns_servers,
+                 encoding=encoding,
+                 external_netmask=external_netmask,
+                 internal_netmask=internal_netmask,
+                 compliance=compliance,
+                 vlab_api=vlab_api)
+    map_ips(vlab_api=vlab_api, nodes=_sort_node_names(nodes), ip_range=external_ip_range)
+
+
 def map_ips(vlab_api, nodes, ip_range):
     """Create the port mapping rules for each node"""
     low_ip = str(min([ipaddress.ip_address(x) for x in ip_range]))
     high_ip = str(max([ipaddress.ip_address(x) for x in ip_range]))
     ips = _generate_ips(low_ip, high_ip)
     https_port = https_to_port('onefs')
-    with Spinner('Creating SSH and HTTPS mapping rules for each node'):
-        for ip, node in zip(ips, nodes):
+    calls = []
+    for ip, node in zip(ips, nodes):
+        for port in (https_port, 22):
             portmap_payload = {'target_addr': ip,
-                               'target_port': https_port,
+                               'target_port': port,
                                'target_name': node,
                                'target_component' : 'OneFS'}
-            vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
-            portmap_payload['target_port'] = 22
-            vlab_api.post('/api/1/ipam/portmap', json=portmap_payload)
+            calls.append(('post', '/api/1/ipam/portmap', {'json': portmap_payload}))
+    with Spinner('Creating SSH and HTTPS mapping rules for each node'):
+        raise_on_errors(vlab_api.bulk(calls))
 
 
 def _generate_ips(start_ip, end_ip):
@@ -187,7 +227,8 @@ def _generate_ips(start_ip, end_ip):
     return ip_range
 
 
-def create_nodes(username, name, image, external, internal, node_count, ram, cpu_count, vlab_api):
+def create_nodes(username, name, image, external, internal, node_count, ram, cpu_count, vlab_api,
+                 follow_up=None):
     """Concurrently make all nodes
 
     :Returns: Dictionary
@@ -215,25 +256,36 @@ def create_nodes(username, name, image, external, internal, node_count, ram, cpu
 
     :param vlab_api: An instantiated connection to the vLab server
     :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param follow_up: What to do once the nodes exist, like configure them
+    :type follow_up: vlab_cli.lib.follow_ups.FollowUp
     """
-    tasks = {}
     node_v_nodes = 'node' if node_count == 1 else 'nodes'
+    bodies = []
+    for idx in range(node_count):
+        node_name = '{}-{}'.format(name, idx +1) # +1 so we don't have node-0
+        bodies.append({'name' : node_name,
+                       'image': image,
+                       'frontend': external,
+                       'backend': internal,
+                       'ram': ram,
+                       'cpu-count': cpu_count,
+                      })
     with Spinner('Deploying {} {} running {}'.format(node_count, node_v_nodes, image)):
-        for idx in range(node_count):
-            node_name = '{}-{}'.format(name, idx +1) # +1 so we don't have node-0
-            body = {'name' : node_name,
-                    'image': image,
-                    'frontend': external,
-                    'backend': internal,
-                    'ram': ram,
-                    'cpu-count': cpu_count,
-                    }
-            resp = vlab_api.post('/api/2/inf/onefs', json=body)
-            tasks[node_name] = '/api/2/inf/onefs/task/{}'.format(resp.json()['content']['task-id'])
-        info = block_on_tasks(vlab_api, tasks)
+        info = async_api.run(_create_nodes(vlab_api, bodies, follow_up))
     return info
 
 
+async def _create_nodes(vlab_api, bodies, follow_up=None):
+    """Issue the requests for all the new nodes at once, then wait on them all"""
+    with async_api.AsyncVLabApi(vlab_api) as api:
+        resps = await asyncio.gather(*[api.post('/api/2/inf/onefs', json=x) for x in bodies])
+        tasks = {}
+        for body, resp in zip(bodies, resps):
+            tasks[body['name']] = '/api/2/inf/onefs/task/{}'.format(resp.json()['content']['task-id'])
+        return await async_api.block_on_tasks(api, tasks, method='POST', follow_up=follow_up)
+
+
 def config_nodes(cluster_name, nodes, image, external_ip_range, internal_ip_range,
                  default_gateway, smartconnect_ip, sc_zonename, dns_servers,
                  encoding, external_netmask, internal_netmask, compliance, vlab_api):
@@ -6,6 +6,7 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.ascii_output import format_machine_info
 
 
@@ -39,18 +40,17 @@ def superna(ctx, name, image, static_ip, external_netmask, default_gateway, dns_
                           'domain': domain
                          }
             }
+    follow_up = FollowUp('create_portmaps', name=name, protocols=['ssh'], addrs=[static_ip])
     resp = consume_task(ctx.obj.vlab_api,
                         endpoint='/api/2/inf/superna',
                         message='Creating a new Superna Eyeglass server running version {}'.format(image),
                         body=body,
                         timeout=1800,
-                        pause=5)
+                        pause=5,
+                        follow_up=follow_up)
     data = resp.json()['content'][name]
-    vm_type = data['meta']['component']
     with Spinner('Creating port a mapping rule for SSH.'):
-        payload = {'target_addr' : static_ip, 'target_port' : 22,
-                   'target_name' : name, 'target_component' : vm_type}
-        ctx.obj.vlab_api.post('/api/1/ipam/portmap', json=payload)
+        follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
 
     output = format_machine_info(ctx.obj.vlab_api, info=data)
     click.echo(output)
@@ -6,6 +6,7 @@ from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter
 from vlab_cli.lib.click_extras import MandatoryOption, MultiValue
+from vlab_cli.lib.portmap_helpers import lookup_portmaps
 
 
 @click.command()
@@ -30,13 +31,12 @@ def template(ctx, name, machines, summary):
     body = {'name' : name, 'summary' : ' '.join(summary), 'machines' : machines}
     portmaps = []
     with Spinner('Looking portmap rules for machines'):
-        for machine in machines:
-            resp = ctx.obj.vlab_api.get('/api/1/ipam/portmap', params={'name' : machine})
-            data = [x for x in resp.json()['content']['ports'].values()]
+        for machine, ports in zip(machines, lookup_portmaps(ctx.obj.vlab_api, machines)):
+            data = [x for x in ports.values()]
             if data:
-                ports = [x['target_port'] for x in data]
+                target_ports = [x['target_port'] for x in data]
                 target_addr = [x['target_addr'] for x in data][0]
-                port_map = {'name': machine, 'target_addr': target_addr, 'target_ports': ports}
+                port_map = {'name': machine, 'target_addr': target_addr, 'target_ports': target_ports}
                 portmaps.append(port_map)
     body['portmaps'] = portmaps
 
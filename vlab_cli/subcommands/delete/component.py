@@ -0,0 +1,42 @@
+# -*- coding: UTF-8 -*-
+"""Builds the CLI for destroying the components in the registry"""
+import click
+
+from vlab_cli.lib.widgets import Spinner
+from vlab_cli.lib.api import consume_task
+from vlab_cli.lib.components import COMPONENTS
+from vlab_cli.lib.follow_ups import FollowUp
+from vlab_cli.lib.click_extras import MandatoryOption
+
+
+def build(name):
+    """Create the ``vlab delete <name>`` command of a component
+
+    :Returns: click.Command
+
+    :param name: The name of the component, as typed on the CLI
+    :type name: String
+    """
+    component = COMPONENTS[name]
+
+    @click.command(name=name, help='Delete {} {}'.format(component['article'], component['noun']))
+    @click.option('-n', '--name', cls=MandatoryOption,
+                  help='The name of the {} in your lab'.format(component['noun']))
+    @click.pass_context
+    def delete_component(ctx, name):
+        if component.get('portmaps', True):
+            follow_up = FollowUp('delete_portmaps', names=[name])
+        else:
+            follow_up = None
+        body = {'name': name}
+        resp = consume_task(ctx.obj.vlab_api,
+                            endpoint=component['endpoint'],
+                            message='Destroying {} named {}'.format(component['noun'], name),
+                            body=body,
+                            method='DELETE',
+                            follow_up=follow_up)
+        if follow_up:
+            with Spinner('Deleting port mapping rules'):
+                follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
+        click.echo('OK!')
+    return delete_component
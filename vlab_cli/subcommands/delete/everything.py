@@ -4,6 +4,7 @@ import click
 
 from vlab_cli.lib.widgets import Spinner
 from vlab_cli.lib.api import consume_task, block_on_tasks
+from vlab_cli.lib.follow_ups import FollowUp
 
 
 @click.command()
@@ -12,17 +13,30 @@ def everything(ctx):
     """Destroy everything you own."""
     click.confirm(" Are you sure you want to destroy your entire lab?", abort=True)
     click.confirm(" Really sure? You cannot undo this, just like you cannot un-bake a cake.", abort=True)
-    consume_task(ctx.obj.vlab_api,
-                 endpoint='/api/1/inf/power',
-                 body={'machine': 'all', 'power': 'off'},
-                 message='Powering down your lab',
-                 timeout=300,
-                 pause=5)
-    consume_task(ctx.obj.vlab_api,
+    follow_up = FollowUp('destroy_lab')
+    resp = consume_task(ctx.obj.vlab_api,
+                        endpoint='/api/1/inf/power',
+                        body={'machine': 'all', 'power': 'off'},
+                        message='Powering down your lab',
+                        timeout=300,
+                        pause=5,
+                        follow_up=follow_up)
+    follow_up.run(ctx.obj.vlab_api, resp.json()['content'])
+
+
+def destroy_lab(vlab_api):
+    """Delete every VM and network of a lab that's been powered off
+
+    :Returns: None
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+    """
+    consume_task(vlab_api,
                  endpoint='/api/1/inf/inventory',
                  message='Destroying inventory',
                  method='DELETE')
-    resp = consume_task(ctx.obj.vlab_api,
+    resp = consume_task(vlab_api,
                         endpoint='/api/2/inf/vlan',
                         message='Determining what networks you own',
                         method='GET')
@@ -30,6 +44,6 @@ def everything(ctx):
     tasks = {}
     with Spinner('Deleting networks'):
         for vlan in vlans.keys():
-            resp = ctx.obj.vlab_api.delete('/api/2/inf/vlan', json={'vlan-name': vlan})
+            resp = vlab_api.delete('/api/2/inf/vlan', json={'vlan-name': vlan})
             tasks[vlan] = resp.links['status']['url']
-        block_on_tasks(ctx.obj.vlab_api, tasks, pause=1)
+        block_on_tasks(vlab_api, tasks, pause=1, method='DELETE')
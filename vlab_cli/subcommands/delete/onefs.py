@@ -1,9 +1,13 @@
 # -*- coding: UTF-8 -*-
 """Defines the CLI for deleting a OneFS node or cluster"""
+import asyncio
+
 import click
 
 from vlab_cli.lib.widgets import Spinner
-from vlab_cli.lib.api import consume_task, block_on_tasks
+from vlab_cli.lib import async_api
+from vlab_cli.lib.api import consume_task
+from vlab_cli.lib.follow_ups import FollowUp
 from vlab_cli.lib.click_extras import MutuallyExclusiveOption
 
 
@@ -27,15 +31,15 @@ def onefs(ctx, name, cluster):
 def delete_node(vlab_api, name):
     """Destroy one specific node"""
     body = {'name': name}
-    consume_task(vlab_api,
-                 endpoint='/api/2/inf/onefs',
-                 body=body,
-                 message='Destroying OneFS node {}'.format(name),
-                 method='DELETE')
+    follow_up = FollowUp('delete_portmaps', names=[name])
+    resp = consume_task(vlab_api,
+                        endpoint='/api/2/inf/onefs',
+                        body=body,
+                        message='Destroying OneFS node {}'.format(name),
+                        method='DELETE',
+                        follow_up=follow_up)
     with Spinner('Deleting port mapping rules'):
-        all_ports = vlab_api.get('/api/1/ipam/portmap', params={'name': name}).json()['content']['ports']
-        for port in all_ports.keys():
-            vlab_api.delete('/api/1/ipam/portmap', json={'conn_port': int(port)})
+        follow_up.run(vlab_api, resp.json()['content'])
     click.echo('OK!')
 
 
@@ -48,21 +52,24 @@ def delete_cluster(vlab_api, cluster):
     nodes = _find_cluster_nodes(cluster, all_nodes=data['content'].keys())
     if not nodes:
         raise click.ClickException('No cluster named {} found'.format(cluster))
-    tasks = {}
+    follow_up = FollowUp('delete_portmaps', names=nodes)
     with Spinner("Deleting cluster {}".format(cluster)):
-        for node in nodes:
-            body = {'name': node}
-            resp = vlab_api.delete('/api/2/inf/onefs', json=body)
-            tasks[node] = '/api/2/inf/onefs/task/{}'.format(resp.json()['content']['task-id'])
-        block_on_tasks(vlab_api, tasks)
+        async_api.run(_delete_nodes(vlab_api, nodes, follow_up))
     with Spinner('Deleting port mapping rules'):
-        for node in nodes:
-            all_ports = vlab_api.get('/api/1/ipam/portmap', params={'name': node}).json()['content']['ports']
-            for port in all_ports.keys():
-                vlab_api.delete('/api/1/ipam/portmap', json={'conn_port': int(port)})
+        follow_up.run(vlab_api, {})
     click.echo('OK!')
 
 
+async def _delete_nodes(vlab_api, nodes, follow_up=None):
+    """Issue the requests to delete all the nodes at once, then wait on them all"""
+    with async_api.AsyncVLabApi(vlab_api) as api:
+        resps = await asyncio.gather(*[api.delete('/api/2/inf/onefs', json={'name': x}) for x in nodes])
+        tasks = {}
+        for node, resp in zip(nodes, resps):
+            tasks[node] = '/api/2/inf/onefs/task/{}'.format(resp.json()['content']['task-id'])
+        await async_api.block_on_tasks(api, tasks, method='DELETE', follow_up=follow_up)
+
+
 def _find_cluster_nodes(cluster_name, all_nodes):
     """Given a cluster name, and a list of nodes owned, find the nodes that belong
     to that cluster
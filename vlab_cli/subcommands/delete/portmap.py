@@ -8,7 +8,8 @@ from vlab_cli.lib.widgets import Spinner, typewriter
 from vlab_cli.lib.click_extras import MandatoryOption, HiddenOption
 from vlab_cli.lib.clippy import invoke_portmap_clippy
 from vlab_cli.lib.portmap_helpers import (get_component_protocols, get_protocol_port,
-                                          validate_ip, determine_which_ip, validate_ip)
+                                          validate_ip, determine_which_ip, validate_ip,
+                                          lookup_portmaps)
 
 
 @click.command()
@@ -49,15 +50,12 @@ def portmap(ctx, name, protocol, ip_address, override_port):
             target_port = override_port
 
     with Spinner('Deleting port mapping rule to {} for {}'.format(name, protocol)):
-        resp = ctx.obj.vlab_api.get('/api/1/ipam/portmap', params={'name': name, 'target_port' : target_port}).json()
-        try:
-            if not override_port:
-                conn_port = list(resp['content']['ports'].keys())[0]
-            else:
-                conn_port = override_port
-        except IndexError:
-            # No such rule, but who cares? The target state (i.e. no rule) is true
-            pass
+        if override_port:
+            conn_port = override_port
         else:
+            ports = lookup_portmaps(ctx.obj.vlab_api, [name], target_port=target_port)[0]
+            # No such rule, but who cares? The target state (i.e. no rule) is true
+            conn_port = next(iter(ports), None)
+        if conn_port is not None:
             ctx.obj.vlab_api.delete('/api/1/ipam/portmap', json={'conn_port': int(conn_port)})
     click.echo('OK!')
@@ -6,7 +6,7 @@ import sys
 
 import click
 
-from vlab_cli.lib.click_extras import HiddenOption
+from vlab_cli.lib.click_extras import HiddenOption, refuse_no_wait
 from vlab_cli.lib.widgets import Spinner, typewriter
 from vlab_cli.lib.ascii_output import format_machine_info
 from vlab_cli.lib.api import consume_task, block_on_tasks
@@ -28,6 +28,8 @@ from vlab_cli.lib.clippy.vlab_init import invoke_greeting, invoke_tutorial, invo
 @click.pass_context
 def init(ctx, start_over, switch, wan, only_tab_completion, tab_completion_shell):
     """Initialize the virtual lab"""
+    if start_over or not only_tab_completion:
+        refuse_no_wait(ctx, 'set up your networks and gateway')
     if start_over:
         nuke_lab(ctx.obj.vlab_api, ctx.obj.username, wan, switch, config=ctx.obj.vlab_config, log=ctx.obj.log)
     elif only_tab_completion:
@@ -86,7 +88,7 @@ def nuke_lab(vlab_api, username, wan, switch, config, log):
         for vlan in vlans.keys():
             resp = vlab_api.delete('/api/2/inf/vlan', json={'vlan-name': vlan})
             tasks[vlan] = resp.links['status']['url']
-        block_on_tasks(vlab_api, tasks, pause=1)
+        block_on_tasks(vlab_api, tasks, pause=1, method='DELETE')
     typewriter('Finished deleting old lab. Initializing a new lab.')
     init_lab(vlab_api, username, wan, switch, config=config, log=log)
 
@@ -138,7 +140,7 @@ def init_lab(vlab_api, username, wan, switch, config, log):
         body3 = {'vlan-name': 'backend', 'switch-name': switch}
         resp3 = vlab_api.post('/api/2/inf/vlan', json=body3)
         tasks['backend_network'] = resp3.links['status']['url']
-        block_on_tasks(vlab_api, tasks, auto_check=False, pause=1)
+        block_on_tasks(vlab_api, tasks, auto_check=False, pause=1, method='POST')
 
     body4 = {'wan': wan, 'lan': 'frontend'.format(username)}
     consume_task(vlab_api,
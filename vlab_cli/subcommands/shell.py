@@ -0,0 +1,245 @@
+# -*- coding: UTF-8 -*-
+"""
+Defines the CLI for an interactive shell, which runs many vlab commands in one process
+"""
+import os
+import time
+import shlex
+import threading
+
+import click
+
+from vlab_cli.lib import manifest
+
+
+HISTORY_FILE = os.path.join(os.path.expanduser('~'), '.vlab', 'shell_history')
+HISTORY_LENGTH = 1000
+PROMPT = 'vlab> '
+EXIT_WORDS = ('exit', 'quit')
+NAME_OPTS = ('-n', '--name')
+# Running these can change what VMs you own
+INVENTORY_CHANGERS = ('create', 'delete', 'init')
+INVENTORY_TIMEOUT = 120
+
+
+@click.command()
+@click.pass_context
+def shell(ctx):
+    """Run vlab commands interactively, without reconnecting each time"""
+    root_ctx = ctx.find_root()
+    # Connect now so the token prompt (if any) doesn't interrupt the first command
+    ctx.obj.vlab_api
+    names = VMNames(ctx.obj.vlab_api, ctx.obj.log)
+    names.refresh()
+    _setup_readline(root_ctx, names)
+    click.echo("Type a vlab command without the 'vlab', like 'status'. Type 'exit' to quit.")
+    while True:
+        try:
+            line = input(PROMPT)
+        except EOFError:
+            click.echo()
+            break
+        except KeyboardInterrupt:
+            click.echo()
+            continue
+        try:
+            args = shlex.split(line)
+        except ValueError as doh:
+            click.echo('Error: {}'.format(doh), err=True)
+            continue
+        if not args:
+            continue
+        if args[0] in EXIT_WORDS:
+            break
+        if args[0] == 'help':
+            args = ['--help']
+        if run_command(root_ctx, args) in INVENTORY_CHANGERS:
+            names.refresh()
+    _save_history()
+
+
+def run_command(root_ctx, args):
+    """Invoke a vlab command, like it was typed on the command line
+
+    The new command is a child of the root ``vlab`` context, so it shares the
+    token, API connection, and config that context already has.
+
+    :Returns: String or None (the name of the command that ran, if any)
+
+    :param root_ctx: The context of the root ``vlab`` command
+    :type root_ctx: click.Context
+
+    :param args: The command line arguments, minus the program name
+    :type args: List
+    """
+    cli = root_ctx.command
+    cmd_name = None
+    try:
+        if args[0] in ('-h', '--help'):
+            click.echo(cli.get_help(root_ctx))
+            return None
+        _, cmd, cmd_args = cli.resolve_command(root_ctx, args)
+        # the name typed can be a prefix, like 'cr' for 'create'
+        cmd_name = cmd.name
+        if cmd_name == 'shell':
+            cmd_name = None
+            raise click.UsageError("You're already in the vlab shell", ctx=root_ctx)
+        # VMs can change between commands, so each one starts with a clean slate
+        memo = root_ctx.obj.vlab_api.memo
+        if memo is not None:
+            memo.clear()
+        with cmd.make_context(cmd_name, cmd_args, parent=root_ctx) as sub_ctx:
+            cmd.invoke(sub_ctx)
+    except click.exceptions.Exit:
+        pass
+    except click.ClickException as doh:
+        doh.show()
+    except click.exceptions.Abort:
+        click.echo('Aborted!', err=True)
+    except KeyboardInterrupt:
+        click.echo()
+    except SystemExit:
+        # some commands call sys.exit; that shouldn't end the shell
+        pass
+    except Exception as doh:
+        # a bug in one command (or a dropped connection) shouldn't end the shell
+        root_ctx.obj.log.debug('Command %s failed', args, exc_info=True)
+        click.echo('Error: {}: {}'.format(type(doh).__name__, doh), err=True)
+    return cmd_name
+
+
+class VMNames(object):
+    """The names of the VMs in your lab, for tab-completion
+
+    The inventory is collected in a background thread so the shell doesn't
+    stall while it loads.
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param log: A logging object to aid in debugging
+    :type log: logging.Logger
+    """
+    def __init__(self, vlab_api, log):
+        self._vlab_api = vlab_api
+        self._log = log
+        self.names = []
+
+    def refresh(self):
+        """Reload the VM names in the background"""
+        worker = threading.Thread(target=self._refresh)
+        worker.daemon = True
+        worker.start()
+
+    def _refresh(self):
+        # Not using consume_task; its spinner would clobber the prompt
+        try:
+            endpoint = '/api/1/inf/inventory'
+            resp = self._vlab_api.get(endpoint, memoize=False)
+            url = '{}/task/{}'.format(endpoint, resp.json()['content']['task-id'])
+            for _ in range(INVENTORY_TIMEOUT):
+                resp = self._vlab_api.get(url, memoize=False)
+                if resp.status_code != 202:
+                    break
+                time.sleep(1)
+            content = resp.json()['content']
+            content.pop('defaultGateway', None)
+            self.names = sorted(content.keys())
+        except Exception as doh:
+            self._log.debug('Unable to load VM names: %s', doh)
+
+
+def _setup_readline(root_ctx, names):
+    """Enable command history and tab-completion, if the platform supports it
+
+    :Returns: None
+
+    :param root_ctx: The context of the root ``vlab`` command
+    :type root_ctx: click.Context
+
+    :param names: The VM names to complete
+    :type names: VMNames
+    """
+    try:
+        import readline
+    except ImportError:
+        # i.e. Windows
+        return
+    tree = manifest.load_manifest()
+    if tree is None:
+        tree = manifest.build_manifest(root_ctx.command)
+    completer = Completer(tree['command'], names)
+    readline.set_completer(completer.complete)
+    readline.set_completer_delims(' \t\n')
+    readline.parse_and_bind('tab: complete')
+    try:
+        readline.read_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+    readline.set_history_length(HISTORY_LENGTH)
+
+
+def _save_history():
+    """Write the command history to disk, so it's there next time"""
+    try:
+        import readline
+    except ImportError:
+        return
+    try:
+        readline.write_history_file(HISTORY_FILE)
+    except OSError:
+        pass
+
+
+class Completer(object):
+    """Tab-completion of commands, options, and VM names for ``readline``
+
+    :param root: The manifest description of the root ``vlab`` command
+    :type root: Dictionary
+
+    :param names: The VM names to complete
+    :type names: VMNames
+    """
+    def __init__(self, root, names):
+        self._root = root
+        self._names = names
+        self._matches = []
+
+    def get_choices(self, line):
+        """Figure out what can complete the line typed so far
+
+        :Returns: List
+
+        :param line: What's been typed so far
+        :type line: String
+        """
+        args = manifest._split_args(line)
+        incomplete = ''
+        if args and not line.endswith(' '):
+            incomplete = args.pop()
+        if args and args[-1] in NAME_OPTS:
+            return [x for x in self._names.names if x.startswith(incomplete)]
+        return [x for x, _ in manifest.get_choices(self._root, args, incomplete)]
+
+    def complete(self, text, state):
+        """The ``readline`` completer protocol
+
+        :Returns: String or None
+
+        :param text: The word being completed
+        :type text: String
+
+        :param state: Which match readline wants; 0 means start a new search
+        :type state: Integer
+        """
+        if state == 0:
+            import readline
+            line = readline.get_line_buffer()[:readline.get_endidx()]
+            try:
+                self._matches = self.get_choices(line)
+            except Exception:
+                self._matches = []
+        try:
+            return self._matches[state] + ' '
+        except IndexError:
+            return None
@@ -0,0 +1,81 @@
+# -*- coding: UTF-8 -*-
+"""Builds the CLI for displaying information about the components in the registry"""
+import click
+
+from vlab_cli.lib.api import consume_task
+from vlab_cli.lib.components import COMPONENTS
+from vlab_cli.lib.ascii_output import vm_table_view, columned_table
+from vlab_cli.lib.versions import Version
+
+
+def build(name):
+    """Create the ``vlab show <name>`` command of a component
+
+    :Returns: click.Command
+
+    :param name: The name of the component, as typed on the CLI
+    :type name: String
+    """
+    component = COMPONENTS[name]
+
+    @click.command(name=name, help='Display information about {} in your lab'.format(component['plural']))
+    @click.option('-i', '--images', is_flag=True,
+                  help='Display the available versions of {} to deploy'.format(component['product']))
+    @click.pass_context
+    def show_component(ctx, images):
+        if images:
+            info = consume_task(ctx.obj.vlab_api,
+                                endpoint='{}/image'.format(component['endpoint']),
+                                base_endpoint=False,
+                                message='Collecting available versions of {} for deployment'.format(component['product']),
+                                method='GET').json()['content']
+            table = get_formatted_table(component, info['image'])
+            click.echo('\n{}\n'.format(table))
+        else:
+            info = consume_task(ctx.obj.vlab_api,
+                                endpoint=component['endpoint'],
+                                message='Collecting information about your {}'.format(component['plural']),
+                                method='GET').json()
+            output = vm_table_view(ctx.obj.vlab_api, info['content'])
+            if not output:
+                output = 'You do not own any {}'.format(component['plural'])
+            click.echo(output)
+    return show_component
+
+
+def get_formatted_table(component, images):
+    """A human handy table of the versions of a component that can be deployed
+
+    :Returns: String
+
+    :param component: The registry entry of the component
+    :type component: Dictionary
+
+    :param images: The available versions/images of the component
+    :type images: List
+    """
+    how = component['images']
+    if how['sort'] == 'version':
+        rows = [Version(x, name=component['product']) for x in images]
+    elif how['sort'] == 'number':
+        rows = [to_number(x) for x in images]
+    else:
+        rows = list(images)
+    return columned_table([how['header']], [sorted(rows, reverse=how['reverse'])])
+
+
+def to_number(value):
+    """Cast a given string to a float or integer
+
+    :Returns: Integer or Float
+
+    :Raises: ValueError
+
+    :param value: The string to cast to an integer
+    :type value: String
+    """
+    try:
+        as_number = int(value)
+    except ValueError:
+        as_number = float(value)
+    return as_number
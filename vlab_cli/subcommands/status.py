@@ -2,9 +2,12 @@
 """
 Defines the CLI for a little status page of your vLab inventory
 """
+import asyncio
+
 import click
 from tabulate import tabulate
 
+from vlab_cli.lib import async_api
 from vlab_cli.lib.api import consume_task
 from vlab_cli.lib.widgets import typewriter, Spinner, to_timestamp
 
@@ -29,15 +32,11 @@ def status(ctx):
     else:
         gateway_ip = 'None' # so users see the literal word
     with Spinner('Processing inventory records'):
+        vm_names = sorted(vm_info.keys())
+        all_addr_info, quota_info = async_api.run(_lookup_details(ctx.obj.vlab_api, vm_names))
         vm_body = []
         vm_header = ['Name', 'IPs', 'Connectable', 'Type', 'Version', 'Powered', 'Networks']
-        for vm in sorted(vm_info.keys()):
-            params = {'name' : vm}
-            resp = ctx.obj.vlab_api.get('/api/1/ipam/addr', params=params, auto_check=False)
-            if resp.json()['error'] == None:
-                addr_info = resp.json()['content']
-            else:
-                addr_info = {}
+        for vm, addr_info in zip(vm_names, all_addr_info):
             connectable = addr_info.get(vm, {}).get('routable', 'initializing')
             networks = ','.join(vm_info[vm].get('networks', ['?']))
             kind = vm_info[vm]['meta']['component']
@@ -51,8 +50,6 @@ def status(ctx):
             row = [vm, ips, connectable, kind, version, power, networks]
             vm_body.append(row)
 
-        quota_info = ctx.obj.vlab_api.get('/api/1/quota').json()['content']
-
 
     heading = '\nUsername: {}\nGateway : {}\nVM Quota: {}\nVM Count: {}'.format(ctx.obj.username,
                                                                                   gateway_ip,
@@ -73,3 +70,28 @@ def status(ctx):
     else:
         typewriter("Looks like there's nothing in your lab.")
         typewriter("Use 'vlab create -h' to start deploying some machines")
+
+
+async def _lookup_details(vlab_api, vm_names):
+    """Concurrently obtain the address info of every VM, and the user's quota
+
+    :Returns: Tuple (List of address info, in the same order as vm_names, quota info)
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param vm_names: The VMs to lookup
+    :type vm_names: List
+    """
+    with async_api.AsyncVLabApi(vlab_api) as api:
+        addr_lookups = [_lookup_addr(api, x) for x in vm_names]
+        results = await asyncio.gather(api.get('/api/1/quota'), *addr_lookups)
+    return results[1:], results[0].json()['content']
+
+
+async def _lookup_addr(api, vm_name):
+    resp = await api.get('/api/1/ipam/addr', params={'name' : vm_name}, auto_check=False)
+    data = resp.json()
+    if data['error'] is None:
+        return data['content']
+    return {}
@@ -0,0 +1,214 @@
+# -*- coding: UTF-8 -*-
+"""
+Defines the CLI for waiting on tasks issued by an earlier command
+"""
+import time
+from collections import OrderedDict
+
+import click
+import requests
+from tabulate import tabulate
+
+from vlab_cli.lib.api import iter_tasks
+from vlab_cli.lib.widgets import Spinner
+from vlab_cli.lib.journal import TaskJournal
+from vlab_cli.lib.follow_ups import FollowUp
+from vlab_cli.lib.click_extras import AliasedGroup
+
+
+@click.group(cls=AliasedGroup)
+def tasks():
+    """Keep waiting on work that a stopped (or timed out) command started"""
+    pass
+
+
+@tasks.command(name='list')
+@click.option('-p', '--pending', is_flag=True, help='Only display the tasks that have not finished')
+@click.option('-l', '--limit', default=20, show_default=True, help='The most tasks to display')
+@click.pass_context
+def list_tasks(ctx, pending, limit):
+    """Display the tasks your recent commands started"""
+    found = TaskJournal().tasks(server=ctx.obj.vlab_url)
+    if pending:
+        found = [x for x in found if _pending(x)]
+    if not found:
+        click.echo('No tasks found')
+        return
+    header = ['Task', 'Started', 'Call', 'Status', 'Request ID']
+    rows = []
+    for task in found[:limit]:
+        rows.append([task['task_id'],
+                     time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(task['started'])),
+                     '{} {}'.format(task['method'], task['endpoint']),
+                     _status(task),
+                     task['request_id']])
+    click.echo('\n{}\n'.format(tabulate(rows, headers=header, tablefmt='presto')))
+
+
+@tasks.command()
+@click.argument('task_ids', nargs=-1, required=True)
+@click.option('-t', '--timeout', default=3600, show_default=True,
+              help='How many seconds to wait on the task(s) to finish')
+@click.pass_context
+def wait(ctx, task_ids, timeout):
+    """Wait on tasks by ID; the start of an ID is enough"""
+    vlab_api = ctx.obj.vlab_api
+    journal = TaskJournal()
+    found = []
+    for task_id in task_ids:
+        try:
+            found.append(journal.find(task_id, server=vlab_api.server))
+        except KeyError as doh:
+            raise click.ClickException(doh.args[0])
+    wait_on(vlab_api, found, timeout)
+
+
+@tasks.command()
+@click.option('-t', '--timeout', default=3600, show_default=True,
+              help='How many seconds to wait on the task(s) to finish')
+@click.pass_context
+def resume(ctx, timeout):
+    """Wait on every task that has not finished, and finish what comes after them"""
+    vlab_api = ctx.obj.vlab_api
+    found = [x for x in TaskJournal().tasks(server=vlab_api.server) if _pending(x)]
+    if not found:
+        click.echo('No unfinished tasks')
+        return
+    wait_on(vlab_api, found, timeout)
+
+
+def wait_on(vlab_api, found, timeout):
+    """Wait on tasks from the journal, and report how each one turned out
+
+    Once the tasks are done, whatever their commands had left to do (like
+    creating port mapping rules) is done too.
+
+    :Returns: None
+
+    :Raises: click.ClickException (if any task, or follow-up, failed)
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param found: The tasks to wait on, from the journal
+    :type found: List
+
+    :param timeout: How many seconds to wait on the tasks to finish
+    :type timeout: Integer
+    """
+    found = _with_follow_up_tasks(vlab_api, found)
+    task_v_tasks = 'task' if len(found) == 1 else 'tasks'
+    status_urls = {x['task_id']: x['status_url'] for x in found}
+    for task in found:
+        vlab_api.track_task(task['task_id'])
+    with Spinner('Waiting on {} {}'.format(len(found), task_v_tasks)):
+        results = dict(iter_tasks(vlab_api, status_urls, timeout=timeout, auto_check=False))
+    failures = 0
+    for task in found:
+        result = results[task['task_id']]
+        error = result.get('error') if isinstance(result, dict) else None
+        call = ' '.join(x for x in (task.get('method'), task.get('endpoint')) if x)
+        if error:
+            failures += 1
+            click.echo('{} ({}) failed: {}'.format(task['task_id'], call, error))
+        else:
+            click.echo('{} ({}) finished'.format(task['task_id'], call))
+    follow_up_failures = run_follow_ups(vlab_api, found, results)
+    if failures:
+        raise click.ClickException('{} of {} {} failed'.format(failures, len(found), task_v_tasks))
+    elif follow_up_failures:
+        step_v_steps = 'step' if follow_up_failures == 1 else 'steps'
+        msg = '{} follow-up {} failed; run "vlab tasks resume" to try again'
+        raise click.ClickException(msg.format(follow_up_failures, step_v_steps))
+
+
+def run_follow_ups(vlab_api, found, results):
+    """Do what the commands that issued the tasks had left to do once their tasks were done
+
+    A follow-up only runs once every task it's for is done, and it's skipped
+    for good if any of them failed.
+
+    :Returns: Integer (how many follow-ups failed)
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param found: The tasks that were waited on
+    :type found: List
+
+    :param results: The result of each task, by task ID
+    :type results: Dictionary
+    """
+    journal = vlab_api.journal
+    groups = OrderedDict()
+    for task in found:
+        if task.get('follow_up') and not task.get('followed_up'):
+            groups.setdefault(task['follow_up']['id'], []).append(task)
+    failures = 0
+    for tasks in groups.values():
+        try:
+            follow_up = FollowUp.from_dict(tasks[0]['follow_up'])
+        except ValueError as doh:
+            failures += 1
+            click.echo(doh)
+            continue
+        task_results = [results[x['task_id']] for x in tasks]
+        errors = [x.get('error') for x in task_results if isinstance(x, dict) and x.get('error')]
+        if errors:
+            click.echo('{}: skipped, because its task failed'.format(follow_up.description))
+            if journal is not None:
+                journal.followed_up(follow_up.id, error=errors[0])
+            continue
+        info = {}
+        for result in task_results:
+            content = result.get('content') if isinstance(result, dict) else None
+            if isinstance(content, dict):
+                info.update(content)
+        try:
+            follow_up.run(vlab_api, info)
+        except (click.ClickException, requests.exceptions.RequestException) as doh:
+            # not recorded, so "vlab tasks resume" tries again
+            failures += 1
+            message = doh.format_message() if isinstance(doh, click.ClickException) else doh
+            click.echo('{}: failed: {}'.format(follow_up.description, message))
+            continue
+        if journal is not None:
+            journal.followed_up(follow_up.id)
+        click.echo('{}: done'.format(follow_up.description))
+    return failures
+
+
+def _with_follow_up_tasks(vlab_api, found):
+    """Add the other tasks a follow-up is for, so it runs with all of their results
+
+    :Returns: List
+
+    :param vlab_api: A valid API connection to vLab
+    :type vlab_api: vlab_cli.lib.api.vLabApi
+
+    :param found: The tasks to wait on
+    :type found: List
+    """
+    follow_up_ids = set(x['follow_up']['id'] for x in found if x.get('follow_up') and not x.get('followed_up'))
+    if not follow_up_ids or vlab_api.journal is None:
+        return found
+    known = set(x['task_id'] for x in found)
+    others = [x for x in vlab_api.journal.tasks(server=vlab_api.server)
+              if (x['follow_up'] or {}).get('id') in follow_up_ids and x['task_id'] not in known]
+    return found + others
+
+
+def _pending(task):
+    """A task is pending until it's finished, and so is whatever comes after it"""
+    return task['status'] is None or bool(task['follow_up'] and not task['followed_up'])
+
+
+def _status(task):
+    """Describe the HTTP status code a task finished with"""
+    if task['status'] is None:
+        return 'unfinished'
+    elif task['status'] == 200:
+        if task['follow_up'] and not task['followed_up']:
+            return 'done; follow-up pending'
+        return 'done'
+    return 'failed (HTTP {})'.format(task['status'])
@@ -6,7 +6,6 @@ import textwrap
 
 import click
 
-from vlab_cli.lib import tokenizer
 from vlab_cli.lib.converters import epoch_to_date
 
 @click.command()
@@ -65,8 +64,12 @@ def handle_delete(vlab_url, token, vlab_api):
     :param vlab_url: The specific vLab server that issued the auth token
     :type vlab_url: String
     """
+    # Imported here so ``vlab --help`` doesn't have to import jwt, cryptography and requests
+    from vlab_cli.lib import tokenizer, agent
+
     try:
         tokenizer.delete(vlab_url)
+        agent.forget_token(vlab_url)
         resp = vlab_api.delete('/api/2/auth/token', json={'token': token})
         resp.raise_for_status()
     except Exception as doh:
@@ -89,9 +92,12 @@ def handle_refresh(vlab_url, username, verify, vlab_api, token):
     :param verify: Set to False if the vLab server is using a self-signed TLS cert
     :type verify: Boolean
     """
+    from vlab_cli.lib import tokenizer, agent
+
     try:
         token, decryption_key, algorithm  = tokenizer.create(username, vlab_url, verify)
         tokenizer.write(token, vlab_url, decryption_key, algorithm)
+        agent.forget_token(vlab_url)
         resp = vlab_api.delete('/api/2/auth/token', json={'token': token})
         resp.raise_for_status()
     except Exception as doh:
@@ -0,0 +1,94 @@
+# -*- coding: UTF-8 -*-
+"""
+Defines the CLI for waiting on tasks started with ``vlab --no-wait``
+"""
+import sys
+import json
+from urllib.parse import urlparse
+
+import click
+
+from vlab_cli.lib.journal import TaskJournal, task_id_of
+from vlab_cli.subcommands.tasks import wait_on
+
+
+@click.command()
+@click.argument('handles', nargs=-1, required=True)
+@click.option('-t', '--timeout', default=3600, show_default=True,
+              help='How many seconds to wait on the task(s) to finish')
+@click.pass_context
+def wait(ctx, handles, timeout):
+    """Wait on tasks started with "vlab --no-wait"
+
+    Every HANDLE is a line printed by --no-wait, the status URL of a task,
+    or a task ID. Supply - to read the lines printed by --no-wait from stdin:
+
+      vlab --no-wait power on --name all >> handles.txt
+
+      vlab wait - < handles.txt
+
+    Whatever a command has left to do once its tasks are done, like creating
+    port mapping rules, is done once they are.
+    """
+    vlab_api = ctx.obj.vlab_api
+    journal = TaskJournal()
+    found = {}
+    for handle in handles:
+        if handle == '-':
+            lines = sys.stdin.read().splitlines()
+            # everything besides the handles is for humans
+            tasks = [_from_handle(x, journal, vlab_api.server) for x in lines if x.startswith('{')]
+        else:
+            tasks = [_from_handle(handle, journal, vlab_api.server)]
+        for task in tasks:
+            found[task['task_id']] = task
+    if not found:
+        raise click.ClickException('No tasks to wait on')
+    wait_on(vlab_api, list(found.values()), timeout)
+
+
+def _from_handle(handle, journal, server):
+    """Find the task a handle refers to
+
+    :Returns: Dictionary
+
+    :Raises: click.ClickException
+
+    :param handle: A line printed by ``--no-wait``, a status URL, or a task ID
+    :type handle: String
+
+    :param journal: The tasks recorded by earlier commands
+    :type journal: vlab_cli.lib.journal.TaskJournal
+
+    :param server: The URL of the vLab server
+    :type server: String
+    """
+    handle = handle.strip()
+    follow_up = None
+    if handle.startswith('{'):
+        try:
+            parsed = json.loads(handle)
+            status_url = parsed['status_url']
+        except (ValueError, KeyError, TypeError):
+            raise click.ClickException('Not a task handle: {}'.format(handle))
+        # the journal has it too, unless the command ran on a different computer
+        follow_up = parsed.get('follow_up')
+    elif handle.startswith('http'):
+        status_url = handle
+    else:
+        try:
+            return journal.find(handle, server=server)
+        except KeyError as doh:
+            raise click.ClickException(doh.args[0])
+    task_id = task_id_of(status_url)
+    if task_id is None:
+        raise click.ClickException('Not a task status URL: {}'.format(status_url))
+    try:
+        # the journal knows what API call started the task
+        task = journal.find(task_id, server=server)
+    except KeyError:
+        endpoint = urlparse(status_url).path.rsplit('/task/', 1)[0]
+        task = {'task_id': task_id, 'status_url': status_url, 'endpoint': endpoint}
+    if follow_up is not None and not task.get('follow_up'):
+        task.update(follow_up=follow_up, followed_up=False)
+    return task
@@ -0,0 +1,4 @@
+# -*- coding: UTF-8 -*-
+"""
+Tools for testing and benchmarking the vLab CLI without a live vLab server
+"""
@@ -0,0 +1,599 @@
+# -*- coding: UTF-8 -*-
+"""
+An in-process stand-in for the vLab server, for tests and benchmarks.
+
+It speaks the same task protocol the real server does (what ``consume_task``
+and ``block_on_tasks`` rely on): an API call that does real work answers with
+HTTP 202, a ``task-id`` in the body, and a ``Link: <...>; rel=status`` header.
+Polling ``<end point>/task/<task-id>`` answers 202 until the task is done, then
+answers with the result. With ``long_poll=True``, a check sent with the
+``Prefer: wait=<seconds>`` header is held open until the task is done (or the
+wait is over), like a server that pushes completion would. The VMs, port mapping rules, networks and snapshots
+(and templates) live in memory, so a create followed by a show behaves like it would in a lab.
+
+The server can be made slow, or broken, on purpose:
+
+.. code-block:: python
+
+   from vlab_cli.testing.fake_server import FakeVLab
+
+   with FakeVLab(latency=0.05, task_duration=2) as server:
+       server.add_vm('myCentOS', component='CentOS')
+       server.inject(503, path='/api/1/ipam/portmap', times=2, retry_after=1)
+       vlab_api = vLabApi(server=server.url, token='fake', log=log)
+
+Authentication isn't checked; any ``X-Auth`` token works.
+"""
+import re
+import json
+import time
+import uuid
+import random
+import threading
+from socketserver import ThreadingMixIn
+from collections import Counter
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from vlab_cli.lib.components import COMPONENTS
+
+
+# End point -> the component type the server reports for its VMs
+KINDS = {x['endpoint']: x['kind'] for x in COMPONENTS.values()}
+# So "/api/2/inf/onefs/config" isn't mistaken for a VM end point
+NOT_COMPONENTS = frozenset(['/api/2/inf/vlan', '/api/2/inf/gateway', '/api/2/inf/template'])
+TASK_PATH = re.compile(r'^(?P<base>/.+)/task/(?P<task_id>[^/]+)$')
+DEFAULT_IMAGES = ['1.0.0', '1.1.0', '2.0.0']
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    """Answers each API call on its own thread (http.server has this built in only from Python 3.7)"""
+    daemon_threads = True
+
+
+class ApiError(Exception):
+    """Makes the fake server answer with an error, like the real server would
+
+    :param status: The HTTP status code to answer with
+    :type status: Integer
+
+    :param message: The ``error`` in the body of the answer
+    :type message: String
+    """
+    def __init__(self, status, message):
+        super(ApiError, self).__init__(message)
+        self.status = status
+        self.message = message
+
+
+class FakeVLab(object):
+    """A vLab server that runs in a background thread of the current process
+
+    :param latency: How many seconds every API call takes to answer
+    :type latency: Float
+
+    :param task_duration: How many seconds a task takes to finish
+    :type task_duration: Float
+
+    :param task_durations: End point prefix -> how many seconds its tasks take, overriding ``task_duration``
+    :type task_durations: Dictionary
+
+    :param error_rate: The fraction (0 to 1) of API calls to answer with HTTP 503, at random
+    :type error_rate: Float
+
+    :param seed: Makes the random errors repeatable
+    :type seed: Integer
+
+    :param username: Who owns the lab
+    :type username: String
+
+    :param host: The address to listen on
+    :type host: String
+
+    :param port: The port to listen on. Zero picks an unused port.
+    :type port: Integer
+
+    :param long_poll: Hold checks on unfinished tasks open, when the client asks for it
+    :type long_poll: Boolean
+    """
+    def __init__(self, latency=0.0, task_duration=0.0, task_durations=None, error_rate=0.0,
+                 seed=None, username='alice', host='127.0.0.1', port=0, long_poll=False):
+        self.latency = latency
+        self.long_poll = long_poll
+        self.task_duration = task_duration
+        self.task_durations = dict(task_durations or {})
+        self.error_rate = error_rate
+        self.username = username
+        self.vms = {}
+        self.portmaps = {}
+        self.vlans = {'frontend': 100, 'backend': 101}
+        self.snapshots = {}
+        self.templates = {}
+        self.gateway = None
+        self.quota = {'soft-limit': 25, 'exceeded_on': 0, 'grace_period': 259200}
+        # every API call made, as (method, path)
+        self.calls = []
+        self.stats = Counter()
+        self._tasks = {}
+        self._injected = []
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._next_port = 50000
+        self._httpd = _ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.fake_vlab = self
+        self._thread = None
+        self._routes = (
+            ('GET', '/api/1/inf/inventory', True, self._get_inventory),
+            ('POST', '/api/1/inf/inventory', True, self._create_inventory),
+            ('DELETE', '/api/1/inf/inventory', True, self._delete_inventory),
+            ('POST', '/api/1/inf/power', True, self._power),
+            ('GET', '/api/1/ipam/portmap', False, self._get_portmap),
+            ('POST', '/api/1/ipam/portmap', False, self._create_portmap),
+            ('DELETE', '/api/1/ipam/portmap', False, self._delete_portmap),
+            ('GET', '/api/1/ipam/addr', False, self._get_addr),
+            ('GET', '/api/1/quota', False, self._get_quota),
+            ('POST', '/api/1/link', False, self._create_link),
+            ('GET', '/api/2/inf/vlan', True, self._get_vlans),
+            ('POST', '/api/2/inf/vlan', True, self._create_vlan),
+            ('DELETE', '/api/2/inf/vlan', True, self._delete_vlan),
+            ('GET', '/api/2/inf/gateway', True, self._get_gateway),
+            ('POST', '/api/2/inf/gateway', True, self._create_gateway),
+            ('DELETE', '/api/2/inf/gateway', True, self._delete_gateway),
+            ('GET', '/api/1/inf/snapshot', True, self._get_snapshots),
+            ('POST', '/api/1/inf/snapshot', True, self._create_snapshot),
+            ('DELETE', '/api/1/inf/snapshot', True, self._delete_snapshot),
+            ('POST', '/api/2/inf/onefs/config', True, self._config_onefs),
+            ('GET', '/api/2/inf/template', True, self._get_templates),
+            ('POST', '/api/2/inf/template', True, self._create_template),
+            ('DELETE', '/api/2/inf/template', True, self._delete_template),
+        )
+
+    @property
+    def url(self):
+        """The base URL of the server, like ``http://127.0.0.1:41234``"""
+        host, port = self._httpd.server_address[:2]
+        return 'http://{}:{}'.format(host, port)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, the_traceback):
+        self.stop()
+
+    def start(self):
+        """Start answering API calls in a background thread
+
+        :Returns: None
+        """
+        # a short poll interval, so stop() doesn't slow down tests
+        self._thread = threading.Thread(target=self._httpd.serve_forever, kwargs={'poll_interval': 0.05})
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        """Stop answering API calls, and close the listening socket
+
+        :Returns: None
+        """
+        if self._thread is not None:
+            self._httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._httpd.server_close()
+
+    def add_vm(self, name, component='CentOS', ips=None, state='poweredOn', networks=None, version='1.0.0'):
+        """Put a VM in the lab, without going through the API
+
+        :Returns: Dictionary (the VM's record)
+
+        :param name: The name of the VM
+        :type name: String
+
+        :param component: The kind of VM, like ``OneFS``
+        :type component: String
+
+        :param ips: The IPs the VM has. Defaults to one made up IPv4 address.
+        :type ips: List
+
+        :param state: The power state, like ``poweredOn``
+        :type state: String
+
+        :param networks: The networks the VM is connected to
+        :type networks: List
+
+        :param version: The version of the component
+        :type version: String
+        """
+        with self._lock:
+            if ips is None:
+                ips = ['192.168.1.{}'.format(len(self.vms) + 2)]
+            record = {'state': state,
+                      'ips': list(ips),
+                      'networks': list(networks or ['frontend']),
+                      'console': 'https://{}/console/{}'.format(urlparse(self.url).netloc, name),
+                      'note': '',
+                      'meta': {'component': component,
+                               'version': version,
+                               'created': int(time.time()),
+                               'generation': 1,
+                               'configured': False}}
+            self.vms[name] = record
+            return record
+
+    def inject(self, status, path=None, method=None, times=1, retry_after=None):
+        """Make upcoming API calls fail
+
+        :Returns: None
+
+        :param status: The HTTP status code to answer with, like 503
+        :type status: Integer
+
+        :param path: Only fail calls to end points that start with this. Defaults to every end point.
+        :type path: String
+
+        :param method: Only fail calls with this HTTP method, like ``POST``. Defaults to every method.
+        :type method: String
+
+        :param times: How many calls to fail
+        :type times: Integer
+
+        :param retry_after: Send a ``Retry-After`` header with this many seconds
+        :type retry_after: Integer
+        """
+        with self._lock:
+            self._injected.append({'status': status,
+                                   'path': path or '/',
+                                   'method': None if method is None else method.upper(),
+                                   'times': times,
+                                   'retry_after': retry_after})
+
+    def handle(self, method, path, params, body, headers=None):
+        """Answer one API call
+
+        :Returns: Tuple (HTTP status code, body, headers)
+
+        :param method: The HTTP method, like ``GET``
+        :type method: String
+
+        :param path: The path of the URL called
+        :type path: String
+
+        :param params: The query parameters
+        :type params: Dictionary
+
+        :param body: The decoded JSON body
+        :type body: Dictionary
+
+        :param headers: The HTTP headers of the call
+        :type headers: Dictionary
+        """
+        with self._lock:
+            self.calls.append((method, path))
+            self.stats[method] += 1
+        if self.latency:
+            time.sleep(self.latency)
+        failure = self._failure(method, path)
+        if failure is not None:
+            return failure
+        match = TASK_PATH.match(path)
+        if match and method == 'GET':
+            return self._poll_task(match.group('task_id'), _wait_for((headers or {}).get('Prefer')))
+        route = self._route(method, path)
+        if route is None:
+            return 404, _envelope(None, error='No such end point: {} {}'.format(method, path)), {}
+        is_task, handler = route
+        if not is_task:
+            try:
+                return 200, _envelope(handler(path, params, body), params=params), {}
+            except ApiError as doh:
+                return doh.status, _envelope(None, error=doh.message), {}
+        return self._start_task(path, params, body, handler)
+
+    def _failure(self, method, path):
+        with self._lock:
+            for rule in self._injected:
+                if not path.startswith(rule['path']):
+                    continue
+                if rule['method'] is not None and rule['method'] != method:
+                    continue
+                rule['times'] -= 1
+                if rule['times'] <= 0:
+                    self._injected.remove(rule)
+                self.stats['injected'] += 1
+                headers = {}
+                if rule['retry_after'] is not None:
+                    headers['Retry-After'] = str(rule['retry_after'])
+                return rule['status'], _envelope(None, error='Injected failure'), headers
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.stats['injected'] += 1
+                return 503, _envelope(None, error='Server overloaded'), {}
+        return None
+
+    def _route(self, method, path):
+        for route_method, route_path, is_task, handler in self._routes:
+            if method == route_method and path == route_path:
+                return is_task, handler
+        base, _, last = path.rpartition('/')
+        if method == 'GET' and last == 'image' and base.startswith('/api/2/inf/'):
+            return True, self._get_images
+        handler = {'GET': self._get_vms, 'POST': self._create_vm, 'DELETE': self._delete_vm}.get(method)
+        if handler is not None and path.startswith('/api/2/inf/') and path not in NOT_COMPONENTS:
+            return True, handler
+        return None
+
+    def _start_task(self, path, params, body, handler):
+        task_id = uuid.uuid4().hex
+        duration = self.task_duration
+        matches = [x for x in self.task_durations if path.startswith(x)]
+        if matches:
+            duration = self.task_durations[max(matches, key=len)]
+        with self._lock:
+            self.stats['tasks'] += 1
+            # The work is done up front, so the result reflects the lab when the task was issued
+            try:
+                status, result = 200, _envelope(handler(path, params, body), params=params)
+            except ApiError as doh:
+                status, result = doh.status, _envelope(None, error=doh.message, params=params)
+            self._tasks[task_id] = (time.monotonic() + duration, status, result)
+        status_url = '{}{}/task/{}'.format(self.url, path, task_id)
+        headers = {'Link': '<{}>; rel=status'.format(status_url)}
+        return 202, _envelope({'task-id': task_id}, params=params), headers
+
+    def _poll_task(self, task_id, wait=None):
+        with self._lock:
+            self.stats['polls'] += 1
+            try:
+                done_at, status, result = self._tasks[task_id]
+            except KeyError:
+                return 404, _envelope(None, error='No such task: {}'.format(task_id)), {}
+        headers = {}
+        if self.long_poll and wait:
+            headers['Preference-Applied'] = 'wait={}'.format(wait)
+            time.sleep(max(0, min(done_at, time.monotonic() + wait) - time.monotonic()))
+        if time.monotonic() < done_at:
+            return 202, _envelope({'task-id': task_id}), headers
+        return status, result, headers
+
+    def _get_inventory(self, path, params, body):
+        inventory = {k: v for k, v in self.vms.items()}
+        if self.gateway is not None:
+            inventory['defaultGateway'] = self.gateway
+        return inventory
+
+    def _create_inventory(self, path, params, body):
+        return {}
+
+    def _delete_inventory(self, path, params, body):
+        self.vms.clear()
+        self.snapshots.clear()
+        return {}
+
+    def _power(self, path, params, body):
+        machine = body.get('machine')
+        power = body.get('power')
+        names = list(self.vms.keys()) if machine == 'all' else [machine]
+        for name in names:
+            vm = self._vm(name)
+            if power == 'off':
+                vm['state'] = 'poweredOff'
+            elif power in ('on', 'restart'):
+                vm['state'] = 'poweredOn'
+            else:
+                raise ApiError(400, 'Invalid power state: {}'.format(power))
+        return {}
+
+    def _get_portmap(self, path, params, body):
+        name = params.get('name')
+        target_port = params.get('target_port')
+        ports = {k: v for k, v in self.portmaps.items()
+                 if (name is None or v['name'] == name) and
+                    (target_port is None or str(v['target_port']) == str(target_port))}
+        return {'ports': ports, 'gateway_ip': self._gateway_ip()}
+
+    def _create_portmap(self, path, params, body):
+        self._next_port += 1
+        conn_port = self._next_port
+        self.portmaps[str(conn_port)] = {'name': body['target_name'],
+                                         'target_addr': body['target_addr'],
+                                         'target_port': body['target_port'],
+                                         'component': body['target_component']}
+        return {'conn_port': conn_port}
+
+    def _delete_portmap(self, path, params, body):
+        if self.portmaps.pop(str(body.get('conn_port')), None) is None:
+            raise ApiError(404, 'No such port mapping rule: {}'.format(body.get('conn_port')))
+        return {}
+
+    def _get_addr(self, path, params, body):
+        name = params.get('name')
+        vm = self._vm(name)
+        return {name: {'addr': vm['ips'], 'routable': vm['state'] == 'poweredOn'}}
+
+    def _get_quota(self, path, params, body):
+        return dict(self.quota)
+
+    def _create_link(self, path, params, body):
+        return {'url': '{}/link/{}'.format(self.url, uuid.uuid4().hex[:8])}
+
+    def _get_vlans(self, path, params, body):
+        return dict(self.vlans)
+
+    def _create_vlan(self, path, params, body):
+        name = body['vlan-name']
+        if name in self.vlans:
+            raise ApiError(409, 'Network {} already exists'.format(name))
+        self.vlans[name] = max(self.vlans.values() or [99]) + 1
+        return {}
+
+    def _delete_vlan(self, path, params, body):
+        if self.vlans.pop(body['vlan-name'], None) is None:
+            raise ApiError(404, 'No such network: {}'.format(body['vlan-name']))
+        return {}
+
+    def _get_gateway(self, path, params, body):
+        if self.gateway is None:
+            raise ApiError(404, 'No default gateway found')
+        return self.gateway
+
+    def _create_gateway(self, path, params, body):
+        self.gateway = {'state': 'poweredOn',
+                        'ips': ['10.7.7.1', '192.168.1.1'],
+                        'networks': [body.get('wan', 'corpNetwork'), 'frontend'],
+                        'console': 'https://{}/console/defaultGateway'.format(urlparse(self.url).netloc),
+                        'meta': {'component': 'defaultGateway',
+                                 'version': '1.0.0',
+                                 'created': int(time.time()),
+                                 'generation': 1,
+                                 'configured': True}}
+        return self.gateway
+
+    def _delete_gateway(self, path, params, body):
+        self.gateway = None
+        return {}
+
+    def _get_snapshots(self, path, params, body):
+        return {k: list(v) for k, v in self.snapshots.items()}
+
+    def _create_snapshot(self, path, params, body):
+        name = body['name']
+        self._vm(name)
+        snap = {'id': uuid.uuid4().hex[:8], 'created': int(time.time()), 'expires': int(time.time()) + 259200}
+        self.snapshots.setdefault(name, []).insert(0, snap)
+        return {name: list(self.snapshots[name])}
+
+    def _delete_snapshot(self, path, params, body):
+        snaps = self.snapshots.get(body['name'], [])
+        remaining = [x for x in snaps if x['id'] != body['id']]
+        if len(remaining) == len(snaps):
+            raise ApiError(404, 'No such snapshot: {}'.format(body['id']))
+        self.snapshots[body['name']] = remaining
+        return {}
+
+    def _config_onefs(self, path, params, body):
+        vm = self._vm(body['name'])
+        vm['meta']['configured'] = True
+        return {}
+
+    def _get_templates(self, path, params, body):
+        return dict(self.templates)
+
+    def _create_template(self, path, params, body):
+        name = body['name']
+        if name in self.templates:
+            raise ApiError(409, 'A template named {} already exists'.format(name))
+        machines = {}
+        for machine in body['machines']:
+            vm = self._vm(machine)
+            machines[machine] = {'ip': (vm['ips'] or [None])[0], 'kind': vm['meta']['component']}
+        self.templates[name] = {'owner': self.username,
+                                'email': '{}@vlab.local'.format(self.username),
+                                'summary': body.get('summary', ''),
+                                'machines': machines,
+                                'portmaps': body.get('portmaps', [])}
+        return {name: self.templates[name]}
+
+    def _delete_template(self, path, params, body):
+        if self.templates.pop(body['name'], None) is None:
+            raise ApiError(404, 'No such template: {}'.format(body['name']))
+        return {}
+
+    def _get_images(self, path, params, body):
+        return {'image': list(DEFAULT_IMAGES)}
+
+    def _get_vms(self, path, params, body):
+        kind = _kind(path)
+        return {k: v for k, v in self.vms.items() if v['meta']['component'].lower() == kind}
+
+    def _create_vm(self, path, params, body):
+        name = body['name']
+        if name in self.vms:
+            raise ApiError(409, 'A VM named {} already exists'.format(name))
+        component = _kind(path)
+        networks = [body[x] for x in ('network', 'frontend', 'backend') if body.get(x)]
+        record = self.add_vm(name, component=component, networks=networks or None,
+                             version=body.get('image', DEFAULT_IMAGES[-1]))
+        return {name: record}
+
+    def _delete_vm(self, path, params, body):
+        name = body['name']
+        vm = self._vm(name)
+        if vm['meta']['component'].lower() != _kind(path):
+            raise ApiError(404, 'No {} named {}'.format(_kind(path), name))
+        self.vms.pop(name)
+        self.snapshots.pop(name, None)
+        return {}
+
+    def _vm(self, name):
+        try:
+            return self.vms[name]
+        except KeyError:
+            raise ApiError(404, 'No VM named {}'.format(name))
+
+    def _gateway_ip(self):
+        if self.gateway is None:
+            return None
+        return self.gateway['ips'][0]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Turns HTTP requests into calls to ``FakeVLab.handle``"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._answer('GET')
+
+    def do_POST(self):
+        self._answer('POST')
+
+    def do_PUT(self):
+        self._answer('PUT')
+
+    def do_DELETE(self):
+        self._answer('DELETE')
+
+    def _answer(self, method):
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+        try:
+            body = json.loads(raw.decode()) if raw else {}
+        except ValueError:
+            body = {}
+        fake_vlab = self.server.fake_vlab
+        status, answer, headers = fake_vlab.handle(method, url.path, params, body, headers=self.headers)
+        payload = json.dumps(answer).encode()
+        with fake_vlab._lock:
+            fake_vlab.stats['bytes_received'] += len(raw)
+            fake_vlab.stats['bytes_sent'] += len(payload)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for header, value in headers.items():
+            self.send_header(header, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        # keep test and benchmark output clean
+        pass
+
+
+def _envelope(content, error=None, params=None):
+    """Wrap an answer the same way the vLab server does"""
+    return {'content': content, 'error': error, 'params': params or {}}
+
+
+def _wait_for(prefer):
+    """The seconds of ``wait=<seconds>`` in a Prefer header (RFC 7240); None if not asked for"""
+    for preference in (prefer or '').split(','):
+        name, _, value = preference.strip().partition('=')
+        if name.strip().lower() == 'wait' and value.strip().isdigit():
+            return int(value.strip())
+    return None
+
+
+def _kind(path):
+    """The component type the server reports for the VMs of an end point"""
+    return KINDS.get(path, path.rsplit('/', 1)[-1]).lower()
@@ -4,29 +4,18 @@ Entry point logic for the vLab CLI application
 """
 import sys
 import atexit
-import pkg_resources
 from os import environ
-from os.path import join
 from getpass import getuser
-from json import JSONDecodeError
+from functools import partial
 
 import click
-import click_completion
-from jwt import PyJWTError
-from requests.exceptions import HTTPError
 
 from vlab_cli import version
 from vlab_cli.lib import widgets
-from vlab_cli.lib.api import vLabApi
 from vlab_cli.lib.logger import get_logger
-from vlab_cli.lib.tokenizer import get_token
-from vlab_cli.lib.new_cli import handle_updates
-from vlab_cli.lib.configurizer import get_config, set_config
-from vlab_cli.lib.click_extras import GlobalContext, HiddenOption, AliasedGroup
-from vlab_cli.subcommands import status, token, init, create, delete, show, power, connect, apply
-
-# Enable tab complete
-click_completion.init()
+from vlab_cli.lib.manifest import serve_from_manifest
+from vlab_cli.lib.configurizer import get_config
+from vlab_cli.lib.click_extras import GlobalContext, HiddenOption, LazyAliasedGroup, COMMAND_PATH
 
 # Setting these environment vars b/c Click needs it: http://click.pocoo.org/5/python3/
 environ['LC_ALL'] = environ.get('LC_ALL', 'C.UTF-8')
@@ -38,9 +27,31 @@ VLAB_URL = 'https://vlab.emc.com'
 VLAB_VERSION = version.__version__
 VLAB_SKIP_VERIFY_HOSTNAME = False
 VLAB_USER = getuser()
+SUBCOMMANDS = {
+    'status' : 'vlab_cli.subcommands.status.status',
+    'token' : 'vlab_cli.subcommands.token.token',
+    'init' : 'vlab_cli.subcommands.init.init',
+    'create' : 'vlab_cli.subcommands.create.create',
+    'delete' : 'vlab_cli.subcommands.delete.delete',
+    'show' : 'vlab_cli.subcommands.show.show',
+    'power' : 'vlab_cli.subcommands.power.power',
+    'connect' : 'vlab_cli.subcommands.connect.connect',
+    'apply' : 'vlab_cli.subcommands.apply.apply',
+    'agent' : 'vlab_cli.subcommands.agent.agent',
+    'shell' : 'vlab_cli.subcommands.shell.shell',
+    'tasks' : 'vlab_cli.subcommands.tasks.tasks',
+    'wait' : 'vlab_cli.subcommands.wait.wait',
+}
+# Prefixes that were unique before a newer command shared them
+ALIASES = {
+    'a' : 'apply',
+    'sh' : 'show',
+    't' : 'token',
+}
 
 
-@click.group(context_settings=CONTEXT_SETTINGS, cls=AliasedGroup)
+@click.group(context_settings=CONTEXT_SETTINGS, cls=LazyAliasedGroup, lazy_subcommands=SUBCOMMANDS,
+             aliases=ALIASES)
 @click.version_option(version=VLAB_VERSION)
 @click.option('--vlab-url', default=VLAB_URL, show_default=True,
               help='The URL of the vLab server')
@@ -52,9 +63,17 @@ VLAB_USER = getuser()
 @click.option('--no-scroll', '-o', is_flag=True,
               help='Output messages all at once')
 @click.option('-s', '--skip-update-check', is_flag=True, help="Don't check for an updated vLab CLI")
+@click.option('--no-cache', is_flag=True, help="Don't reuse saved answers from the vLab server, like image lists, or how long tasks took before")
+@click.option('--http2', is_flag=True, envvar='VLAB_HTTP2', help='Make API calls over HTTP/2, if the server and your Python support it')
+@click.option('--no-wait', is_flag=True,
+              help='Print a handle for each task a command starts instead of waiting on it; "vlab wait" finishes the command, like creating port mapping rules')
+@click.option('--trace', is_flag=True, help='Print how long each API call took when the command exits')
+@click.option('--trace-json', type=click.Path(dir_okay=False, writable=True),
+              help='Also save the timing of every API call to this JSON file')
 @click.option('--debug', is_flag=True, cls=HiddenOption)
 @click.pass_context
-def cli(ctx, vlab_url, skip_verify, vlab_username, verbose, no_scroll, skip_update_check, debug):
+def cli(ctx, vlab_url, skip_verify, vlab_username, verbose, no_scroll, skip_update_check, no_cache,
+        http2, no_wait, trace, trace_json, debug):
     """CLI tool for interacting with your virtual lab"""
     log = get_logger(__name__, verbose=verbose, debug=debug)
     verify = not skip_verify # inverted because ``requests`` is 'opt-out' of hostname verification
@@ -62,6 +81,70 @@ def cli(ctx, vlab_url, skip_verify, vlab_username, verbose, no_scroll, skip_upda
         # might have entered IP, or DNS FQDN
         vlab_url = 'https://{}'.format(vlab_url)
     widgets.NO_SCROLL_OUTPUT = no_scroll
+    # Subcommands the rely on the config must address it being None
+    config = get_config()
+    tracer = None
+    if trace or trace_json:
+        from vlab_cli.lib.tracing import Tracer
+        tracer = Tracer()
+        atexit.register(_report_trace, tracer, ctx.meta, trace, trace_json)
+    # The token and API connection are only created once a subcommand uses them.
+    # This way things like ``--help`` and tab-completion don't have to read
+    # (or prompt for) a token, or connect to the vLab server.
+    ctx.obj = GlobalContext(log=log, vlab_url=vlab_url, verify=verify, vlab_config=config, tracer=tracer,
+                            no_wait=no_wait,
+                            lazy={'auth': partial(_get_auth, vlab_url, vlab_username, verify, log),
+                                  'token': lambda: ctx.obj.auth[0],
+                                  'token_contents': lambda: ctx.obj.auth[1],
+                                  'username': lambda: ctx.obj.auth[1]['username'],
+                                  'vlab_api': partial(_get_vlab_api, ctx, skip_update_check, no_cache, http2,
+                                                      no_wait)})
+    log.info('Calling sub-command')
+
+
+def main():
+    """The ``vlab`` console script.
+
+    Help pages and tab-completion are answered from the command manifest when
+    possible, which avoids importing every subcommand and click_completion.
+    """
+    if serve_from_manifest(sys.argv[1:]):
+        sys.exit(0)
+    # Enable tab complete
+    import click_completion
+    click_completion.init()
+    sys.exit(cli())
+
+
+def _get_auth(vlab_url, vlab_username, verify, log):
+    """Obtain the auth token, and the decoded contents of that token
+
+    :Returns: Tuple
+
+    :Raises: click.ClickException
+
+    :param vlab_url: The URL of the vLab server
+    :type vlab_url: String
+
+    :param vlab_username: The name of the person accessing vLab
+    :type vlab_username: String
+
+    :param verify: Set to False if the server does not have a valid TLS certificate
+    :type verify: Boolean
+
+    :param log: A logging object to aid in debugging
+    :type log: logging.Logger
+    """
+    from vlab_cli.lib import agent
+
+    if agent.ping():
+        the_token, token_contents = agent.get_token(vlab_url)
+        if the_token is not None:
+            log.info('Using token cached by the vLab agent')
+            return the_token, token_contents
+    # Importing the tokenizer pulls in jwt and cryptography, which is slow
+    from vlab_cli.lib.tokenizer import get_token
+
     try:
         the_token, token_contents = get_token(vlab_url, vlab_username, verify=verify, log=log)
     except Exception as doh:
@@ -70,27 +153,90 @@ def cli(ctx, vlab_url, skip_verify, vlab_username, verbose, no_scroll, skip_upda
     if the_token is None and token_contents is None:
         log.debug('Tokenizer returned null token and contents')
         raise RuntimeError("Invalid token created by library")
+    agent.put_token(vlab_url, the_token, token_contents)
+    return the_token, token_contents
 
-    # Subcommands the rely on the config must address it being None
-    config = get_config()
-    log.info('Initializing the vLab API object')
-    vlab_api = vLabApi(server=vlab_url, token=the_token, verify=verify, log=log)
+
+def _get_vlab_api(ctx, skip_update_check, no_cache, http2=False, no_wait=False):
+    """Create the connection to the vLab server, and check for CLI updates
+
+    :Returns: vlab_cli.lib.api.vLabApi
+
+    :param ctx: The context of the root ``vlab`` command
+    :type ctx: click.Context
+
+    :param skip_update_check: Set to True to avoid checking for an updated CLI
+    :type skip_update_check: Boolean
+
+    :param no_cache: Set to True to always ask the vLab server, instead of using saved answers
+    :type no_cache: Boolean
+
+    :param http2: Set to True to make the API calls over HTTP/2, when possible
+    :type http2: Boolean
+
+    :param no_wait: Set to True to print a handle for each task that changes something, instead of waiting on it
+    :type no_wait: Boolean
+    """
+    from vlab_cli.lib import agent
+    from vlab_cli.lib.api import vLabApi
+    from vlab_cli.lib.http_cache import HttpCache
+    from vlab_cli.lib.journal import TaskJournal
+    from vlab_cli.lib.memo import RequestMemo
+    from vlab_cli.lib.polling import TaskHistory
+    from vlab_cli.lib.new_cli import handle_updates
+
+    session = agent.connect()
+    if session is not None:
+        ctx.obj.log.info('Sending API calls through the vLab agent')
+    elif http2:
+        from vlab_cli.lib import http2 as http2_transport
+        session = http2_transport.connect(ctx.obj.vlab_url, ctx.obj.log)
+    cache = None
+    task_history = None
+    if not no_cache:
+        cache = HttpCache(user='{}@{}'.format(ctx.obj.username, ctx.obj.vlab_url))
+        task_history = TaskHistory()
+    ctx.obj.log.info('Initializing the vLab API object')
+    vlab_api = vLabApi(server=ctx.obj.vlab_url, token=ctx.obj.token, verify=ctx.obj.verify,
+                       log=ctx.obj.log, session=session, cache=cache, tracer=ctx.obj.tracer,
+                       memo=RequestMemo(), task_history=task_history, journal=TaskJournal(), detach=no_wait)
     atexit.register(vlab_api.close)
-    ctx.obj = GlobalContext(log=log, vlab_api=vlab_api, vlab_url=vlab_url, token=the_token,
-                            username=token_contents['username'], verify=verify,
-                            token_contents=token_contents,
-                            vlab_config=config)
-    log.info("Checking for updates")
-    handle_updates(vlab_api, config, skip_update_check)
-    log.info('Calling sub-command')
+    ctx.obj.log.info("Checking for updates")
+    handle_updates(vlab_api, ctx.obj.vlab_config, skip_update_check)
+    return vlab_api
+
+
+def _report_trace(tracer, meta, show_summary, json_file):
+    """Output the timing of the API calls the command made
 
+    :Returns: None
 
-cli.add_command(status)
-cli.add_command(token)
-cli.add_command(init)
-cli.add_command(create)
-cli.add_command(delete)
-cli.add_command(show)
-cli.add_command(power)
-cli.add_command(connect)
-cli.add_command(apply)
+    :param tracer: The timing of every API call
+    :type tracer: vlab_cli.lib.tracing.Tracer
+
+    :param meta: The ``meta`` of the root click context; it knows the full command that was run
+    :type meta: Dictionary
+
+    :param show_summary: Set to True to print a summary table
+    :type show_summary: Boolean
+
+    :param json_file: Where to save every record, if anywhere
+    :type json_file: String
+    """
+    if show_summary:
+        click.echo('\n{}\n'.format(tracer.summary()), err=True)
+    if json_file:
+        try:
+            tracer.dump(json_file)
+        except OSError as doh:
+            click.echo('Unable to save trace to {}: {}'.format(json_file, doh), err=True)
+    if tracer.request_id is None:
+        # never connected to vLab, so there's nothing to line up with the server logs
+        return
+    try:
+        spans_file = tracer.save_spans(meta.get(COMMAND_PATH, 'vlab'))
+    except OSError as doh:
+        click.echo('Unable to save trace spans: {}'.format(doh), err=True)
+    else:
+        if show_summary:
+            click.echo('Request ID {}; spans saved to {}'.format(tracer.request_id, spans_file), err=True)